@@ -1,6 +1,7 @@
 import sys
 import os
 import time
+from collections import deque
 
 # Robust Import Logic (Handles running from root OR inside folder)
 try:
@@ -8,6 +9,10 @@ try:
     from forensix.interface.theme import UI
     from forensix.interface.banner import show_banner
     from forensix.core.file_analyzer import FileAnalyzer
+    from forensix.core.cache import AnalysisCache
+    from forensix.core.dedup import ContentIndex
+    from forensix.core.governor import ExtractionGovernor
+    from forensix.core.magic_db import Magic
     from forensix.modules.extractor import ArchiveExtractor, cleanup_extracted
     from forensix.modules.reporting import ReportGenerator
 except ImportError:
@@ -18,6 +23,10 @@ except ImportError:
         from interface.theme import UI
         from interface.banner import show_banner
         from core.file_analyzer import FileAnalyzer
+        from core.cache import AnalysisCache
+        from core.dedup import ContentIndex
+        from core.governor import ExtractionGovernor
+        from core.magic_db import Magic
         from modules.extractor import ArchiveExtractor, cleanup_extracted
         from modules.reporting import ReportGenerator
     except ImportError as e:
@@ -136,32 +145,128 @@ class ForensixApp:
         # Import Extractor (Moved to Global)
         extractor = ArchiveExtractor()
 
+        # Zip-bomb checks, nesting depth and per-case disk/RAM budgets for extraction
+        governor = ExtractionGovernor()
+        depths = {}
+
+        # Unknown-type fallback: one batched 'file' run when libmagic isn't loadable
+        # (only for files our own signatures can't place)
+        Magic.prefetch(files_to_scan)
+
+        # Persistent results cache (unchanged evidence skips analysis entirely)
+        try:
+            cache = AnalysisCache()
+        except Exception:
+            cache = None
+
+        # Content-hash dedup: identical files (re-extractions, copies) are analyzed once
+        index = ContentIndex(cache.digest if cache else None)
+        reports_by_path = {}
+
+        # Work queue: paths, and member streams of opened archives. A stream is
+        # pulled one member at a time (depth first), so only the member being
+        # analyzed sits in RAM - not the whole archive.
+        pending = deque(files_to_scan)
+
+        def close_stream(stream):
+            """An archive's member stream ran dry: disk fallback, encrypted entries, RAM back"""
+            owner, report = stream['owner'], stream['report']
+            encrypted = extractor.encrypted.pop(stream['archive'], [])
+            extracted = []
+            if stream['verdict'].action == "extract" and (not stream['count'] or encrypted):
+                # Formats Python can't stream (7z, rar...) or encrypted entries: extract() to disk
+                extracted = extractor.extract(owner.realize() if owner else stream['archive'])
+                governor.charge_disk(sum(os.path.getsize(f) for f in extracted))
+                extracted = [f for f in extracted if governor.admit_file()]
+            if extracted:
+                Magic.prefetch(extracted)
+                pending.extend(extracted)
+                for child in extracted:
+                    depths[child] = stream['depth']
+            elif encrypted:
+                names = ", ".join(encrypted[:5]) + (", ..." if len(encrypted) > 5 else "")
+                report['findings'].append(f"{len(encrypted)} encrypted entries not analyzed (password required): {names}")
+            if stream['count'] + len(extracted):
+                report['findings'].append(f"Extracted {stream['count'] + len(extracted)} files")
+            if owner:
+                governor.release(owner) # Nested archive fully streamed: its RAM goes back
+
         with Live(scan_table, refresh_per_second=10) as live:
             count = 0
             
-            # Use index-based loop because files_to_scan grows dynamically
-            i = 0
-            while i < len(files_to_scan):
-                filepath = files_to_scan[i]
-                i += 1
-                
-                # Check for recursion bomb (limit 1000 files for safety)
-                if count > 1000: break
+            while pending:
+                # Streamed archive member: analyzed from memory under a virtual path
+                member = None
+                if isinstance(pending[0], dict):
+                    stream = pending[0]
+                    member = next(stream['members'], None)
+                    if member is None:
+                        pending.popleft()
+                        close_stream(stream)
+                        continue
+                    stream['count'] += 1
+                    filepath = member.virtual_path
+                    depths[filepath] = stream['depth']
+                    index.remember(filepath, member.sha256)
+                else:
+                    filepath = pending.popleft()
+                streaming = False # This member's own members are being pulled (keep it in RAM)
 
                 try:
-                    analyzer = FileAnalyzer(filepath)
-                    success = analyzer.analyze(deep=deep)
+                    sha256 = index.digest(filepath)
+                    canonical = index.claim(filepath, sha256) if sha256 else None
+                    if canonical in reports_by_path:
+                        # Same bytes as a file already in this scan: list the path, reuse the result
+                        report = dict(reports_by_path[canonical], filename=os.path.basename(filepath), duplicate_of=canonical)
+                        report['findings'] = list(report['findings'])
+                        self.analysis_results.append(report)
+                        scan_table.add_row(
+                            os.path.basename(filepath)[:28],
+                            report['type'],
+                            "[dim]DUPLICATE[/dim]",
+                            f"[dim]Same content as {os.path.basename(canonical)}[/dim]"
+                        )
+                        count += 1
+                        continue
+
+                    cached = cache.lookup(filepath, deep, sha256=sha256) if cache else None
+                    if cached:
+                        success = True
+                        report = cached['report']
+                    else:
+                        analyzer = FileAnalyzer(filepath, member=member)
+                        success = analyzer.analyze(deep=deep)
+                        if success:
+                            report = analyzer.get_report_data()
+                            if cache:
+                                cache.store(filepath, deep, analyzer)
                     
                     if success:
-                        report = analyzer.get_report_data()
                         self.analysis_results.append(report)
+                        reports_by_path[filepath] = report
+                        if not sha256 and report['hashes'].get('sha256'):
+                            # First sight of this file: dedup on the hash computed during analysis
+                            canonical = index.claim(filepath, report['hashes']['sha256'])
+                            if canonical:
+                                report['duplicate_of'] = canonical
                         
-                        # RECURSIVE EXTRACTION
-                        if deep and "archive" in report['type']:
-                            new_files = extractor.extract(filepath)
-                            if new_files:
-                                files_to_scan.extend(new_files)
-                                report['findings'].append(f"Extracted {len(new_files)} files")
+                        # RECURSIVE EXTRACTION (children of a duplicate were already queued)
+                        if deep and "archive" in report['type'] and not canonical:
+                            depth = depths.get(filepath, 0)
+                            verdict = governor.review(member or filepath, depth)
+                            if verdict.reason:
+                                report['findings'].append(verdict.reason)
+
+                            if verdict.allowed:
+                                # zip/tar members stream straight into analysis, next in line;
+                                # 7z & co. still extract to disk once the stream comes up empty
+                                pending.appendleft({
+                                    "members": extractor.iter_members(member or filepath, governor, verdict),
+                                    "archive": member.virtual_path if member else filepath,
+                                    "owner": member, "report": report, "verdict": verdict,
+                                    "depth": depth + 1, "count": 0,
+                                })
+                                streaming = member is not None
 
                         # Determine Status/Color based on findings
                         findings_text = ""
@@ -185,7 +290,7 @@ class ForensixApp:
                         try:
                             from forensix.core.neural_engine import NeuralEngine
                             brain = NeuralEngine()
-                            ai_result = brain.score_artifact(report['entropy'], report['findings'], report['type'])
+                            ai_result = brain.score_artifact(report['entropy'], report['findings'], report['type'], report.get('entropy_regions'))
                             
                             ai_badge = ""
                             if ai_result['score'] > 80:
@@ -213,8 +318,17 @@ class ForensixApp:
                         count += 1
                 except Exception as e:
                     pass
+                finally:
+                    if member and not streaming:
+                        governor.release(member) # Analyzed: give its RAM back
 
         UI.print_success(f"Analysis Complete. {count} Artifacts Processed.")
+        if cache:
+            UI.print_info(f"Cache: {cache.hits} hits / {cache.misses} misses")
+            cache.close()
+        if index.aliases:
+            UI.print_info(f"Dedup: {len(index)} duplicate files reused an earlier result")
+        Magic.clear()
         cleanup_extracted() # Clean up temp files
         Prompt.ask("Press Enter to continue")
 
@@ -0,0 +1,186 @@
+import os
+import time
+import shutil
+import tempfile
+
+# 📦 FORENSIX SENTINEL - CONTENT-ADDRESSED ARTIFACT STORE
+# Every extracted/carved file is stored ONCE, by SHA-256:
+#
+#   <root>/objects/ab/abcdef...      the bytes
+#   <root>/cases/<case>/...          human-readable paths (hardlinks, symlinks
+#                                    when the filesystem can't hardlink)
+#
+# If the content already exists, "extracting" it again is a lookup + link.
+# Point FORENSIX_ARTIFACT_DIR at a tmpfs (e.g. /dev/shm/forensix) to keep
+# big recursive cases off the disk entirely. gc() removes a case and every
+# object no other case still links to; prune() keeps only the newest cases.
+# Cases are evidence: nothing is deleted unless asked (FORENSIX_KEEP_CASES=N
+# prunes down to the N newest cases after each hunt).
+
+STORE_ROOT = os.environ.get("FORENSIX_ARTIFACT_DIR") or "forensix_artifacts"
+KEEP_CASES = int(os.environ.get("FORENSIX_KEEP_CASES") or 0) # 0: never prune
+
+
+class ArtifactStore:
+    def __init__(self, root=None, case=None, label="case"):
+        self.root = os.path.abspath(root or STORE_ROOT)
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.written = 0 # Bytes of NEW objects stored by this instance (duplicates cost nothing)
+        self.opened = time.time() # Objects touched since may be mid-publish by a concurrent hunt
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        cases_dir = os.path.join(self.root, "cases")
+        os.makedirs(cases_dir, exist_ok=True)
+        if case:
+            self.case_dir = os.path.join(cases_dir, case)
+            os.makedirs(self.case_dir, exist_ok=True)
+        else:
+            # New unique case (two hunts in the same second must not mix)
+            self.case_dir = tempfile.mkdtemp(prefix=f"{label}_{int(time.time())}_", dir=cases_dir)
+        self.case = os.path.basename(self.case_dir)
+
+    def cases(self):
+        return sorted(os.listdir(os.path.join(self.root, "cases")))
+
+    def object_path(self, sha256):
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    def has(self, sha256):
+        return os.path.exists(self.object_path(sha256))
+
+    def readable_path(self, *parts):
+        """Path inside this case for an archive member name (no escaping the case: zip-slip safe)"""
+        clean = []
+        for part in parts:
+            for piece in part.replace("\\", "/").split("/"):
+                if piece and piece not in (".", ".."):
+                    clean.append(piece)
+        return os.path.join(self.case_dir, *clean)
+
+    def link(self, sha256, readable):
+        """Makes `readable` show the stored object (hardlink, symlink as fallback)."""
+        obj = self.object_path(sha256)
+        os.makedirs(os.path.dirname(readable), exist_ok=True)
+        if os.path.lexists(readable):
+            if os.path.exists(readable) and os.path.samefile(readable, obj):
+                return readable
+            readable = _free_name(readable)
+        try:
+            os.link(obj, readable)
+        except OSError: # Cross-device / no hardlink support
+            os.symlink(obj, readable)
+        return readable
+
+    def put_bytes(self, data, sha256, readable):
+        """Stores in-memory content (written only if the object is new) and links it."""
+        if not self.has(sha256):
+            self._publish(sha256, data=data)
+            self.written += len(data)
+        return self.link(sha256, readable)
+
+    def adopt(self, path, sha256, readable=None):
+        """
+        Moves a file that was just written (extraction, carving...) into the store.
+        Duplicate content is dropped and replaced by a link to the existing object.
+        Returns the readable path.
+        """
+        readable = readable or path
+        obj = self.object_path(sha256)
+        os.makedirs(os.path.dirname(obj), exist_ok=True)
+        try:
+            os.link(path, obj) # First copy becomes the object itself (zero copy)
+            self.written += os.path.getsize(obj)
+            if readable == path:
+                return path
+        except FileExistsError:
+            pass # Already stored (maybe by another worker a moment ago)
+        except OSError:
+            if not self.has(sha256):
+                self._publish(sha256, source=path)
+                self.written += os.path.getsize(obj)
+        os.unlink(path)
+        return self.link(sha256, readable)
+
+    def gc(self, case=None):
+        """
+        Deletes a case (default: this one) and the objects nothing links to anymore.
+        Returns the number of bytes freed from the object store.
+        """
+        return self._delete_cases([case or self.case])
+
+    def prune(self, keep):
+        """
+        Deletes all but the `keep` newest cases (this one always stays) and the
+        objects only they linked to. Returns the number of bytes freed.
+        """
+        cases_dir = os.path.join(self.root, "cases")
+        old = sorted((c for c in self.cases() if c != self.case),
+                     key=lambda c: os.path.getmtime(os.path.join(cases_dir, c)), reverse=True)[max(0, keep - 1):]
+        return self._delete_cases(old) if old else 0
+
+    def _delete_cases(self, cases):
+        """Removes case folders, then the objects only they linked to"""
+        released = set() # (dev, inode) of their objects: unlinking them changes their ctime
+        for case in cases:
+            case_dir = os.path.join(self.root, "cases", case)
+            for folder, _, files in os.walk(case_dir):
+                for name in files:
+                    try:
+                        st = os.stat(os.path.join(folder, name)) # Through symlinks too
+                    except OSError:
+                        continue
+                    released.add((st.st_dev, st.st_ino))
+            shutil.rmtree(case_dir, ignore_errors=True)
+        return self._sweep(released)
+
+    def _sweep(self, released=()):
+        """
+        Deletes objects no case links to anymore. Objects whose inode changed
+        since this store was opened (and that no deleted case released) are
+        left alone: another hunt on the same root may have published one and
+        not linked it yet.
+        """
+        # Objects still reached through symlinks (hardlinks show up in st_nlink)
+        referenced = set()
+        for folder, _, files in os.walk(os.path.join(self.root, "cases")):
+            for name in files:
+                path = os.path.join(folder, name)
+                if os.path.islink(path):
+                    referenced.add(os.path.realpath(path))
+
+        freed = 0
+        for folder, _, files in os.walk(self.objects_dir):
+            for name in files:
+                obj = os.path.join(folder, name)
+                try:
+                    st = os.stat(obj)
+                except OSError:
+                    continue # Swept meanwhile
+                if st.st_ctime >= self.opened and (st.st_dev, st.st_ino) not in released:
+                    continue
+                if st.st_nlink == 1 and os.path.realpath(obj) not in referenced:
+                    os.unlink(obj)
+                    freed += st.st_size
+        return freed
+
+    def _publish(self, sha256, data=None, source=None):
+        """Writes an object atomically (temp file + rename in the objects dir)"""
+        obj = self.object_path(sha256)
+        os.makedirs(os.path.dirname(obj), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(obj))
+        with os.fdopen(fd, 'wb') as out:
+            if data is not None:
+                out.write(data)
+            else:
+                with open(source, 'rb') as src:
+                    shutil.copyfileobj(src, out, 1024 * 1024)
+        os.replace(tmp, obj)
+
+
+def _free_name(path):
+    """`path` with a numeric suffix that doesn't exist yet"""
+    stem, ext = os.path.splitext(path)
+    n = 1
+    while os.path.lexists(f"{stem}_{n}{ext}"):
+        n += 1
+    return f"{stem}_{n}{ext}"
@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+# 🗄️ FORENSIX SENTINEL - ANALYSIS CACHE
+# Unchanged evidence is never analyzed twice.
+#
+# Lookup order:
+#   1. (device, inode, size, mtime_ns)  -> sha256   (no read at all)
+#   2. sha256 + scan mode + extension   -> stored report & findings
+# A miss costs nothing either: the result is stored under the sha256 the
+# analysis pass computed anyway, so a first scan still reads each file once.
+# Results are stamped with a hash of the analyzer source, so editing any
+# analyzer or the signature DB invalidates them automatically.
+
+CACHE_DIR = os.environ.get("FORENSIX_CACHE_DIR") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "forensix"
+)
+MAX_CACHE_BYTES = 512 * 1024 * 1024          # LRU eviction above this
+HASH_CHUNK = 1024 * 1024
+
+_VERSION = None
+
+
+def analyzer_version():
+    """Hash of every analyzer source file (core + modules)."""
+    global _VERSION
+    if _VERSION is None:
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        digest = hashlib.sha256()
+        for folder in ("core", "modules"):
+            path = os.path.join(package_root, folder)
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".py"):
+                    digest.update(name.encode())
+                    with open(os.path.join(path, name), "rb") as f:
+                        digest.update(f.read())
+        _VERSION = digest.hexdigest()[:16]
+    return _VERSION
+
+
+def content_digest(filepath):
+    """Streaming SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    def __init__(self, path=None, max_bytes=MAX_CACHE_BYTES):
+        self.path = path or os.path.join(CACHE_DIR, "analysis.db")
+        self.max_bytes = max_bytes
+        self.version = analyzer_version()
+        self.hits = 0
+        self.misses = 0
+
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS files (
+                dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER,
+                sha256 TEXT NOT NULL,
+                PRIMARY KEY (dev, ino, size, mtime_ns)
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                sha256 TEXT, mode TEXT, ext TEXT,
+                version TEXT NOT NULL,
+                report TEXT NOT NULL,
+                findings TEXT NOT NULL,
+                nbytes INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (sha256, mode, ext)
+            );
+            CREATE INDEX IF NOT EXISTS results_lru ON results (last_access);
+        """)
+        # Results from older analyzer code are useless
+        self.db.execute("DELETE FROM results WHERE version != ?", (self.version,))
+        self.db.commit()
+        self.total = self.db.execute("SELECT COALESCE(SUM(nbytes), 0) FROM results").fetchone()[0]
+
+    def lookup(self, filepath, deep=False, sha256=None):
+        """Returns {'report', 'findings'} for an already analyzed file, or None."""
+        try:
+            if sha256 is None:
+                sha256 = self.digest(filepath)
+
+            if sha256 is None:
+                self.misses += 1
+                return None
+
+            key = (sha256, self._mode(deep), self._ext(filepath))
+            row = self.db.execute(
+                "SELECT report, findings FROM results WHERE sha256=? AND mode=? AND ext=?", key
+            ).fetchone()
+            if not row:
+                self.misses += 1
+                return None
+
+            self.db.execute(
+                "UPDATE results SET last_access=? WHERE sha256=? AND mode=? AND ext=?", (time.time(),) + key
+            )
+            self.db.commit()
+            self.hits += 1
+
+            report = json.loads(row[0])
+            report['filename'] = os.path.basename(filepath)
+            return {"report": report, "findings": json.loads(row[1])}
+
+        except (OSError, sqlite3.Error, ValueError):
+            self.misses += 1
+            return None
+
+    def digest(self, filepath):
+        """
+        SHA-256 of a file seen before (stat key, no read), else None - the
+        analysis pass hashes it anyway.
+        """
+        try:
+            stat_key = self._stat_key(filepath)
+            row = self.db.execute(
+                "SELECT sha256 FROM files WHERE dev=? AND ino=? AND size=? AND mtime_ns=?", stat_key
+            ).fetchone()
+            return row[0] if row else None
+        except (OSError, sqlite3.Error):
+            return None
+
+    def store(self, filepath, deep, analyzer):
+        """Saves a finished FileAnalyzer's report (call before the report is decorated)."""
+        sha256 = analyzer.hashes.get('sha256')
+        if not analyzer.is_valid or not sha256:
+            return
+        try:
+            report = json.dumps(analyzer.get_report_data())
+            findings = json.dumps(analyzer.interesting_findings)
+            if os.path.isfile(filepath): # Streamed archive members have no inode
+                self._remember_file(self._stat_key(filepath), sha256, commit=False)
+            key = (sha256, self._mode(deep), self._ext(filepath))
+            old = self.db.execute("SELECT nbytes FROM results WHERE sha256=? AND mode=? AND ext=?", key).fetchone()
+            nbytes = len(report) + len(findings)
+            self.db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (self.version, report, findings, nbytes, time.time())
+            )
+            self.db.commit()
+            self.total += nbytes - (old[0] if old else 0)
+            self._evict()
+        except (OSError, sqlite3.Error, TypeError, ValueError):
+            pass
+
+    def close(self):
+        self.db.close()
+
+    def _evict(self):
+        """Drops least recently used results once the cache outgrows max_bytes (running total: no table scan)."""
+        if self.total <= self.max_bytes:
+            return
+        target = self.total - int(self.max_bytes * 0.9)
+        victims = []
+        for sha256, mode, ext, nbytes in self.db.execute(
+            "SELECT sha256, mode, ext, nbytes FROM results ORDER BY last_access"
+        ):
+            victims.append((sha256, mode, ext))
+            self.total -= nbytes
+            target -= nbytes
+            if target <= 0:
+                break
+        self.db.executemany("DELETE FROM results WHERE sha256=? AND mode=? AND ext=?", victims)
+        self.db.execute("DELETE FROM files WHERE sha256 NOT IN (SELECT sha256 FROM results)")
+        self.db.commit()
+
+    def _remember_file(self, stat_key, sha256, commit=True):
+        self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", stat_key + (sha256,))
+        if commit:
+            self.db.commit()
+
+    @staticmethod
+    def _stat_key(filepath):
+        st = os.stat(filepath)
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    @staticmethod
+    def _mode(deep):
+        return "deep" if deep else "surface"
+
+    @staticmethod
+    def _ext(filepath):
+        # Some analyzers are picked by extension, so it is part of the key
+        return os.path.splitext(filepath)[1].lower()
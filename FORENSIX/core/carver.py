@@ -0,0 +1,250 @@
+import os
+import re
+import mmap
+import zlib
+import struct
+import hashlib
+
+from .signatures import SIGNATURES
+
+# 🔪 FORENSIX SENTINEL - NATIVE CARVING ENGINE
+# Finds files embedded at ANY offset of an mmap'd blob and cuts them out.
+# Every candidate is validated by walking its own structure (chunk lengths,
+# segment markers, central directory...) so we know exactly where it ends.
+# No binwalk process, no guessing.
+# One regex pass finds every magic at once, plus every zip end-of-central-directory
+# record: each EOCD names the offset its archive starts at, so a local header is
+# sized by one lookup (a big host archive's members cost nothing).
+
+MAX_CARVE_SIZE = 512 * 1024 * 1024 # Largest object we will cut out
+WRITE_CHUNK = 1024 * 1024
+ZIP_EOCD = b'PK\x05\x06'
+
+
+def _png_end(data, start, limit):
+    pos = start + 8
+    first = True
+    while pos + 12 <= limit:
+        length, ctype = struct.unpack_from('>I4s', data, pos)
+        if not ctype.isalpha() or (first and ctype != b'IHDR'):
+            return None
+        pos += 12 + length
+        if ctype == b'IEND':
+            return pos if pos <= limit else None
+        first = False
+    return None
+
+
+def _jpeg_end(data, start, limit):
+    pos = start + 2
+    while pos + 4 <= limit:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF: # Fill byte
+            pos += 1
+            continue
+        if marker == 0xD9: # EOI
+            return pos + 2
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        length = struct.unpack_from('>H', data, pos + 2)[0]
+        if length < 2:
+            return None
+        pos += 2 + length
+        if marker == 0xDA:
+            # Entropy-coded scan: runs until a marker that isn't stuffing/RST
+            while True:
+                pos = data.find(b'\xFF', pos, limit)
+                if pos == -1 or pos + 1 >= limit:
+                    return None
+                follow = data[pos + 1]
+                if follow == 0x00 or 0xD0 <= follow <= 0xD7:
+                    pos += 2
+                    continue
+                break
+    return None
+
+
+def _zip_starts(data, eocds):
+    """{archive start: archive end} from EOCD offsets (the first EOCD pointing back wins)"""
+    starts = {}
+    for eocd in eocds:
+        if eocd + 22 > len(data):
+            continue
+        cd_size, cd_offset, comment_len = struct.unpack_from('<IIH', data, eocd + 12)
+        start = eocd - cd_size - cd_offset # The central directory ends at the EOCD
+        end = eocd + 22 + comment_len
+        if start >= 0 and end <= len(data):
+            starts.setdefault(start, end)
+    return starts
+
+
+def _gzip_end(data, start, limit):
+    if start + 18 > limit or data[start + 2] != 0x08: # Deflate only
+        return None
+    inflater = zlib.decompressobj(31)
+    pos = start
+    try:
+        while pos < limit and not inflater.eof:
+            chunk = data[pos:min(pos + WRITE_CHUNK, limit)]
+            pos += len(chunk)
+            while chunk and not inflater.eof:
+                inflater.decompress(chunk, WRITE_CHUNK) # Output discarded (bounded)
+                chunk = inflater.unconsumed_tail
+    except zlib.error:
+        return None
+    return pos - len(inflater.unused_data) if inflater.eof else None
+
+
+def _gif_end(data, start, limit):
+    pos = start + 13
+    if pos > limit:
+        return None
+    flags = data[start + 10]
+    if flags & 0x80: # Global color table
+        pos += 3 * (2 << (flags & 0x07))
+
+    def skip_sub_blocks(pos):
+        while pos < limit:
+            size = data[pos]
+            pos += 1 + size
+            if size == 0:
+                return pos
+        return None
+
+    while pos is not None and pos < limit:
+        block = data[pos]
+        if block == 0x3B: # Trailer
+            return pos + 1
+        if block == 0x21: # Extension
+            pos = skip_sub_blocks(pos + 2)
+        elif block == 0x2C: # Image descriptor
+            if pos + 10 > limit:
+                return None
+            flags = data[pos + 9]
+            pos += 10
+            if flags & 0x80: # Local color table
+                pos += 3 * (2 << (flags & 0x07))
+            pos = skip_sub_blocks(pos + 1) # +1: LZW minimum code size
+        else:
+            return None
+    return None
+
+
+def _bmp_end(data, start, limit):
+    if start + 18 > limit:
+        return None
+    size, reserved, pixels, dib = struct.unpack_from('<IIII', data, start + 2)
+    if reserved != 0 or dib not in (12, 40, 52, 56, 108, 124) or not (14 + dib <= pixels < size):
+        return None
+    end = start + size
+    return end if end <= limit else None
+
+
+def _pdf_end(data, start, limit):
+    # Last %%EOF before the next PDF header (incremental updates append more)
+    stop = data.find(b'%PDF-', start + 5, limit)
+    stop = limit if stop == -1 else stop
+    eof = data.rfind(b'%%EOF', start, stop)
+    if eof == -1:
+        return None
+    end = eof + 5
+    while end < stop and data[end] in (0x0D, 0x0A):
+        end += 1
+    return end
+
+
+def _7z_end(data, start, limit):
+    if start + 32 > limit:
+        return None
+    header_crc, next_offset, next_size = struct.unpack_from('<IQQ', data, start + 8)
+    if zlib.crc32(data[start + 12:start + 32]) != header_crc:
+        return None
+    end = start + 32 + next_offset + next_size
+    return end if end <= limit else None
+
+
+# mime: (structure walker, extension for carved files)
+CARVERS = {
+    "image/png": (_png_end, "png"),
+    "image/jpeg": (_jpeg_end, "jpg"),
+    "application/zip": (None, "zip"), # Sized from the EOCD records scan() collects
+    "application/gzip": (_gzip_end, "gz"),
+    "image/gif": (_gif_end, "gif"),
+    "image/bmp": (_bmp_end, "bmp"),
+    "application/pdf": (_pdf_end, "pdf"),
+    "application/x-7z-compressed": (_7z_end, "7z"),
+}
+
+
+class Carver:
+    def __init__(self, output_dir, max_size=MAX_CARVE_SIZE):
+        self.output_dir = output_dir
+        self.max_size = max_size
+        self.digests = {}  # carved path -> sha256, hashed while it is written
+        # Every SIGNATURES magic we know how to size (+ the zip EOCD, to size zips)
+        self.magics = {magic: mime for magic, mime in SIGNATURES.items() if mime in CARVERS}
+        magics = sorted(set(self.magics) | {ZIP_EOCD}, key=len, reverse=True)
+        self.pattern = re.compile(b'|'.join(re.escape(magic) for magic in magics))
+
+    def scan(self, data):
+        """Returns (offset, end, mime) for every validated embedded object."""
+        size = len(data)
+        candidates = []
+        eocds = []
+        # One pass; searching again from match + 1 keeps overlapping magics
+        match = self.pattern.search(data, 1) # Offset 0 is the host file itself
+        while match:
+            magic = match.group()
+            if magic == ZIP_EOCD:
+                eocds.append(match.start())
+            else:
+                candidates.append((match.start(), self.magics[magic]))
+            match = self.pattern.search(data, match.start() + 1)
+        zips = _zip_starts(data, eocds) if eocds else {}
+
+        objects = []
+        covered = 0
+        for offset, mime in candidates:
+            if offset < covered:
+                continue # Inside an object we already carved (found when it is processed)
+            limit = min(size, offset + self.max_size)
+            walker = CARVERS[mime][0]
+            if walker is None: # Zip: only an EOCD pointing back here makes it one
+                end = zips.get(offset)
+                end = end if end and end <= limit else None
+            else:
+                try:
+                    end = walker(data, offset, limit)
+                except (struct.error, IndexError):
+                    end = None
+            if end:
+                objects.append((offset, end, mime))
+                covered = end
+        return objects
+
+    def carve(self, filepath):
+        """Scans `filepath` and writes each embedded object to output_dir."""
+        if os.path.getsize(filepath) == 0:
+            return []
+        carved = []
+        with open(filepath, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                objects = self.scan(mm)
+                if objects and not os.path.exists(self.output_dir):
+                    os.makedirs(self.output_dir)
+
+                base = os.path.basename(filepath)
+                for offset, end, mime in objects:
+                    out_path = os.path.join(self.output_dir, f"{base}_carved_{offset:x}.{CARVERS[mime][1]}")
+                    digest = hashlib.sha256()
+                    with open(out_path, 'wb') as out:
+                        for pos in range(offset, end, WRITE_CHUNK):
+                            piece = mm[pos:min(pos + WRITE_CHUNK, end)]
+                            digest.update(piece)
+                            out.write(piece)
+                    self.digests[out_path] = digest.hexdigest()
+                    carved.append(out_path)
+        return carved
@@ -0,0 +1,42 @@
+# 🧬 FORENSIX SENTINEL - CONTENT DEDUPLICATION
+# Recursive extraction keeps producing the same bytes under new paths
+# (nested archives extracted twice, identical members across 50 archives).
+# Files are keyed by SHA-256: the first path is canonical and analyzed,
+# every later path just points at it, so reports still list them all.
+# Nothing is read just to hash it: hashes come from the stream that produced
+# the file (archive members) or from its own analysis pass.
+
+
+class ContentIndex:
+    def __init__(self, digest=None):
+        self.canonical = {}  # sha256 -> first path seen with that content
+        self.aliases = {}    # duplicate path -> canonical path
+        self.known = {}      # path -> sha256 learned while the file streamed through
+        self._digest = digest  # Optional no-read digest (e.g. AnalysisCache.digest: stat key)
+
+    def remember(self, path, sha256):
+        """Records a hash computed while the file was written/analyzed (no re-read)."""
+        if sha256:
+            self.known[path] = sha256
+
+    def digest(self, path):
+        """SHA-256 of `path` if already known, else None (claim it with the hash its analysis computes)."""
+        if path in self.known:
+            return self.known[path]
+        sha256 = self._digest(path) if self._digest else None
+        self.remember(path, sha256)
+        return sha256
+
+    def claim(self, path, sha256):
+        """Registers `path`. Returns the canonical path if this content was already seen, else None."""
+        first = self.canonical.setdefault(sha256, path)
+        if first == path:
+            return None
+        self.aliases[path] = first
+        return first
+
+    def duplicates_of(self, path):
+        return [dup for dup, first in self.aliases.items() if first == path]
+
+    def __len__(self):
+        return len(self.aliases)
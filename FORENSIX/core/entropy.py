@@ -0,0 +1,141 @@
+import math
+from array import array
+from collections import Counter
+
+# 📊 FORENSIX SENTINEL - ENTROPY ENGINE
+# One histogram pass per block: whole-file entropy + a per-block entropy map.
+
+# NumPy is optional (vectorized histograms when present)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+DEFAULT_BLOCK_SIZE = 64 * 1024  # Granularity of the entropy map
+MAX_BLOCKS = 4096               # Map size cap (block size grows for huge files)
+HIGH_ENTROPY = 7.2              # Compressed / encrypted territory
+
+
+def byte_histogram(data):
+    """Counts of each byte value (0-255) in `data`."""
+    if NUMPY_AVAILABLE:
+        return np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+    counts = [0] * 256
+    for value, count in Counter(data).items():
+        counts[value] = count
+    return counts
+
+
+def shannon_entropy(counts, total=None):
+    """Shannon entropy (bits per byte) of a byte histogram."""
+    if total is None:
+        total = int(sum(counts))
+    if not total:
+        return 0.0
+    if NUMPY_AVAILABLE:
+        counts = np.asarray(counts, dtype=np.float64)
+        p = counts[counts > 0] / total
+        return float(-(p * np.log2(p)).sum())
+    entropy = 0.0
+    for count in counts:
+        if count:
+            p_x = count / total
+            entropy -= p_x * math.log(p_x, 2)
+    return entropy
+
+
+class EntropyProfile:
+    """
+    Accumulates the byte histogram of a stream block by block.
+    Produces the whole-file entropy plus one entropy value per block,
+    which shows *where* the packed/encrypted regions sit inside a blob.
+    """
+    def __init__(self, filesize=0, block_size=DEFAULT_BLOCK_SIZE):
+        # Keep the map bounded: double the block size until it fits
+        while filesize > block_size * MAX_BLOCKS:
+            block_size *= 2
+        self.block_size = block_size
+        self.total = 0
+        self.histogram = np.zeros(256, dtype=np.int64) if NUMPY_AVAILABLE else [0] * 256
+        self.blocks = array('f')
+        # Block split over chunks: only its histogram is kept (no byte copies)
+        self._partial = None
+        self._partial_size = 0
+
+    def update(self, chunk):
+        """Feeds the next piece of the stream (any length)."""
+        view = memoryview(chunk)
+        start = 0
+
+        # Complete a block left over from the previous chunk
+        if self._partial_size:
+            piece = view[:self.block_size - self._partial_size]
+            self._partial = _add_counts(self._partial, byte_histogram(piece))
+            self._partial_size += len(piece)
+            start = len(piece)
+            if self._partial_size < self.block_size:
+                return
+            self._add_block(self._partial, self._partial_size)
+            self._partial, self._partial_size = None, 0
+
+        # Whole blocks straight from the caller's buffer
+        end = len(view)
+        while end - start >= self.block_size:
+            self._add_block(byte_histogram(view[start:start + self.block_size]), self.block_size)
+            start += self.block_size
+
+        if start < end:
+            self._partial = byte_histogram(view[start:end])
+            self._partial_size = end - start
+
+    def finish(self):
+        """Flushes the trailing partial block."""
+        if self._partial_size:
+            self._add_block(self._partial, self._partial_size)
+            self._partial, self._partial_size = None, 0
+        return self
+
+    def _add_block(self, counts, size):
+        self.histogram = _add_counts(self.histogram, counts)
+        self.total += size
+        self.blocks.append(shannon_entropy(counts, size))
+
+    @property
+    def entropy(self):
+        return shannon_entropy(self.histogram, self.total)
+
+    def regions(self, threshold=HIGH_ENTROPY):
+        """Merges consecutive blocks above `threshold` into byte regions."""
+        regions = []
+        for index, value in enumerate(self.blocks):
+            if value < threshold:
+                continue
+            offset = index * self.block_size
+            size = min(self.block_size, self.total - offset)
+            last = regions[-1] if regions else None
+            if last and last['offset'] + last['size'] == offset:
+                # Running size-weighted mean over the merged blocks
+                merged = last['size'] + size
+                last['entropy'] = (last['entropy'] * last['size'] + value * size) / merged
+                last['size'] = merged
+            else:
+                regions.append({'offset': offset, 'size': size, 'entropy': value})
+
+        for region in regions:
+            region['entropy'] = round(region['entropy'], 2)
+        return regions
+
+    def entropy_map(self):
+        """Per-block entropy values, rounded for reporting."""
+        return [round(value, 2) for value in self.blocks]
+
+
+def _add_counts(total, counts):
+    """total += counts for two byte histograms (NumPy arrays or lists)"""
+    if NUMPY_AVAILABLE:
+        total += counts
+        return total
+    for value, count in enumerate(counts):
+        total[value] += count
+    return total
@@ -0,0 +1,105 @@
+import io
+import os
+import mmap
+
+# 🧾 FORENSIX SENTINEL - EVIDENCE BUFFER
+# A file is opened once and every analyzer walks the same bytes.
+# Small files are read into a single `bytes`; large ones are mmap'd,
+# so peak RSS per file is at most one copy (page cache for big files).
+
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+
+class EvidenceBuffer:
+    """Read-only, zero-copy view of one piece of evidence."""
+    def __init__(self, filepath=None, data=None):
+        self.filepath = filepath
+        self._file = None
+        self._mmap = None
+
+        if data is None:
+            size = os.path.getsize(filepath)
+            if size > MMAP_THRESHOLD:
+                self._file = open(filepath, 'rb')
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                data = self._mmap
+            else:
+                with open(filepath, 'rb') as f:
+                    data = f.read()
+
+        self.data = data  # bytes or mmap (both support find/rfind)
+        self.view = memoryview(data)
+        self.size = len(self.view)
+
+    @classmethod
+    def from_bytes(cls, data, name=None):
+        return cls(filepath=name, data=data)
+
+    @property
+    def is_mapped(self):
+        return self._mmap is not None
+
+    def head(self, size):
+        return bytes(self.view[:size])
+
+    def startswith(self, prefix):
+        return self.view[:len(prefix)] == prefix
+
+    def find(self, sub, start=0, end=None):
+        return self.data.find(sub, start, self.size if end is None else end)
+
+    def rfind(self, sub, start=0, end=None):
+        return self.data.rfind(sub, start, self.size if end is None else end)
+
+    def reader(self):
+        """File-like object over the buffer (for wave, zipfile, ...)."""
+        return _ViewReader(self.view)
+
+    def close(self):
+        try:
+            self.view.release()
+            if self._mmap is not None:
+                self._mmap.close()
+        except BufferError:
+            pass # A slice is still alive somewhere; the GC will unmap it
+        if self._file is not None:
+            self._file.close()
+
+    def __len__(self):
+        return self.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _ViewReader(io.RawIOBase):
+    """Seekable reader over a memoryview without copying the whole buffer."""
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
@@ -5,92 +5,142 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 import hashlib
 import re
-import math
 from datetime import datetime
-from .signatures import detect_signature
+from .signatures import detect_signature, SIGNATURE_SPAN
+from .entropy import EntropyProfile, DEFAULT_BLOCK_SIZE
+from .secret_scanner import SCANNER
+from .evidence import EvidenceBuffer
+from .page_map import page_runs
+
+# Streaming pipeline tuning
+CHUNK_SIZE = 1024 * 1024        # Bytes read per block (memory stays constant)
+STRINGS_LIMIT = 5000            # Strings kept in RAM for the report / flag hunt
+MAX_STRING_CARRY = 64 * 1024    # Longest run carried over a block boundary
+FINDINGS_LIMIT = 1000           # Findings kept per file (the rest is only counted)
+PATTERN_HITS_LIMIT = 100        # Secret hits kept (with offsets) per pattern type
+
+ASCII_STRING = re.compile(b'[ -~]{4,}')
+UNICODE_STRING = re.compile(b'(?:[ -~]\x00){4,}')
+PRINTABLE = frozenset(range(0x20, 0x7F))
 
 class FileAnalyzer:
-    def __init__(self, filepath):
+    def __init__(self, filepath, entropy_block_size=DEFAULT_BLOCK_SIZE, member=None, workers=None):
         self.filepath = filepath
+        self.member = member # Streamed ArchiveMember (filepath is then its virtual path)
+        self.workers = workers # Pool size for sub-analyzers (None = all cores, 1 inside a pool worker)
         self.filename = os.path.basename(filepath)
         self.filesize = 0
         self.filetype = "unknown"
         self.hashes = {}
         self.metadata = {}
         self.strings = []
+        self.strings_count = 0
         self.entropy = 0
+        self.entropy_block_size = entropy_block_size
+        self.entropy_map = []
+        self.entropy_regions = []
         self.interesting_findings = []
+        self.findings_dropped = 0 # Findings past FINDINGS_LIMIT
+        self.pattern_hits = []   # First PATTERN_HITS_LIMIT secret hits of each type, with byte offsets
+        self.pattern_counts = {} # Type -> every hit counted
         self.is_valid = False
 
     def analyze(self, deep=False):
         """Main analysis pipeline"""
-        if not os.path.exists(self.filepath):
+        if self.member is None and not os.path.exists(self.filepath):
             return False
             
+        buffer = None
         try:
-            self.filesize = os.path.getsize(self.filepath)
+            self.filesize = self.member.size if self.member else os.path.getsize(self.filepath)
             
-            # 1. SMART READ (Prevent Memory Explosion)
-            # Read header for detection first
-            with open(self.filepath, 'rb') as f:
-                head = f.read(2048)
-                
-            # 2. Magic Byte & Text Detection
-            self.filetype = detect_signature(head, self.filepath)
+            # 1. SHARED EVIDENCE BUFFER (opened once; mmap'd when large)
+            # Every specialized analyzer below walks this same buffer
+            buffer = self.member.buffer() if self.member else EvidenceBuffer(self.filepath)
+            view = buffer.view
+
+            # 2. SINGLE-PASS STREAM (Constant memory, any file size)
+            # Every block feeds hashes, histogram, strings & secret scanner at once
+            digests = {name: hashlib.new(name) for name in ('md5', 'sha1', 'sha256')}
+            profile = EntropyProfile(self.filesize, self.entropy_block_size)
+            strings_stream = None
+            secrets_stream = None
+
+            # Magic Byte & Text Detection
+            self.filetype = detect_signature(buffer.head(SIGNATURE_SPAN), self.filepath)
             
-            # Decisions based on size
-            is_large_file = self.filesize > 100 * 1024 * 1024 # 100MB limit for RAM operations
-            content = b""
-
-            # 3. Full Content Analysis (Only for small files)
-            if not is_large_file:
-                with open(self.filepath, 'rb') as f:
-                    content = f.read()
-                
-                # Integrity & Entropy (Small files only)
-                self.hashes['sha256'] = hashlib.sha256(content).hexdigest()
-                self.entropy = self._calculate_entropy(content)
-                
-                # Deep Text Analysis
-                if deep or "text" in self.filetype:
-                    self.strings = self._extract_strings(content)
-                    self._find_interesting_patterns()
-            else:
-                self.interesting_findings.append(f"INFO: Large file ({self.filesize/1024/1024:.0f}MB). Skipped deep string/entropy scan.")
+            # Deep Text Analysis
+            if deep or "text" in self.filetype:
+                strings_stream = _StringStream(self)
+                secrets_stream = SCANNER.stream()
+            # RAM captures: strings/secrets only visit non-constant pages
+            sparse = "memory-dump" in self.filetype
+            expected = 0
+
+            for start in range(0, buffer.size, CHUNK_SIZE):
+                chunk = view[start:start + CHUNK_SIZE]
+                for digest in digests.values():
+                    digest.update(chunk)
+                profile.update(chunk)
+                if strings_stream and sparse:
+                    for run_start, run_end in page_runs(chunk)[0]:
+                        if start + run_start != expected:
+                            # Skipped constant pages: close the runs in flight, restart after the gap
+                            strings_stream.jump(start + run_start)
+                            self._record_secrets(secrets_stream.jump(start + run_start))
+                        strings_stream.feed(chunk[run_start:run_end])
+                        self._record_secrets(secrets_stream.feed(chunk[run_start:run_end]))
+                        expected = start + run_end
+                elif strings_stream:
+                    strings_stream.feed(chunk)
+                    self._record_secrets(secrets_stream.feed(chunk))
+                chunk.release()
+
+            if strings_stream:
+                strings_stream.feed(b"", final=True)
+                self._record_secrets(secrets_stream.feed(b"", final=True))
+
+            # 3. Integrity & Entropy
+            self.hashes = {name: digest.hexdigest() for name, digest in digests.items()}
+            profile.finish()
+            self.entropy = profile.entropy
+            self.entropy_block_size = profile.block_size
+            self.entropy_map = profile.entropy_map()
+            self.entropy_regions = profile.regions()
 
             # 4. Metadata (Always safe)
-            stats = os.stat(self.filepath)
-            self.metadata['modified'] = datetime.fromtimestamp(stats.st_mtime).isoformat()
+            mtime = self.member.mtime if self.member else os.stat(self.filepath).st_mtime
+            self.metadata['modified'] = datetime.fromtimestamp(mtime).isoformat()
             
             # --- SPECIALIZED ANALYZERS (Safe for Large Files) ---
 
             # 5. Steganography Check (Images)
-            if deep and "image" in self.filetype and not is_large_file:
+            if deep and "image" in self.filetype:
                 try: from forensix.modules.stego import StegoDetector
                 except ImportError: from modules.stego import StegoDetector
                 
-                stego = StegoDetector(self.filepath)
+                stego = StegoDetector(self.filepath, buffer)
                 stego_findings = stego.scan()
                 if stego_findings:
-                    self.interesting_findings.extend(stego_findings)
+                    self._add_findings(stego_findings)
 
             # 6. Network Forensics (PCAP)
             if "pcap" in self.filetype:
                 try: from forensix.modules.pcap_analyzer import PcapAnalyzer
                 except ImportError: from modules.pcap_analyzer import PcapAnalyzer
                 
-                pcap_engine = PcapAnalyzer(self.filepath)
+                pcap_engine = PcapAnalyzer(self._real_path(), workers=self.workers)
                 pcap_findings = pcap_engine.analyze()
                 if pcap_findings:
-                    self.interesting_findings.extend(pcap_findings)
+                    self._add_findings(pcap_findings)
 
             # 7. Audio Analysis (WAV/MP3)
             if "audio" in self.filetype or self.filepath.endswith(('.wav', '.mp3')):
                 try: from forensix.modules.audio import AudioAnalyzer
                 except ImportError: from modules.audio import AudioAnalyzer
                 
-                audio_engine = AudioAnalyzer(self.filepath)
-                self.interesting_findings.extend(audio_engine.analyze())
+                audio_engine = AudioAnalyzer(self.filepath, buffer)
+                self._add_findings(audio_engine.analyze())
 
             # 8. Memory Dump Analysis (Designed for huge files via mmap)
             if "memory-dump" in self.filetype or self.filesize > 500 * 1024 * 1024:
@@ -99,16 +149,23 @@ class FileAnalyzer:
                      try: from forensix.modules.memory import MemoryAnalyzer
                      except ImportError: from modules.memory import MemoryAnalyzer
                      
-                     mem_engine = MemoryAnalyzer(self.filepath)
-                     self.interesting_findings.extend(mem_engine.analyze())
+                     mem_engine = MemoryAnalyzer(self._real_path(), buffer, workers=self.workers,
+                                                 sha256=self.hashes.get('sha256'))
+                     self._add_findings(mem_engine.analyze())
                 
             # 9. Document Metadata (Office/PDF)
             if self.filepath.endswith(('.docx', '.xlsx', '.pptx', '.pdf')):
                 try: from forensix.modules.metadata import MetadataExtractor
                 except ImportError: from modules.metadata import MetadataExtractor
                 
-                meta_engine = MetadataExtractor(self.filepath)
-                self.interesting_findings.extend(meta_engine.analyze())
+                meta_engine = MetadataExtractor(self.filepath, buffer)
+                self._add_findings(meta_engine.analyze())
+
+            for name, count in self.pattern_counts.items():
+                if count > PATTERN_HITS_LIMIT:
+                    self._add_findings([f"{name}: {count} hits in total (first {PATTERN_HITS_LIMIT} listed)"])
+            if self.findings_dropped:
+                self.interesting_findings.append(f"... and {self.findings_dropped} more findings")
 
             self.is_valid = True
             return True
@@ -117,59 +174,65 @@ class FileAnalyzer:
             self.interesting_findings.append(f"Analysis Error: {str(e)}")
             return False
 
-    def _calculate_entropy(self, data):
-        """Calculates Shannon entropy."""
-        if not data:
-            return 0
-        entropy = 0
-        for x in range(256):
-            p_x = float(data.count(x))/len(data)
-            if p_x > 0:
-                entropy += - p_x * math.log(p_x, 2)
-        return entropy
-
-    def _extract_strings(self, data, min_len=4):
-        """Extracts printable strings (ASCII & Unicode)"""
+        finally:
+            if buffer is not None:
+                buffer.close()
+
+    def _real_path(self):
+        """Path on disk for analyzers that shell out (streamed members are spilled once)"""
+        return self.member.realize() if self.member else self.filepath
+
+    def _extract_strings(self, data, min_len=4, stop=None, base=0):
+        """Extracts printable strings (ASCII & Unicode) starting before `stop`"""
         results = []
-        # ASCII characters range (usually 32-126) plus tab (9)
-        ascii_pattern = re.compile(b'[ -~]{4,}')
-        unicode_pattern = re.compile(b'(?:[ -~]\x00){4,}')
-
-        # Limit total strings to avoid memory explosion on large binaries
-        limit = 5000 
-        
-        for match in ascii_pattern.finditer(data):
-            if len(results) >= limit: break
+        if stop is None:
+            stop = len(data)
+
+        for match in ASCII_STRING.finditer(data):
+            if match.start() >= stop: break
             try:
                 results.append(match.group().decode('ascii'))
             except: pass
                 
-        for match in unicode_pattern.finditer(data):
-            if len(results) >= limit: break
+        for match in UNICODE_STRING.finditer(data):
+            if match.start() >= stop: break
             try:
-                results.append(match.group().decode('utf-16le'))
+                text = match.group().decode('utf-16le')
+                results.append(text)
+                # The raw-byte scanner only sees ASCII, so wide strings are checked here
+                self._find_interesting_patterns(text.encode('ascii'), base + match.start(), step=2)
             except: pass
                 
         return results
 
-    def _find_interesting_patterns(self):
-        """Scans extracted strings for secrets/flags"""
-        patterns = {
-            "FLAG": re.compile(r'(CTF\{.+?\}|flag\{.+?\})', re.IGNORECASE),
-            "API_KEY": re.compile(r'(api_key|apikey|secret|token)[\"\']?\s*[:=]\s*[\"\']?([a-zA-Z0-9_\-]{20,})', re.IGNORECASE),
-            "URL": re.compile(r'(https?|ftp)://[a-zA-Z0-9\-\.]+\.[a-zA-Z]{2,}(?:/[^\s<>"]*)?', re.IGNORECASE),
-            "EMAIL": re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', re.IGNORECASE),
-            "IP": re.compile(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b')
-        }
-        
-        for s in self.strings:
-            for name, pattern in patterns.items():
-                match = pattern.search(s)
-                if match:
-                    # Capture the full match or specific group
-                    val = match.group(0)
-                    if len(val) < 200: # Sanity check length
-                        self.interesting_findings.append(f"{name}: {val}")
+    def _collect_strings(self, new_strings):
+        """Counts every string and keeps the first STRINGS_LIMIT"""
+        self.strings_count += len(new_strings)
+        room = STRINGS_LIMIT - len(self.strings)
+        if room > 0:
+            self.strings.extend(new_strings[:room])
+
+    def _find_interesting_patterns(self, data, base=0, step=1):
+        """Scans a buffer for secrets/flags (offsets mapped back to the file)"""
+        self._record_secrets(
+            (name, base + offset * step, value) for name, offset, value in SCANNER.scan(data)
+        )
+
+    def _record_secrets(self, hits):
+        for name, offset, value in hits:
+            seen = self.pattern_counts.get(name, 0)
+            self.pattern_counts[name] = seen + 1
+            if seen >= PATTERN_HITS_LIMIT:
+                continue
+            self.pattern_hits.append({"type": name, "offset": offset, "value": value})
+            self._add_findings([f"{name}: {value}"])
+
+    def _add_findings(self, findings):
+        """Keeps the first FINDINGS_LIMIT findings and counts the rest"""
+        room = FINDINGS_LIMIT - len(self.interesting_findings)
+        if room > 0:
+            self.interesting_findings.extend(findings[:room])
+        self.findings_dropped += max(0, len(findings) - max(room, 0))
 
     def get_report_data(self):
         """Returns structured data for the report"""
@@ -178,8 +241,58 @@ class FileAnalyzer:
             "type": self.filetype,
             "size_bytes": self.filesize,
             "entropy": round(self.entropy, 2),
+            "entropy_block_size": self.entropy_block_size,
+            "entropy_map": self.entropy_map,
+            "entropy_regions": self.entropy_regions, # High-entropy byte ranges
             "hashes": self.hashes,
             "metadata": self.metadata,
             "findings": self.interesting_findings[:5], # Top 5 findings
-            "strings_count": len(self.strings)
+            "strings_count": self.strings_count,
+            "pattern_hits": self.pattern_hits,
+            "pattern_counts": self.pattern_counts
         }
+
+
+class _StringStream:
+    """
+    Feeds consecutive blocks to the strings extractor.
+    A printable run touching the end of a block may continue in the next one,
+    so it is carried over instead of being split in two.
+    """
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.carry = b""
+        self.offset = 0 # Stream offset of carry[0]
+
+    def feed(self, chunk, final=False):
+        data = self.carry + chunk if self.carry else chunk
+        cut = len(data) if final else len(data) - _trailing_run(data)
+        self.carry = bytes(data[cut:]) # Copy: never pin the evidence buffer
+        if cut:
+            self.analyzer._collect_strings(self.analyzer._extract_strings(data, stop=cut, base=self.offset))
+            self.offset += cut
+
+    def jump(self, offset):
+        """Ends the current run and continues at `offset` (bytes in between are skipped)"""
+        self.feed(b"", final=True)
+        self.offset = offset
+
+
+def _trailing_run(data, limit=MAX_STRING_CARRY):
+    """Length of the printable tail (ASCII or UTF-16LE) that may continue past `data`"""
+    end = len(data)
+    floor = max(0, end - limit)
+
+    # ASCII run
+    i = end
+    while i > floor and data[i - 1] in PRINTABLE:
+        i -= 1
+
+    # UTF-16LE run (may end on a dangling printable half)
+    j = end
+    if j > floor and data[j - 1] in PRINTABLE:
+        j -= 1
+    while j - 2 >= floor and data[j - 1] == 0 and data[j - 2] in PRINTABLE:
+        j -= 2
+
+    return max(end - i, end - j)
@@ -0,0 +1,332 @@
+import os
+import json
+import mmap
+import socket
+import struct
+import sqlite3
+from collections import OrderedDict
+
+from .cache import CACHE_DIR, analyzer_version
+from .hit_index import index_path as _index_path
+from . import pcap_reader
+from .tcp_reassembly import TcpReassembler, STREAM_CAP
+
+# 🗂️ FORENSIX SENTINEL - PCAP FLOW INDEX
+# While a capture is analyzed, a SQLite sidecar records:
+#   flows    one row per flow (both directions): 5-tuple, first/last time, packets, payload bytes
+#   frames   every packet of a flow (file offset, payload range, seq, flags, direction),
+#            packed 26 bytes per packet into a few BLOB rows per flow - far fewer rows
+#            than one per packet, which keeps the indexing cost of a first pass low
+#   dns      every DNS query name      http   every HTTP request (host, path)
+# A flow's id is the file offset of its first packet (stable, unique, shard-safe).
+# Re-opening the capture reuses the finished index: the summary comes back without
+# a rescan, and drill-down queries ("flows to host X", "payload of flow N") are
+# index lookups plus a few reads from the mmap'd capture.
+# Building stays bounded: packet layouts buffered in RAM (per flow and in pending
+# frames rows) share one byte budget - past it the least recently used flows'
+# layouts are written out. Sidecars are pruned least recently used first once
+# the folder outgrows MAX_INDEX_BYTES.
+
+INDEX_DIR = os.path.join(CACHE_DIR, "flows")
+MAX_ACTIVE = 100000  # Flows held in RAM while building (LRU: older ones are written out)
+BATCH = 10000        # Rows buffered per table before an executemany
+CHUNK_BYTES = 16 * 1024 # Packed packet layout held per flow before it is written out
+LAYOUT_BUDGET = 64 * 1024 * 1024        # Layout bytes buffered across all flows
+MAX_INDEX_BYTES = 4 * 1024 * 1024 * 1024 # Sidecars kept in INDEX_DIR
+
+# record offset, payload start, payload length, tcp seq, tcp flags, outbound (initiator -> responder)
+PACKET = struct.Struct('<QQIIBB')
+
+
+def index_path(filepath):
+    """Sidecar for one capture (a changed capture or analyzer gets a fresh index)"""
+    return _index_path(filepath, analyzer_version(), INDEX_DIR)
+
+
+def prune_indexes(keep=None, limit=MAX_INDEX_BYTES, folder=INDEX_DIR):
+    """
+    Deletes the least recently used sidecars (never `keep`) until `folder`
+    fits in `limit` bytes. Returns the number of bytes freed.
+    """
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return 0
+    total = 0
+    sidecars = [] # (mtime, size, files)
+    for name in names:
+        if not name.endswith(".db"):
+            continue
+        path = os.path.join(folder, name)
+        files = [f for f in (path, path + "-wal", path + "-shm") if os.path.exists(f)]
+        try:
+            size = sum(os.path.getsize(f) for f in files)
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue # Deleted meanwhile
+        total += size
+        if path != keep:
+            sidecars.append((mtime, size, files))
+
+    freed = 0
+    for _, size, files in sorted(sidecars, key=lambda sidecar: sidecar[0]):
+        if total - freed <= limit:
+            break
+        for f in files:
+            try:
+                os.remove(f)
+            except OSError:
+                pass
+        freed += size
+    return freed
+
+
+class FlowRecord:
+    __slots__ = ("id", "proto", "src", "sport", "dst", "dport", "first_ts", "last_ts", "packets", "bytes",
+                 "layout", "parts")
+
+    def __init__(self, pkt):
+        self.id = pkt.offset
+        self.proto = pkt.proto
+        self.src, self.sport = pkt.src, pkt.sport # Initiator = first packet's sender
+        self.dst, self.dport = pkt.dst, pkt.dport
+        self.first_ts = self.last_ts = pkt.ts
+        self.packets = 0
+        self.bytes = 0
+        self.layout = bytearray() # Packed PACKET entries not written yet
+        self.parts = 0            # BLOB rows written so far
+
+
+class FlowIndex:
+    def __init__(self, path=":memory:", capture=None, max_active=MAX_ACTIVE, budget=LAYOUT_BUDGET):
+        self.path = path
+        self.capture = capture # The pcap the offsets point into
+        self.max_active = max_active
+        self.budget = budget
+        self.buffered = 0      # Layout bytes in RAM (flows + frames rows not inserted yet)
+        self.active = OrderedDict() # Flow key -> FlowRecord (still being built)
+        self._rows = {"frames": [], "dns": [], "http": []}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=OFF;
+            CREATE TABLE IF NOT EXISTS flows (
+                id INTEGER PRIMARY KEY, proto INTEGER,
+                src TEXT, sport INTEGER, dst TEXT, dport INTEGER,
+                first_ts REAL, last_ts REAL, packets INTEGER, bytes INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS frames (flow INTEGER, part INTEGER, layout BLOB);
+            CREATE TABLE IF NOT EXISTS dns (query TEXT, flow INTEGER, ts REAL);
+            CREATE TABLE IF NOT EXISTS http (host TEXT, path TEXT, flow INTEGER, ts REAL);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+
+    # --- Building -----------------------------------------------------------------
+
+    @property
+    def complete(self):
+        return self.meta('complete') == "1"
+
+    def meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def reset(self):
+        self.db.executescript("""
+            DROP INDEX IF EXISTS frames_by_flow;
+            DROP INDEX IF EXISTS flows_by_src; DROP INDEX IF EXISTS flows_by_dst;
+            DROP INDEX IF EXISTS dns_by_query; DROP INDEX IF EXISTS http_by_host;
+            DELETE FROM flows; DELETE FROM frames; DELETE FROM dns; DELETE FROM http; DELETE FROM meta;
+        """)
+        self.active.clear()
+        for rows in self._rows.values():
+            rows.clear()
+        self.buffered = 0
+
+    def add_packet(self, pkt):
+        """Books one dissected packet on its flow. Returns the flow id."""
+        a, b = (pkt.src, pkt.sport), (pkt.dst, pkt.dport)
+        key = (pkt.proto, a, b) if a <= b else (pkt.proto, b, a)
+        flow = self.active.get(key)
+        if flow is None:
+            flow = self.active[key] = FlowRecord(pkt)
+            if len(self.active) > self.max_active:
+                self._write_flow(self.active.popitem(last=False)[1])
+        else:
+            self.active.move_to_end(key)
+        flow.last_ts = pkt.ts
+        flow.packets += 1
+        flow.bytes += pkt.end - pkt.start
+        outbound = 1 if pkt.src == flow.src and pkt.sport == flow.sport else 0
+        flow.layout += PACKET.pack(pkt.offset, pkt.start, pkt.end - pkt.start,
+                                   pkt.seq & 0xFFFFFFFF, pkt.flags & 0xFF, outbound)
+        self.buffered += PACKET.size
+        if len(flow.layout) >= CHUNK_BYTES:
+            self._write_layout(flow)
+        if self.buffered > self.budget:
+            self._spill()
+        return flow.id
+
+    def add_dns(self, query, flow, ts):
+        self._add("dns", (query, flow, ts))
+
+    def add_http(self, host, path, flow, ts):
+        self._add("http", (host, path, flow, ts))
+
+    def finish(self, **meta):
+        """Writes what is still buffered, builds the lookup indexes, marks the index complete."""
+        # Indexes are built once at the end: bulk appends stay cheap while streaming
+        while self.active:
+            self._write_flow(self.active.popitem(last=False)[1])
+        for table in self._rows:
+            self._flush(table)
+        self.db.executescript("""
+            CREATE INDEX IF NOT EXISTS frames_by_flow ON frames (flow, part);
+            CREATE INDEX IF NOT EXISTS flows_by_src ON flows (src);
+            CREATE INDEX IF NOT EXISTS flows_by_dst ON flows (dst);
+            CREATE INDEX IF NOT EXISTS dns_by_query ON dns (query);
+            CREATE INDEX IF NOT EXISTS http_by_host ON http (host);
+        """)
+        meta['complete'] = "1"
+        self.db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", ((k, str(v)) for k, v in meta.items()))
+        self.db.commit()
+
+    def merge(self, path):
+        """Copies a partial index (one shard of a parallel run) into this one."""
+        self.db.commit()
+        self.db.execute("ATTACH DATABASE ? AS part", (path,))
+        for table in ("flows", "frames", "dns", "http"):
+            self.db.execute(f"INSERT INTO {table} SELECT * FROM part.{table}")
+        self.db.commit()
+        self.db.execute("DETACH DATABASE part")
+
+    def _add(self, table, row):
+        rows = self._rows[table]
+        rows.append(row)
+        if len(rows) >= BATCH:
+            self._flush(table)
+
+    def _flush(self, table):
+        rows = self._rows[table]
+        if rows:
+            marks = ", ".join("?" * len(rows[0]))
+            self.db.executemany(f"INSERT INTO {table} VALUES ({marks})", rows)
+            if table == "frames":
+                self.buffered -= sum(len(row[2]) for row in rows)
+            rows.clear()
+
+    def _spill(self):
+        """Over budget: writes out layouts, least recently used flows first, down to half the budget."""
+        self._flush("frames")
+        excess = self.buffered - self.budget // 2
+        for flow in self.active.values():
+            if excess <= 0:
+                break
+            if flow.layout:
+                excess -= len(flow.layout)
+                self._write_layout(flow)
+        self._flush("frames")
+
+    def _write_layout(self, flow):
+        self._add("frames", (flow.id, flow.parts, bytes(flow.layout)))
+        flow.parts += 1
+        flow.layout = bytearray()
+
+    def _write_flow(self, flow):
+        if flow.layout:
+            self._write_layout(flow)
+        self.db.execute(
+            "INSERT OR REPLACE INTO flows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (flow.id, flow.proto, _ip(flow.src), flow.sport, _ip(flow.dst), flow.dport,
+             flow.first_ts, flow.last_ts, flow.packets, flow.bytes)
+        )
+
+    # --- Queries ------------------------------------------------------------------
+
+    def findings(self):
+        """Summary findings stored by the analysis that built the index"""
+        return json.loads(self.meta('findings', "[]"))
+
+    def flows(self, host=None, port=None, proto=None, limit=1000):
+        """Flows to/from `host` (and/or `port`, protocol number), oldest first"""
+        query, args = "SELECT * FROM flows WHERE 1=1", []
+        if host:
+            query += " AND id IN (SELECT id FROM flows WHERE src=? UNION SELECT id FROM flows WHERE dst=?)"
+            args += [host, host]
+        if port:
+            query += " AND (sport=? OR dport=?)"
+            args += [port, port]
+        if proto:
+            query += " AND proto=?"
+            args.append(proto)
+        query += " ORDER BY id LIMIT ?"
+        args.append(limit)
+        return [self._flow_dict(row) for row in self.db.execute(query, args)]
+
+    def flow(self, flow_id):
+        row = self.db.execute("SELECT * FROM flows WHERE id=?", (flow_id,)).fetchone()
+        return self._flow_dict(row) if row else None
+
+    def packets(self, flow_id):
+        """(offset, payload start, payload length, seq, flags, outbound) of every packet, in capture order"""
+        for (layout,) in self.db.execute("SELECT layout FROM frames WHERE flow=? ORDER BY part", (flow_id,)):
+            yield from PACKET.iter_unpack(layout)
+
+    def packet_offsets(self, flow_id):
+        return [entry[0] for entry in self.packets(flow_id)]
+
+    def dns_queries(self, name=None, limit=1000):
+        """(query, flow, ts) rows; `name` is a substring match"""
+        if name:
+            return self.db.execute("SELECT * FROM dns WHERE query LIKE ? LIMIT ?", (f"%{name}%", limit)).fetchall()
+        return self.db.execute("SELECT * FROM dns LIMIT ?", (limit,)).fetchall()
+
+    def http_requests(self, host=None, limit=1000):
+        """(host, path, flow, ts) rows"""
+        if host:
+            return self.db.execute("SELECT * FROM http WHERE host=? LIMIT ?", (host, limit)).fetchall()
+        return self.db.execute("SELECT * FROM http LIMIT ?", (limit,)).fetchall()
+
+    def payload(self, flow_id, limit=STREAM_CAP):
+        """
+        [(direction, bytes), ...] of one flow, read by offset from the capture.
+        TCP directions are reassembled in sequence order, UDP datagrams concatenated.
+        """
+        flow = self.flow(flow_id)
+        if flow is None or not self.capture:
+            return []
+        forward = f"{flow['src']}:{flow['sport']} -> {flow['dst']}:{flow['dport']}"
+        backward = f"{flow['dst']}:{flow['dport']} -> {flow['src']}:{flow['sport']}"
+        streams = {1: bytearray(), 0: bytearray()}
+        rows = self.packets(flow_id)
+
+        with open(self.capture, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if flow['proto'] == pcap_reader.TCP:
+                    done = lambda stream: streams[stream.key].extend(stream.data)
+                    reassembler = TcpReassembler(done, stream_cap=limit, budget=2 * limit)
+                    for _, start, length, seq, flags, outbound in rows:
+                        reassembler.add(outbound, seq, flags, mm[start:start + length])
+                    reassembler.flush_all()
+                else:
+                    for _, start, length, _, _, outbound in rows:
+                        room = limit - len(streams[outbound])
+                        if room > 0:
+                            streams[outbound] += mm[start:start + min(length, room)]
+        return [(label, bytes(streams[key])) for key, label in ((1, forward), (0, backward)) if streams[key]]
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    @staticmethod
+    def _flow_dict(row):
+        keys = ("id", "proto", "src", "sport", "dst", "dport", "first_ts", "last_ts", "packets", "bytes")
+        return dict(zip(keys, row))
+
+
+def _ip(raw):
+    return socket.inet_ntop(socket.AF_INET if len(raw) == 4 else socket.AF_INET6, raw)
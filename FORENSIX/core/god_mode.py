@@ -1,21 +1,173 @@
 import os
 import re
-import time
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from forensix.interface.theme import UI
 from forensix.core.file_analyzer import FileAnalyzer
+from forensix.core.carver import Carver, MAX_CARVE_SIZE
+from forensix.core.dedup import ContentIndex
+from forensix.core.artifact_store import ArtifactStore, KEEP_CASES
+from forensix.core.governor import ExtractionGovernor, DISK_BUDGET, MAX_FILES
 from forensix.modules.extractor import ArchiveExtractor
 from forensix.core.tools import Tools
 
 # Remove local console instantiation
 # console = Console() 
 
+FLAG_PATTERNS = [re.compile(pat, re.IGNORECASE) for pat in (
+    r'flag\{[^}]+\}',
+    r'CTF\{[^}]+\}',
+    r'hkcert\{[^}]+\}',
+    r'picoCTF\{[^}]+\}',
+    r'HTB\{[^}]+\}',
+    r'THM\{[^}]+\}',
+    r'flag\s*[:=]\s*[a-zA-Z0-9_]{10,}',
+    r'[a-f0-9]{32}', # naked MD5 hash (sometimes a flag)
+    r'[a-zA-Z0-9+/]{40,}={0,2}' # Base64 chunks (suspicious)
+)]
+
+
+def hunt_file(current_file, store, depth=0, disk_left=DISK_BUDGET, files_left=MAX_FILES, workers=None, progress=None):
+    """
+    Processes ONE file: analyze, score, extract, carve.
+    Runs inside a worker process, so nothing is printed here - console lines,
+    loot, this file's sha256, the new (path, sha256) files it produced and the
+    bytes newly stored are returned for the parent to merge.
+    Produced files go through the ArtifactStore (stored once per content);
+    files only a tool wrote (7z, steghide) are returned without a hash - their
+    own analysis hashes them and the parent stores them then.
+    `depth`/`disk_left`/`files_left` come from the parent's ExtractionGovernor
+    (`disk_left` is this task's reserved share of the case budget).
+    `workers` sizes the pools of nested analyzers (1 when already in a pool worker).
+    `progress` receives password-cracking progress (serial hunts only).
+    """
+    stored_before = store.written
+    unstored = 0 # Bytes written by tools, not yet in the store
+    log, loot, new_files = [], [], []
+
+    # 1. Analyze
+    analyzer = FileAnalyzer(current_file, workers=workers)
+    analyzer.analyze(deep=True)
+    report = analyzer.get_report_data()
+
+    # 2. AI Threat Assessment
+    try:
+        from forensix.core.neural_engine import NeuralEngine
+        brain = NeuralEngine()
+        ai_result = brain.score_artifact(report['entropy'], report['findings'], report['type'], report.get('entropy_regions'))
+
+        if ai_result['score'] > 80:
+            log.append(f"[bold red blink]☠️  AI DETECTED CRITICAL THREAT: {ai_result['assessment']}[/bold red blink]")
+            # For critical threats, force aggressive extraction
+            report['findings'].append("Mandatory Extraction")
+        elif ai_result['score'] > 50:
+            log.append(f"[yellow]⚠️  AI Warning: {ai_result['assessment']}[/yellow]")
+    except ImportError: pass
+
+    # 3. Check for Flags instantly
+    _scan_for_flags(analyzer.strings, current_file, log, loot)
+
+    # 4. Auto-Extraction Logic
+    # Output goes to a case folder unique to this path (workers run side by side)
+    work_name = f"{os.path.basename(current_file)}_{hashlib.md5(current_file.encode()).hexdigest()[:8]}"
+    work_dir = os.path.join(store.case_dir, work_name)
+
+    governor = ExtractionGovernor(disk_budget=disk_left, max_files=files_left)
+
+    # A. Archives (metadata checked first: bombs are sampled or skipped)
+    if "archive" in report['type'] or report['type'] == "zip":
+        verdict = governor.review(current_file, depth)
+        if verdict.reason:
+            log.append(f"[bold red]🛡️  {verdict.reason}[/bold red]")
+
+        # zip/tar members are streamed (capped, hashed on the way) and only
+        # written if the store doesn't hold their content yet
+        extractor = ArchiveExtractor(store.case_dir)
+        members = extractor.iter_members(current_file, governor, verdict) if verdict.allowed else []
+        for member in members:
+            readable = store.readable_path(work_name, member.name)
+            if member.data is not None:
+                readable = store.put_bytes(member.data, member.sha256, readable)
+            else:
+                readable = store.adopt(member.path, member.sha256, readable)
+            governor.release(member) # Stored: its RAM is free for the next member
+            new_files.append((readable, member.sha256))
+
+        extracted = []
+        encrypted = extractor.encrypted.pop(current_file, [])
+        needs_7z = verdict.action == "extract" and (not new_files or encrypted)
+        if needs_7z:
+            extracted = extractor.extract(current_file)
+        if needs_7z and not extracted:
+            # Try password cracking?
+            pwd = extractor.try_crack(current_file, progress=progress, workers=workers)
+            if pwd:
+                cracker = extractor.cracker
+                shown = pwd.decode(errors='backslashreplace')
+                log.append(f"[green]🔓 CRACKED PASSWORD:[/green] {shown} [dim]({cracker.tried} tried, {cracker.rate:,.0f} pw/s)[/dim]")
+                loot.append(f"Password for {os.path.basename(current_file)}: {shown}")
+                extracted = extractor.extract(current_file, password=pwd)
+
+        for path in extracted:
+            unstored += os.path.getsize(path)
+            new_files.append((path, None))
+        if new_files:
+            log.append(f"[bold cyan]=> Extracted {len(new_files)} files[/bold cyan]")
+
+    # B. Steganography (Steghide)
+    # If Steghide detected, try to extract with empty pass
+    for finding in report['findings']:
+        if "Steghide" in finding and Tools.has_tool('steghide'):
+            os.makedirs(work_dir, exist_ok=True)
+            out_file = os.path.join(work_dir, f"stego_{os.path.basename(current_file)}.txt")
+            success, _, _ = Tools.run_command('steghide', ['extract', '-sf', current_file, '-p', '', '-xf', out_file])
+            if success and os.path.exists(out_file):
+                log.append(f"[bold cyan]=> Steghide Extracted payload![/bold cyan]")
+                unstored += os.path.getsize(out_file)
+                new_files.append((out_file, None))
+
+    # C. Native Carving (dd/firmware, appended/embedded files)
+    # One mmap'd pass at disk speed - replaces the blind binwalk run
+    if "text" not in report['type'] and depth < governor.max_depth:
+        try:
+            carver = Carver(work_dir, max_size=min(MAX_CARVE_SIZE, max(0, disk_left - (store.written - stored_before) - unstored)))
+            carved = carver.carve(current_file)
+        except (OSError, ValueError):
+            carved = []
+        if carved:
+            log.append(f"[bold cyan]=> Carved {len(carved)} embedded files[/bold cyan]")
+            for path in carved:
+                digest = carver.digests[path]
+                new_files.append((store.adopt(path, digest), digest))
+
+    return log, loot, new_files, report['hashes'].get('sha256'), store.written - stored_before + unstored
+
+
+def _scan_for_flags(strings, filename, log, loot):
+    for s in strings:
+        for pat in FLAG_PATTERNS:
+            if pat.search(s):
+                log.append(f"[bold red]🚩 FLAG FOUND in {os.path.basename(filename)}: {s}[/bold red]")
+                loot.append(f"FLAG: {s} ({filename})")
+
+
 class GodMode:
-    def __init__(self, root_target):
+    def __init__(self, root_target, workers=None):
         self.root_target = root_target
-        self.queue = []
+        self.workers = workers or os.cpu_count() or 1
+        self.queue = deque()
         self.processed = set()
+        self.index = ContentIndex() # Content-hash dedup (duplicate path -> canonical path)
+        self.governor = ExtractionGovernor() # Case-wide disk budget, depth & file limits
+        self.depths = {}
+        self.grants = {} # File -> disk reserved for its task (settled on merge)
+        self.unstored = set() # Tool output waiting for its analysis hash to enter the store
         self.loot = []
-        self.artifacts_dir = f"artifacts_{int(time.time())}"
+        self._crack_step = None # Last 10% step of the wordlist reported
+        # Content-addressed artifacts: this hunt is one case of the store
+        self.store = ArtifactStore(label="godmode")
+        self.artifacts_dir = self.store.case_dir
         
         # Initialize
         if os.path.isfile(root_target):
@@ -24,111 +176,116 @@ class GodMode:
             for root, _, files in os.walk(root_target):
                 for f in files:
                     self.queue.append(os.path.join(root, f))
-                    
-        if not os.path.exists(self.artifacts_dir):
-            os.makedirs(self.artifacts_dir)
+
 
     def hunt(self):
         """The Main Autonomous Loop"""
         UI.console.print(f"[bold red]🔥 GOD MODE ACTIVATED on {self.root_target}[/bold red]")
-        
-        while self.queue:
-            current_file = self.queue.pop(0)
-            if current_file in self.processed:
-                continue
-            
-            self.processed.add(current_file)
-            UI.console.print(f"[yellow]Analyzing:[/yellow] {os.path.basename(current_file)}")
-            
-            # 1. Analyze
-            analyzer = FileAnalyzer(current_file)
-            analyzer.analyze(deep=True)
-            report = analyzer.get_report_data()
-            
-            # 2. AI Threat Assessment
-            try:
-                from forensix.core.neural_engine import NeuralEngine
-                brain = NeuralEngine()
-                ai_result = brain.score_artifact(report['entropy'], report['findings'], report['type'])
-                
-                if ai_result['score'] > 80:
-                    UI.console.print(f"[bold red blink]☠️  AI DETECTED CRITICAL THREAT: {ai_result['assessment']}[/bold red blink]")
-                    # For critical threats, force aggressive extraction
-                    report['findings'].append("Mandatory Extraction")
-                elif ai_result['score'] > 50:
-                    UI.console.print(f"[yellow]⚠️  AI Warning: {ai_result['assessment']}[/yellow]")
-            except ImportError: pass
-
-            # 3. Check for Flags instantly
-            self._scan_for_flags(analyzer.strings, current_file)
-            
-            # 3. Auto-Extraction Logic
-            new_files = []
-            
-            # A. Archives
-            if "archive" in report['type'] or report['type'] == "zip":
-                extractor = ArchiveExtractor(self.artifacts_dir)
-                extracted = extractor.extract(current_file)
-                if not extracted:
-                    # Try password cracking?
-                    pwd = extractor.try_crack(current_file)
-                    if pwd:
-                        UI.console.print(f"[green]🔓 CRACKED PASSWORD:[/green] {pwd}")
-                        self.loot.append(f"Password for {os.path.basename(current_file)}: {pwd}")
-                        extracted = extractor.extract(current_file, password=pwd)
-                
-                if extracted:
-                    UI.console.print(f"[bold cyan]=> Extracted {len(extracted)} files[/bold cyan]")
-                    new_files.extend(extracted)
-
-            # B. Steganography (Steghide)
-            # If Steghide detected, try to extract with empty pass
-            for finding in report['findings']:
-                if "Steghide" in finding and Tools.has_tool('steghide'):
-                    out_file = os.path.join(self.artifacts_dir, f"stego_{os.path.basename(current_file)}.txt")
-                    success, _, _ = Tools.run_command('steghide', ['extract', '-sf', current_file, '-p', '', '-xf', out_file])
-                    if success and os.path.exists(out_file):
-                        UI.console.print(f"[bold cyan]=> Steghide Extracted payload![/bold cyan]")
-                        new_files.append(out_file)
-
-            # C. Binwalk (dd/firmware)
-            if Tools.has_tool('binwalk'):
-                # We blindly try binwalk extraction on everything 'suspicious' or large blobs
-                # But to save time, only if 'findings' suggested it or high entropy
-                if report['entropy'] > 7 or "Binwalk" in str(report['findings']):
-                    success, _, _ = Tools.run_command('binwalk', ['-e', current_file, '-C', self.artifacts_dir, '--run-as=root']) 
-                    # Note: --run-as=root might be needed if in docker, but usually -e is safe. 
-                    # Checking if binwalk created a directory
-                    # This is tricky as binwalk names folders dynamically. 
-                    # We simple walk the artifacts dir again to find new stuff.
-                    pass
-
-            # Add new files to queue
-            for nf in new_files:
-                if nf not in self.processed:
-                    self.queue.append(nf)
+
+        if self.workers > 1:
+            self._hunt_parallel()
+        else:
+            while self.queue:
+                current_file = self._next_file()
+                if current_file:
+                    self._merge(current_file, hunt_file(current_file, self.store, *self._limits(current_file),
+                                                        progress=self._crack_progress))
         
         # Final Report
         self._print_loom()
 
-    def _scan_for_flags(self, strings, filename):
-        flag_patterns = [
-            r'flag\{[^}]+\}',
-            r'CTF\{[^}]+\}',
-            r'hkcert\{[^}]+\}',
-            r'picoCTF\{[^}]+\}',
-            r'HTB\{[^}]+\}',
-            r'THM\{[^}]+\}',
-            r'flag\s*[:=]\s*[a-zA-Z0-9_]{10,}',
-            r'[a-f0-9]{32}', # naked MD5 hash (sometimes a flag)
-            r'[a-zA-Z0-9+/]{40,}={0,2}' # Base64 chunks (suspicious)
-        ]
-        
-        for s in strings:
-            for pat in flag_patterns:
-                if re.search(pat, s, re.IGNORECASE):
-                    UI.console.print(f"[bold red]🚩 FLAG FOUND in {os.path.basename(filename)}: {s}[/bold red]")
-                    self.loot.append(f"FLAG: {s} ({filename})")
+    def _hunt_parallel(self):
+        """
+        The parent owns the queue and the `processed` set (dedup across workers);
+        workers only process single files and hand back their children.
+        """
+        UI.console.print(f"[dim]Hunting with {self.workers} workers[/dim]")
+        running = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while self.queue or running:
+                # Keep every worker busy (+1 queued each so none idles between results)
+                while self.queue and len(running) < self.workers * 2:
+                    current_file = self._next_file()
+                    if current_file:
+                        # One process per worker: nested analyzers don't fan out again
+                        limits = self._limits(current_file, slots=self.workers * 2 - len(running))
+                        future = pool.submit(hunt_file, current_file, self.store, *limits, workers=1)
+                        running[future] = current_file
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    current_file = running.pop(future)
+                    try:
+                        self._merge(current_file, future.result())
+                    except Exception as e:
+                        # Unknown output: the whole reservation stays charged
+                        self.governor.settle_disk(self.grants.pop(current_file, 0))
+                        UI.console.print(f"[red]Failed on {os.path.basename(current_file)}: {e}[/red]")
+
+    def _crack_progress(self, done, total, tried, rate):
+        """ZipCracker progress, one line per 10% of the wordlist"""
+        step = done * 10 // max(total, 1)
+        if step != self._crack_step:
+            self._crack_step = step
+            UI.console.print(f"[dim]🔓 Cracking: {done / max(total, 1):.0%} of wordlist, {tried:,} tried ({rate:,.0f} pw/s)[/dim]")
+
+    def _limits(self, current_file, slots=1):
+        """
+        (depth, disk share, files left) handed to a worker. The disk left is split
+        between the `slots` tasks that may still start, and this task's share is
+        reserved until its result is merged - N workers never write N budgets.
+        """
+        governor = self.governor
+        grant = governor.disk_left // max(1, slots)
+        governor.reserve_disk(grant)
+        self.grants[current_file] = grant
+        return self.depths.get(current_file, 0), grant, governor.max_files - governor.files
+
+    def _next_file(self):
+        """Pops the next unseen file (None if it was already processed)"""
+        current_file = self.queue.popleft()
+        if current_file in self.processed:
+            return None
+        self.processed.add(current_file)
+        UI.console.print(f"[yellow]Analyzing:[/yellow] {os.path.basename(current_file)}")
+        return current_file
+
+    def _merge(self, current_file, result):
+        log, loot, new_files, sha256, written = result
+        self.governor.settle_disk(self.grants.pop(current_file, 0), written)
+        if current_file in self.unstored and sha256:
+            # Hashed by its analysis: now stored once (a duplicate becomes a link)
+            self.unstored.discard(current_file)
+            try:
+                self.store.adopt(current_file, sha256)
+            except OSError:
+                pass
+        # Root files & tool output are only hashed by their analysis; same bytes seen already -> nothing new
+        canonical = self.index.claim(current_file, sha256) if sha256 else None
+        if canonical:
+            UI.console.print(f"[dim]= {os.path.basename(current_file)} is identical to {os.path.basename(canonical)}[/dim]")
+            return
+
+        for line in log:
+            UI.console.print(line)
+        self.loot.extend(loot)
+
+        # Add new files to queue (streamed/carved children arrive hashed, so duplicates never get analyzed)
+        depth = self.depths.get(current_file, 0) + 1
+        for nf, digest in new_files:
+            if nf in self.processed:
+                continue
+            if digest and self.index.claim(nf, digest):
+                continue
+            if not self.governor.admit_file():
+                UI.console.print(f"[bold red]🛡️  Case file limit ({self.governor.max_files}) reached - not queueing more[/bold red]")
+                break
+            if not digest:
+                self.unstored.add(nf)
+            self.depths[nf] = depth
+            self.queue.append(nf)
 
     def _print_loom(self):
         UI.console.print("\n[bold green]=== MISSION COMPLETE ===[/bold green]")
@@ -138,3 +295,14 @@ class GodMode:
                 UI.console.print(f" - {item}")
         else:
             UI.console.print("[dim]No definitive flags found.[/dim]")
+
+        UI.console.print(f"[dim]📦 Artifacts: {self.store.case_dir} (stored once by content in {self.store.objects_dir})[/dim]")
+        # Opt-in (FORENSIX_KEEP_CASES): older hunts go, with every object only they used
+        freed = self.store.prune(KEEP_CASES) if KEEP_CASES else 0
+        if freed:
+            UI.console.print(f"[dim]🧹 Pruned old cases: {freed / (1024 * 1024):.1f}MB freed[/dim]")
+
+        if self.index.aliases:
+            UI.console.print(f"[dim]🧬 {len(self.index)} duplicate files skipped (same content as an analyzed file):[/dim]")
+            for duplicate, canonical in self.index.aliases.items():
+                UI.console.print(f"[dim] - {duplicate} = {canonical}[/dim]")
@@ -0,0 +1,184 @@
+import os
+import struct
+import tarfile
+import zipfile
+
+from .tools import Tools
+
+# 🛡️ FORENSIX SENTINEL - EXTRACTION GOVERNOR
+# Recursive extraction is where hostile evidence hurts (42.zip & friends).
+# Before an archive is opened its metadata is checked - declared sizes,
+# compression ratio, entry count, overlapping entries - and every byte that
+# is actually produced is charged against per-case disk & memory budgets.
+# A streamed member stays in RAM only while the memory budget has room for
+# it; past that it spills to disk, and it is refused only when both are spent.
+# Pathological archives are sampled (a few capped members) or skipped.
+
+MAX_DEPTH = 8                            # Archive-in-archive nesting
+MAX_FILES = 10000                        # Files produced per case
+MAX_RATIO = 100                          # Declared / packed size (normal data stays well under 20)
+RATIO_FLOOR = 16 * 1024 * 1024           # Tiny archives with silly ratios are harmless
+DISK_BUDGET = 10 * 1024 * 1024 * 1024    # Bytes written to disk per case
+MEMORY_BUDGET = 1024 * 1024 * 1024       # Bytes of streamed members held in RAM
+MAX_MEMBER_SIZE = 2 * 1024 * 1024 * 1024 # Largest single member ever materialized
+SAMPLE_MEMBERS = 16                      # Members taken from a suspicious archive
+SAMPLE_MEMBER_SIZE = 16 * 1024 * 1024    # ...and how much of each
+
+
+class Verdict:
+    """What to do with one archive: 'extract', 'sample' or 'skip'."""
+    def __init__(self, action, reason=None, max_members=None, member_limit=MAX_MEMBER_SIZE):
+        self.action = action
+        self.reason = reason
+        self.max_members = max_members
+        self.member_limit = member_limit
+
+    @property
+    def allowed(self):
+        return self.action != "skip"
+
+
+class ArchiveStats:
+    def __init__(self, packed, declared=None, entries=None, overlapping=False):
+        self.packed = packed
+        self.declared = declared # Sum of declared uncompressed sizes (None = unknown)
+        self.entries = entries
+        self.overlapping = overlapping
+
+    @property
+    def ratio(self):
+        return self.declared / max(self.packed, 1) if self.declared is not None else 0
+
+
+class ExtractionGovernor:
+    def __init__(self, disk_budget=DISK_BUDGET, memory_budget=MEMORY_BUDGET,
+                 max_depth=MAX_DEPTH, max_files=MAX_FILES, max_ratio=MAX_RATIO):
+        self.disk_budget = disk_budget
+        self.memory_budget = memory_budget
+        self.max_depth = max_depth
+        self.max_files = max_files
+        self.max_ratio = max_ratio
+        self.disk_used = 0
+        self.disk_reserved = 0 # Handed out to work running elsewhere (GodMode workers)
+        self.memory_used = 0
+        self.files = 0
+
+    @property
+    def disk_left(self):
+        return max(0, self.disk_budget - self.disk_used - self.disk_reserved)
+
+    @property
+    def memory_left(self):
+        return max(0, self.memory_budget - self.memory_used)
+
+    def review(self, source, depth=0):
+        """Decides how far to open an archive (path or ArchiveMember) from its metadata alone."""
+        if depth >= self.max_depth:
+            return Verdict("skip", f"Extraction skipped: nesting depth {depth} reached the limit ({self.max_depth})")
+        if self.files >= self.max_files:
+            return Verdict("skip", f"Extraction skipped: case file limit ({self.max_files}) reached")
+        if self.disk_left + self.memory_left == 0:
+            return Verdict("skip", "Extraction skipped: disk & memory budgets exhausted")
+
+        try:
+            stats = archive_stats(source)
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile, tarfile.TarError, struct.error):
+            return Verdict("extract") # Unreadable metadata: streaming caps still apply
+
+        if stats.overlapping:
+            return Verdict("skip", "ZIP BOMB: overlapping entries (non-recursive bomb) - not extracted")
+
+        sample = Verdict("sample", max_members=SAMPLE_MEMBERS, member_limit=SAMPLE_MEMBER_SIZE)
+        if stats.declared is not None and stats.declared > RATIO_FLOOR and stats.ratio > self.max_ratio:
+            sample.reason = (f"ZIP BOMB suspected: {_human(stats.declared)} declared from {_human(stats.packed)} "
+                             f"({stats.ratio:.0f}x) - sampled {SAMPLE_MEMBERS} members")
+            return sample
+        if stats.declared is not None and stats.declared > self.disk_left + self.memory_left:
+            sample.reason = f"Archive declares {_human(stats.declared)}, over the remaining budget - sampled"
+            return sample
+        if stats.entries is not None and stats.entries > self.max_files - self.files:
+            sample.reason = f"Archive holds {stats.entries} entries, over the case file limit - sampled"
+            return sample
+        return Verdict("extract")
+
+    def admit_file(self):
+        """Counts one produced/queued file; False once the case limit is hit."""
+        if self.files >= self.max_files:
+            return False
+        self.files += 1
+        return True
+
+    def member_limit(self, verdict=None):
+        """Most bytes the next streamed member may take (it lives either in RAM or on disk)"""
+        cap = verdict.member_limit if verdict else MAX_MEMBER_SIZE
+        return min(cap, max(self.disk_left, self.memory_left))
+
+    def charge(self, member):
+        """Books a streamed ArchiveMember against the memory or disk budget."""
+        if member.data is not None:
+            self.memory_used += member.size
+        else:
+            self.disk_used += member.size
+
+    def release(self, member):
+        """A streamed member was analyzed: its RAM is given back."""
+        if member.data is not None:
+            self.memory_used = max(0, self.memory_used - member.size)
+            member.data = None
+
+    def charge_disk(self, nbytes):
+        self.disk_used += nbytes
+
+    def reserve_disk(self, nbytes):
+        """Sets disk aside for work running elsewhere (one GodMode task)"""
+        self.disk_reserved += nbytes
+
+    def settle_disk(self, reserved, used=None):
+        """Returns a reservation and charges what was really written (all of it if unknown)"""
+        self.disk_reserved = max(0, self.disk_reserved - reserved)
+        self.disk_used += reserved if used is None else used
+
+
+def archive_stats(source):
+    """Packed size, declared uncompressed size and entry count from archive metadata."""
+    member = source if hasattr(source, 'virtual_path') else None
+    path = member.path if member else source
+    packed = member.size if member else os.path.getsize(source)
+
+    with (member.open() if member else open(source, 'rb')) as f:
+        head = f.read(262)
+        if zipfile.is_zipfile(f):
+            with zipfile.ZipFile(f) as zf:
+                infos = zf.infolist()
+            # Non-recursive bombs point many entries at the same compressed data
+            overlapping = len({info.header_offset for info in infos}) < len(infos)
+            return ArchiveStats(packed, sum(info.file_size for info in infos), len(infos), overlapping)
+
+        if head[:2] == b'\x1f\x8b' and packed >= 18:
+            # gzip trailer: ISIZE (uncompressed size mod 4GB) of the last member
+            f.seek(-4, os.SEEK_END)
+            return ArchiveStats(packed, struct.unpack('<I', f.read(4))[0], 1)
+
+        if head[257:262] == b'ustar':
+            # Plain tar: headers sit in the clear, walking them only seeks
+            f.seek(0)
+            with tarfile.open(fileobj=f, mode='r:') as tf:
+                infos = tf.getmembers()
+            return ArchiveStats(packed, sum(info.size for info in infos), len(infos))
+
+    if path and Tools.has_tool('7z'):
+        # 7z/rar/...: ask 7z for the listing (no extraction)
+        success, out, _ = Tools.run_command('7z', ['l', '-slt', path])
+        if success:
+            sizes = [int(line[7:]) for line in out.splitlines() if line.startswith('Size = ') and line[7:].isdigit()]
+            if sizes:
+                return ArchiveStats(packed, sum(sizes), len(sizes))
+    return ArchiveStats(packed)
+
+
+def _human(nbytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if nbytes < 1024:
+            return f"{nbytes:.0f}{unit}"
+        nbytes /= 1024
+    return f"{nbytes:.1f}TB"
@@ -0,0 +1,160 @@
+import os
+import time
+import sqlite3
+import hashlib
+
+from .cache import CACHE_DIR
+
+# 📍 FORENSIX SENTINEL - HIT INDEX
+# Every scanner hit in a big dump is kept as (offset, category, length) in a
+# small SQLite sidecar - no values, no cap. Counters are kept per category,
+# so reports are O(1), and the bytes around any hit are read back from the
+# dump on demand. A finished index is reused: re-opening a case doesn't rescan.
+# Sidecars of another scanner version, or unused for MAX_INDEX_AGE, are pruned.
+
+INDEX_DIR = os.path.join(CACHE_DIR, "hits")
+CONTEXT = 64 # Default bytes shown on each side of a hit
+MAX_INDEX_AGE = 30 * 24 * 3600 # Seconds a sidecar survives without being used
+
+
+def index_path(filepath, version="", folder=INDEX_DIR):
+    """Sidecar location for one evidence file (keyed by path, size, mtime and scanner version)"""
+    st = os.stat(filepath)
+    key = f"{os.path.abspath(filepath)}|{st.st_size}|{st.st_mtime_ns}|{version}"
+    return os.path.join(folder, hashlib.sha256(key.encode()).hexdigest()[:32] + ".db")
+
+
+def prune_indexes(version, keep=None, max_age=MAX_INDEX_AGE, folder=INDEX_DIR):
+    """
+    Deletes sidecars (never `keep`) unused for `max_age` seconds or stamped
+    with another scanner version than `version`. Returns how many went.
+    """
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return 0
+    oldest = time.time() - max_age
+    pruned = 0
+    for name in names:
+        path = os.path.join(folder, name)
+        if not name.endswith(".db") or path == keep:
+            continue
+        try:
+            stale = os.path.getmtime(path) < oldest
+            if not stale:
+                db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+                try:
+                    row = db.execute("SELECT value FROM meta WHERE key='version'").fetchone()
+                finally:
+                    db.close()
+                stale = row is not None and row[0] != version
+        except (OSError, sqlite3.Error):
+            continue # Gone meanwhile / being written by another run
+        if stale:
+            for f in (path, path + "-wal", path + "-shm"):
+                try:
+                    os.remove(f)
+                except OSError:
+                    pass
+            pruned += 1
+    return pruned
+
+
+class HitIndex:
+    def __init__(self, path=":memory:", source=None):
+        self.path = path
+        self.source = source # Dump the offsets point into (path or bytes-like)
+        self.counts = {}
+        self._last = None    # Last hit written (repeat filter for overlapping windows)
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=OFF;
+            CREATE TABLE IF NOT EXISTS hits (
+                offset INTEGER, category TEXT, length INTEGER,
+                PRIMARY KEY (offset, category)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS hits_by_category ON hits (category, offset);
+            CREATE TABLE IF NOT EXISTS counters (category TEXT PRIMARY KEY, count INTEGER);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self.counts = dict(self.db.execute("SELECT category, count FROM counters"))
+
+    @property
+    def complete(self):
+        """True once a full scan was recorded (safe to reuse instead of rescanning)"""
+        return self.meta('complete') == "1"
+
+    def meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def reset(self):
+        self.db.executescript("DELETE FROM hits; DELETE FROM counters; DELETE FROM meta;")
+        self.counts = {}
+        self._last = None
+
+    def add(self, hits):
+        """Records (offset, category, value) hits; they must arrive sorted by offset."""
+        rows = []
+        for offset, category, value in hits:
+            if (offset, category) == self._last:
+                continue
+            self._last = (offset, category)
+            rows.append((offset, category, len(value)))
+            self.counts[category] = self.counts.get(category, 0) + 1
+        self.db.executemany("INSERT OR IGNORE INTO hits VALUES (?, ?, ?)", rows)
+
+    def finish(self, **meta):
+        self.db.execute("DELETE FROM counters")
+        self.db.executemany("INSERT INTO counters VALUES (?, ?)", self.counts.items())
+        meta['complete'] = "1"
+        self.db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", ((k, str(v)) for k, v in meta.items()))
+        self.db.commit()
+
+    def count(self, category=None):
+        return self.counts.get(category, 0) if category else sum(self.counts.values())
+
+    def top(self, n=5):
+        """{category: [(offset, value), ...]} - the first n hits of every category"""
+        return {
+            category: [(offset, self.read(offset, length)) for offset, length in self.db.execute(
+                "SELECT offset, length FROM hits WHERE category=? ORDER BY offset LIMIT ?", (category, n)
+            )]
+            for category in sorted(self.counts, key=self.counts.get, reverse=True)
+        }
+
+    def hits(self, category=None, start=0, end=None, limit=1000):
+        """(offset, category, length) rows in [start, end), by offset"""
+        query = "SELECT offset, category, length FROM hits WHERE offset >= ?"
+        args = [start]
+        if end is not None:
+            query += " AND offset < ?"
+            args.append(end)
+        if category:
+            query += " AND category = ?"
+            args.append(category)
+        query += " ORDER BY offset LIMIT ?"
+        args.append(limit)
+        return self.db.execute(query, args).fetchall()
+
+    def context(self, offset, before=CONTEXT, after=CONTEXT):
+        """(start offset, bytes) around `offset`, read from the dump - no rescan"""
+        start = max(0, offset - before)
+        return start, self.read(start, offset - start + after)
+
+    def read(self, offset, length):
+        if self.source is None:
+            return b""
+        if isinstance(self.source, str):
+            with open(self.source, 'rb') as f:
+                f.seek(offset)
+                return f.read(length)
+        return bytes(self.source[offset:offset + length])
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
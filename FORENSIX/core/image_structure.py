@@ -0,0 +1,266 @@
+import zlib
+import struct
+
+# 🧱 FORENSIX SENTINEL - IMAGE STRUCTURE WALKER
+# An image is walked from its header forward, one segment at a time:
+#   PNG   chunk lengths (CRC checked on every chunk but pixel data)
+#   JPEG  marker segment lengths (entropy-coded scans are searched for the next marker)
+#   GIF   blocks and their sub-block chains
+#   BMP   header sizes -> end of the pixel array
+# So the logical end of the image is exact - an EXIF thumbnail's EOI or an
+# 'IEND' inside an appended archive can't fool it. PNG and BMP walks only read
+# headers, so on an mmap'd file the pixel pages are never touched; JPEG and GIF
+# have no length for their image data, so the walk reads all of it: JPEG scans
+# with find() for the next marker, GIF hops one length byte per sub-block.
+# Anything that doesn't belong (unknown chunks, oversized text, bad CRCs, gaps)
+# is recorded as an anomaly.
+
+MAX_TEXT = 32 * 1024          # Text / comment segments bigger than this hide more than a comment
+MAX_CRC_CHUNK = 1024 * 1024   # CRCs are checked on chunks up to this size
+
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+PNG_TEXT = (b'tEXt', b'zTXt', b'iTXt')
+PNG_CHUNKS = {
+    b'IHDR', b'PLTE', b'IDAT', b'IEND', b'tRNS', b'cHRM', b'gAMA', b'iCCP', b'sBIT', b'sRGB',
+    b'cICP', b'mDCV', b'cLLI', b'tEXt', b'zTXt', b'iTXt', b'bKGD', b'hIST', b'pHYs', b'sPLT',
+    b'eXIf', b'tIME', b'acTL', b'fcTL', b'fdAT', b'oFFs', b'pCAL', b'sCAL', b'sTER', b'gIFg',
+    b'gIFx', b'gIFt', b'fRAc', b'dSIG',
+    b'iDOT', b'vpAg', # Common private chunks (macOS screenshots, ImageMagick)
+}
+
+JPEG_NAMES = {0xC4: "DHT", 0xC8: "JPG", 0xCC: "DAC", 0xDA: "SOS", 0xDB: "DQT", 0xDC: "DNL",
+              0xDD: "DRI", 0xDE: "DHP", 0xDF: "EXP", 0xFE: "COM"}
+JPEG_NAMES.update({0xC0 + n: f"SOF{n}" for n in range(16) if 0xC0 + n not in JPEG_NAMES})
+JPEG_NAMES.update({0xE0 + n: f"APP{n}" for n in range(16)})
+JPEG_NAMES.update({0xF0 + n: f"JPG{n}" for n in range(14)})
+
+GIF_EXTENSIONS = {0x01: "plain text", 0xF9: "graphic control", 0xFE: "comment", 0xFF: "application"}
+
+BMP_HEADERS = (12, 40, 52, 56, 64, 108, 124) # DIB header sizes in the wild
+
+
+class ImageStructure:
+    """What walking one image found: its logical end, the segments on the way, anomalies."""
+    def __init__(self, format, start, limit):
+        self.format = format
+        self.start = start
+        self.limit = limit   # End of the available bytes
+        self.end = None      # Logical end of the image (None: truncated / broken structure)
+        self.segments = []   # (offset, name, length)
+        self.anomalies = []
+
+    @property
+    def overlay(self):
+        """(offset, size) of the bytes after the image's logical end, or None"""
+        if self.end is None or self.end >= self.limit:
+            return None
+        return self.end, self.limit - self.end
+
+    def flag(self, text):
+        self.anomalies.append(text)
+
+
+def walk(data, start=0, limit=None):
+    """
+    ImageStructure of the PNG / JPEG / GIF / BMP at data[start:limit]
+    (bytes or mmap), or None when it isn't one of those.
+    """
+    limit = len(data) if limit is None else limit
+    head = bytes(data[start:start + 8])
+    for magic, format, walker in WALKERS:
+        if head.startswith(magic):
+            structure = ImageStructure(format, start, limit)
+            try:
+                walker(data, structure)
+            except (struct.error, IndexError):
+                structure.end = None
+                structure.flag(f"{format.upper()} structure ends mid-header (truncated)")
+            return structure
+    return None
+
+
+def _walk_png(data, s):
+    pos = s.start + 8
+    while pos + 12 <= s.limit:
+        length, ctype = struct.unpack_from('>I4s', data, pos)
+        if not ctype.isalpha() or (pos == s.start + 8 and ctype != b'IHDR'):
+            s.flag(f"Broken PNG chunk header at 0x{pos:x}")
+            return
+        name = ctype.decode('ascii')
+        end = pos + 12 + length
+        if end > s.limit:
+            s.flag(f"PNG chunk {name} at 0x{pos:x} runs past the end of the file ({length} bytes)")
+            return
+        s.segments.append((pos, name, length))
+
+        if ctype != b'IDAT' and length <= MAX_CRC_CHUNK: # Pixel data is left to the decoder
+            crc, = struct.unpack_from('>I', data, end - 4)
+            if zlib.crc32(data[pos + 4:end - 4]) != crc:
+                s.flag(f"Bad CRC on PNG chunk {name} at 0x{pos:x}")
+        if ctype in PNG_TEXT and length > MAX_TEXT:
+            s.flag(f"Oversized PNG {name} chunk at 0x{pos:x} ({length} bytes)")
+        elif ctype not in PNG_CHUNKS:
+            s.flag(f"Unknown PNG chunk '{name}' at 0x{pos:x} ({length} bytes)")
+
+        pos = end
+        if ctype == b'IEND':
+            s.end = pos
+            return
+    s.flag("PNG ends without IEND (truncated)")
+
+
+def _walk_jpeg(data, s):
+    pos = s.start + 2
+    while pos + 2 <= s.limit:
+        if data[pos] != 0xFF:
+            s.flag(f"Data where a JPEG marker should be at 0x{pos:x} (broken structure)")
+            return
+        marker = data[pos + 1]
+        if marker == 0xFF: # Fill byte
+            pos += 1
+            continue
+        if marker == 0xD9: # EOI
+            s.segments.append((pos, "EOI", 0))
+            s.end = pos + 2
+            return
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7: # TEM / RSTn: no length
+            pos += 2
+            continue
+        if marker == 0xD8 or marker == 0x00:
+            s.flag(f"Unexpected JPEG marker 0x{marker:02X} at 0x{pos:x} (broken structure)")
+            return
+
+        length, = struct.unpack_from('>H', data, pos + 2)
+        if length < 2:
+            s.flag(f"Bad JPEG segment length at 0x{pos:x}")
+            return
+        name = JPEG_NAMES.get(marker, f"0x{marker:02X}")
+        s.segments.append((pos, name, length))
+        if marker < 0xC0:
+            s.flag(f"Reserved JPEG marker 0x{marker:02X} at 0x{pos:x} ({length} bytes)")
+        elif marker == 0xFE and length > MAX_TEXT:
+            s.flag(f"Oversized JPEG comment at 0x{pos:x} ({length} bytes)")
+        pos += 2 + length
+
+        if marker == 0xDA:
+            # Entropy-coded scan: runs until a marker that isn't stuffing / RST
+            while True:
+                pos = data.find(b'\xFF', pos, s.limit)
+                if pos == -1 or pos + 1 >= s.limit:
+                    s.flag("JPEG scan data runs to the end of the file (truncated)")
+                    return
+                follow = data[pos + 1]
+                if follow == 0xFF: # Fill byte: the marker (maybe an RST) comes next
+                    pos += 1
+                    continue
+                if follow == 0x00 or 0xD0 <= follow <= 0xD7:
+                    pos += 2
+                    continue
+                break
+    s.flag("JPEG ends without EOI (truncated)")
+
+
+def _walk_gif(data, s):
+    pos = s.start + 13
+    flags = data[s.start + 10]
+    s.segments.append((s.start, "header", 13))
+    if flags & 0x80: # Global color table
+        size = 3 * (2 << (flags & 0x07))
+        s.segments.append((pos, "color table", size))
+        pos += size
+
+    def sub_blocks(pos):
+        """Offset after a sub-block chain (None if it runs off the end)"""
+        while pos < s.limit:
+            size = data[pos]
+            pos += 1 + size
+            if size == 0:
+                return pos if pos <= s.limit else None
+        return None
+
+    while pos < s.limit:
+        block = data[pos]
+        if block == 0x3B: # Trailer
+            s.segments.append((pos, "trailer", 1))
+            s.end = pos + 1
+            return
+        if block == 0x21: # Extension
+            label = data[pos + 1]
+            end = sub_blocks(pos + 2)
+            if end is None:
+                break
+            name = GIF_EXTENSIONS.get(label)
+            s.segments.append((pos, f"{name or 'unknown'} extension", end - pos))
+            if name is None:
+                s.flag(f"Unknown GIF extension 0x{label:02X} at 0x{pos:x} ({end - pos} bytes)")
+            elif label == 0xFE and end - pos > MAX_TEXT:
+                s.flag(f"Oversized GIF comment at 0x{pos:x} ({end - pos} bytes)")
+        elif block == 0x2C: # Image descriptor
+            flags = data[pos + 9]
+            end = pos + 10
+            if flags & 0x80: # Local color table
+                end += 3 * (2 << (flags & 0x07))
+            end = sub_blocks(end + 1) # +1: LZW minimum code size
+            if end is None:
+                break
+            s.segments.append((pos, "image", end - pos))
+        else:
+            s.flag(f"Unknown GIF block 0x{block:02X} at 0x{pos:x} (broken structure)")
+            return
+        pos = end
+    s.flag("GIF ends without a trailer (truncated)")
+
+
+def _walk_bmp(data, s):
+    size, reserved, pixels, dib = struct.unpack_from('<IIII', data, s.start + 2)
+    s.segments.append((s.start, "file header", 14))
+    if dib not in BMP_HEADERS:
+        s.flag(f"Unknown BMP header size {dib}")
+        return
+    s.segments.append((s.start + 14, "DIB header", dib))
+    if reserved:
+        s.flag(f"BMP reserved header fields are not zero (0x{reserved:08x})")
+
+    if dib == 12: # OS/2 core header
+        width, height, _, bits = struct.unpack_from('<HHHH', data, s.start + 18)
+        compression = image_size = colors = 0
+        entry = 3
+    else:
+        width, height, _, bits, compression, image_size = struct.unpack_from('<iiHHII', data, s.start + 18)
+        colors, = struct.unpack_from('<I', data, s.start + 46)
+        entry = 4
+    table = (colors or (1 << bits if bits <= 8 else 0)) * entry
+    if dib == 40 and compression in (3, 6): # Bit masks follow the header
+        table += 12 if compression == 3 else 16
+    headers = s.start + 14 + dib + table
+    if s.start + pixels < headers or s.start + pixels > s.limit:
+        s.flag(f"BMP pixel data offset 0x{pixels:x} points outside the file")
+        return
+    if s.start + pixels > headers:
+        s.flag(f"{s.start + pixels - headers} unused bytes between the BMP headers and the pixels at 0x{headers:x}")
+
+    if compression in (0, 3, 6):
+        image_size = (bits * abs(width) + 31) // 32 * 4 * abs(height)
+    elif not image_size: # RLE / JPEG / PNG payloads need the header's word
+        if size <= pixels:
+            # No size anywhere: the logical end is unknown (no overlay guess)
+            s.flag(f"BMP header claims {size} bytes, not past its pixel offset 0x{pixels:x} (compressed size unknown)")
+            return
+        image_size = size - pixels
+    s.segments.append((s.start + pixels, "pixels", image_size))
+    end = s.start + pixels + image_size
+    if end > s.limit:
+        s.flag(f"BMP pixel data runs past the end of the file ({image_size} bytes)")
+        return
+    if size != end - s.start:
+        s.flag(f"BMP header claims {size} bytes, the pixels end at {end - s.start}")
+    s.end = end
+
+
+WALKERS = (
+    (PNG_MAGIC, "png", _walk_png),
+    (b'\xFF\xD8\xFF', "jpeg", _walk_jpeg),
+    (b'GIF87a', "gif", _walk_gif),
+    (b'GIF89a', "gif", _walk_gif),
+    (b'BM', "bmp", _walk_bmp),
+)
@@ -0,0 +1,127 @@
+import os
+import ctypes
+import ctypes.util
+import threading
+
+from .tools import Tools
+from .signatures import native_signature, SIGNATURE_SPAN
+
+# 🔮 FORENSIX SENTINEL - SYSTEM MAGIC DATABASE
+# Fallback classification for files our own signature DB doesn't know.
+# The system magic rules are loaded ONCE into the process through libmagic
+# (the library behind `file`), so a lookup is a function call (~0.5ms worst
+# case on random data, mostly rule evaluation), not a fork + exec.
+# Without libmagic, the paths our own signatures can't place are classified
+# in a single `file -f -` run per scan.
+
+MAGIC_MIME_TYPE = 0x000010
+
+
+class MagicDatabase:
+    def __init__(self):
+        self._lib = None
+        self._cookie = None
+        self._lock = threading.Lock() # A magic cookie is not thread-safe
+        self._batch = {}              # path -> mime from the last prefetch()
+        self._load()
+
+    def _load(self):
+        name = ctypes.util.find_library('magic')
+        if not name:
+            return
+        try:
+            lib = ctypes.CDLL(name)
+            lib.magic_open.restype = ctypes.c_void_p
+            lib.magic_open.argtypes = [ctypes.c_int]
+            lib.magic_load.restype = ctypes.c_int
+            lib.magic_load.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+            lib.magic_buffer.restype = ctypes.c_char_p
+            lib.magic_buffer.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_size_t]
+            lib.magic_file.restype = ctypes.c_char_p
+            lib.magic_file.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+
+            cookie = lib.magic_open(MAGIC_MIME_TYPE)
+            if not cookie:
+                return
+            if lib.magic_load(cookie, None) != 0: # NULL = default system database
+                lib.magic_close.argtypes = [ctypes.c_void_p]
+                lib.magic_close(cookie)
+                return
+            self._lib, self._cookie = lib, cookie
+        except (OSError, AttributeError):
+            pass
+
+    @property
+    def in_process(self):
+        return self._cookie is not None
+
+    def from_buffer(self, data):
+        if not self.in_process:
+            return None
+        data = bytes(data)
+        with self._lock:
+            result = self._lib.magic_buffer(self._cookie, data, len(data))
+        return result.decode(errors='ignore') if result else None
+
+    def from_path(self, filepath):
+        if not self.in_process:
+            return None
+        with self._lock:
+            result = self._lib.magic_file(self._cookie, filepath.encode())
+        return result.decode(errors='ignore') if result else None
+
+    def classify(self, head_bytes, filepath=""):
+        """MIME type of an unknown file, or None."""
+        if filepath in self._batch:
+            return self._batch.pop(filepath)
+
+        if self.in_process:
+            mime = self.from_buffer(head_bytes)
+            if not mime and os.path.isfile(filepath):
+                mime = self.from_path(filepath)
+            return mime
+
+        # Last resort: one fork for this file
+        if os.path.isfile(filepath) and Tools.has_tool('file'):
+            success, out, _ = Tools.run_command('file', ['-b', '--mime-type', filepath])
+            if success and out.strip():
+                return out.strip()
+        return None
+
+    def prefetch(self, filepaths):
+        """
+        Classifies the paths the signature DB can't (only those ever reach
+        classify()) with a single `file -f -` run - no-op when libmagic is
+        loaded in-process. Results are consumed by classify().
+        """
+        if self.in_process or not Tools.has_tool('file'):
+            return
+        pending = [p for p in filepaths if isinstance(p, str) and p not in self._batch
+                   and "\n" not in p and _needs_fallback(p)]
+        if not pending:
+            return
+        success, out, _ = Tools.run_command(
+            'file', ['-b', '--mime-type', '-f', '-'], input="\n".join(pending) + "\n", timeout=600
+        )
+        if not success:
+            return
+        lines = out.splitlines()
+        if len(lines) == len(pending):
+            self._batch.update(zip(pending, (line.strip() for line in lines)))
+
+    def clear(self):
+        """Drops prefetched results nobody asked for (end of a scan)"""
+        self._batch.clear()
+
+
+def _needs_fallback(filepath):
+    try:
+        with open(filepath, 'rb') as f:
+            head = f.read(SIGNATURE_SPAN)
+    except OSError:
+        return False
+    return native_signature(head, filepath) is None
+
+
+# Global instance
+Magic = MagicDatabase()
@@ -16,9 +16,11 @@ class NeuralEngine:
             'known_bad_signature': 10.0
         }
 
-    def score_artifact(self, entropy, findings, file_type):
+    def score_artifact(self, entropy, findings, file_type, entropy_regions=None):
         """
         Returns a Threat Score (0-100) and AI Assessment.
+        `entropy_regions` (from the per-block entropy map) lets a packed
+        payload stand out even when the whole-file average stays low.
         """
         score = 0.0
         details = []
@@ -31,6 +33,12 @@ class NeuralEngine:
         elif entropy < 2.0:
             details.append("Low Entropy (Padding/Text)")
 
+        # 1b. Localized Entropy (Embedded encrypted/compressed blobs)
+        if entropy_regions and entropy <= 7.2:
+            peak = max(region['entropy'] for region in entropy_regions)
+            score += (peak - 7.0) * 10 * self.weights['entropy']
+            details.append(f"{len(entropy_regions)} High Entropy Region(s) (Embedded Payload?)")
+
         # 2. Heuristic Pattern Matching
         bad_keywords = ["password", "admin", "root", "token", "key", "flag", "ctf"]
         detected_keywords = set()
@@ -45,7 +53,7 @@ class NeuralEngine:
                 details.append("CONFIRMED FLAG ARTIFACT")
                 
             # Stego detections
-            if "steghide" in finding_lower or "zsteg" in finding_lower:
+            if "steghide" in finding_lower or "lsb " in finding_lower:
                 score += 20 * self.weights['embedded_files']
                 details.append("Steganography Tool Signature")
                 
@@ -0,0 +1,409 @@
+import os
+import re
+import mmap
+import socket
+import struct
+
+# 📡 FORENSIX SENTINEL - NATIVE PCAP READER
+# Classic pcap & pcapng read straight out of an mmap with struct.unpack_from.
+# Each frame becomes one small __slots__ record; the payload stays a
+# (start, end) range of the map until a detector really needs the bytes
+# (mmap.find() prefilters work without copying anything).
+#
+# Dissected: Ethernet (+VLAN) / Linux SLL / SLL2 / raw IP / BSD loopback
+#            -> IPv4 / IPv6 (+extension headers) -> TCP / UDP
+# Anything else is counted and skipped (scapy remains the deep dissector).
+
+PCAP_MAGIC = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1e-6), b'\xa1\xb2\xc3\xd4': ('>', 1e-6),  # Microseconds
+    b'\x4d\x3c\xb2\xa1': ('<', 1e-9), b'\xa1\xb2\x3c\x4d': ('>', 1e-9),  # Nanoseconds
+}
+PCAPNG_SHB = b'\x0a\x0d\x0d\x0a'
+PCAPNG_LITTLE = b'\x4d\x3c\x2b\x1a' # Byte-order magic as stored by little-endian writers
+
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = (12, 14, 101)
+LINKTYPE_LOOP = 108
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_LINUX_SLL2 = 276
+
+ETH_IPV4 = 0x0800
+ETH_IPV6 = 0x86DD
+ETH_VLAN = (0x8100, 0x88A8, 0x9100)
+IPV6_EXTENSIONS = (0, 43, 44, 51, 60) # Hop-by-hop, routing, fragment, AH, destination options
+
+TCP = 6
+UDP = 17
+
+HTTP_METHODS = (b"GET", b"POST", b"HEAD", b"PUT", b"DELETE", b"OPTIONS", b"PATCH", b"CONNECT", b"TRACE")
+DNS_PORTS = (53, 5353)
+HTTP_HEAD_LIMIT = 8192 # Bytes of a request searched for the Host header
+# Request lines inside a reassembled client stream (keep-alive: many per stream)
+HTTP_REQUEST_LINE = re.compile(
+    rb'(?:' + b'|'.join(HTTP_METHODS) + rb') [^ \r\n]{1,4096} HTTP/\d\.\d\r?\n'
+)
+
+# Shard files (parallel mode): one fixed record per packet, in capture order
+#   record offset, caplen, frame start - record offset, linktype, timestamp
+SHARD_RECORD = struct.Struct('<QIHHd')
+SHARD_FLUSH = 1024 * 1024 # Bytes buffered per shard before writing
+
+_U16 = struct.Struct('!H')
+_PORTS = struct.Struct('!HH')
+_TCP = struct.Struct('!HHI')
+
+
+class Packet:
+    """One dissected IP packet. Payload = data[start:end] (copied only when asked)."""
+    __slots__ = ("offset", "ts", "data", "version", "src", "dst", "proto",
+                 "sport", "dport", "seq", "flags", "start", "end", "fragment")
+
+    def __init__(self, offset, ts, data, version, src, dst, proto, sport, dport, seq, flags, start, end, fragment):
+        self.offset = offset     # File offset of the frame's record header
+        self.ts = ts
+        self.data = data
+        self.version = version
+        self.src = src           # Raw 4/16-byte addresses (hashable, cheap)
+        self.dst = dst
+        self.proto = proto
+        self.sport = sport
+        self.dport = dport
+        self.seq = seq
+        self.flags = flags
+        self.start = start
+        self.end = end
+        self.fragment = fragment # Non-first IP fragment: no L4 header, ports are 0
+
+    @property
+    def payload(self):
+        return bytes(self.data[self.start:self.end])
+
+    @property
+    def src_ip(self):
+        return socket.inet_ntop(socket.AF_INET if self.version == 4 else socket.AF_INET6, self.src)
+
+    @property
+    def dst_ip(self):
+        return socket.inet_ntop(socket.AF_INET if self.version == 4 else socket.AF_INET6, self.dst)
+
+    def find(self, sub):
+        """Offset of `sub` in the payload (relative to the map), -1 if absent - no copy."""
+        return self.data.find(sub, self.start, self.end)
+
+
+class CaptureReader:
+    """mmap'd pcap/pcapng file. Use as a context manager; iterate packets()."""
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.size = os.path.getsize(filepath)
+        self.frames = 0     # Every frame read
+        self.dissected = 0  # Frames that were IPv4/IPv6
+        self.position = 0   # Offset of the last frame read (progress)
+        self._file = open(filepath, 'rb')
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+
+        head = self.data[:4]
+        if head in PCAP_MAGIC:
+            self.format = "pcap"
+        elif head == PCAPNG_SHB:
+            self.format = "pcapng"
+        else:
+            self.close()
+            raise ValueError("Not a pcap/pcapng capture")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+    def records(self):
+        """(record offset, timestamp, linktype, frame start, frame end) for every frame."""
+        return self._pcap_records() if self.format == "pcap" else self._pcapng_records()
+
+    def packets(self):
+        """Dissected IP packets, in capture order (non-IP frames are only counted)."""
+        data = self.data
+        for offset, ts, linktype, start, end in self.records():
+            self.frames += 1
+            self.position = offset
+            packet = dissect(data, linktype, start, end, offset, ts)
+            if packet is not None:
+                self.dissected += 1
+                yield packet
+
+    def shard(self, shards, directory, progress=None, every=10000):
+        """
+        First pass of the parallel mode: writes every IP frame's location to one
+        of `shards` files, chosen by flow (both directions of a flow share a shard,
+        capture order is kept). Returns the shard file paths.
+        """
+        paths = [os.path.join(directory, f"shard_{n}.idx") for n in range(shards)]
+        files = [open(path, 'wb') for path in paths]
+        buffers = [bytearray() for _ in range(shards)]
+        pack = SHARD_RECORD.pack
+        data = self.data
+        try:
+            for offset, ts, linktype, start, end in self.records():
+                self.frames += 1
+                self.position = offset
+                key = flow_key(data, linktype, start, end)
+                if key is None:
+                    continue
+                self.dissected += 1
+                n = hash(key) % shards
+                buffers[n] += pack(offset, end - start, start - offset, linktype, ts)
+                if len(buffers[n]) >= SHARD_FLUSH:
+                    files[n].write(buffers[n])
+                    buffers[n].clear()
+                if progress and self.frames % every == 0:
+                    progress(offset, self.size, self.frames)
+            for n in range(shards):
+                files[n].write(buffers[n])
+        finally:
+            for f in files:
+                f.close()
+        return paths
+
+    def _pcap_records(self):
+        data, size = self.data, self.size
+        endian, unit = PCAP_MAGIC[data[:4]]
+        if size < 24:
+            return
+        linktype = struct.unpack_from(endian + 'I', data, 20)[0] & 0x0FFFFFFF # Upper bits: FCS info
+        header = struct.Struct(endian + 'IIII')
+        pos = 24
+        while pos + 16 <= size:
+            sec, frac, caplen, _ = header.unpack_from(data, pos)
+            start = pos + 16
+            end = start + caplen
+            if end > size: # Truncated capture
+                break
+            yield pos, sec + frac * unit, linktype, start, end
+            pos = end
+
+    def _pcapng_records(self):
+        data, size = self.data, self.size
+        endian = '<'
+        interfaces = [] # (linktype, timestamp unit) per Interface Description Block
+        pos = 0
+        while pos + 12 <= size:
+            if data[pos:pos + 4] == PCAPNG_SHB: # New section: byte order & interfaces reset
+                endian = '<' if data[pos + 8:pos + 12] == PCAPNG_LITTLE else '>'
+                interfaces = []
+            block_type, block_len = struct.unpack_from(endian + 'II', data, pos)
+            if block_len < 12 or pos + block_len > size:
+                break
+            body_end = pos + block_len - 4
+
+            if block_type == 6: # Enhanced Packet Block
+                iface, high, low, caplen = struct.unpack_from(endian + 'IIII', data, pos + 8)
+                linktype, unit = interfaces[iface] if iface < len(interfaces) else (LINKTYPE_ETHERNET, 1e-6)
+                start = pos + 28
+                yield pos, ((high << 32) | low) * unit, linktype, start, min(start + caplen, body_end)
+            elif block_type == 3: # Simple Packet Block (no timestamp)
+                original_len = struct.unpack_from(endian + 'I', data, pos + 8)[0]
+                linktype = interfaces[0][0] if interfaces else LINKTYPE_ETHERNET
+                start = pos + 12
+                yield pos, 0.0, linktype, start, min(start + original_len, body_end)
+            elif block_type == 2: # Obsolete Packet Block
+                iface = struct.unpack_from(endian + 'H', data, pos + 8)[0]
+                high, low, caplen = struct.unpack_from(endian + 'III', data, pos + 12)
+                linktype, unit = interfaces[iface] if iface < len(interfaces) else (LINKTYPE_ETHERNET, 1e-6)
+                start = pos + 28
+                yield pos, ((high << 32) | low) * unit, linktype, start, min(start + caplen, body_end)
+            elif block_type == 1: # Interface Description Block
+                linktype = struct.unpack_from(endian + 'H', data, pos + 8)[0]
+                interfaces.append((linktype, _if_tsresol(data, endian, pos + 16, body_end)))
+            pos += block_len
+
+
+def flow_key(data, linktype, start, end):
+    """
+    Direction-free flow identity of a frame (None if not IP) - only what sharding needs.
+    Plain Ethernet + IPv4 is read in place; everything else goes through dissect().
+    """
+    if linktype == LINKTYPE_ETHERNET and end - start >= 34 and data[start + 12:start + 14] == b'\x08\x00':
+        ip = start + 14
+        proto = data[ip + 9]
+        a, b = data[ip + 12:ip + 16], data[ip + 16:ip + 20]
+        if proto in (TCP, UDP) and not _U16.unpack_from(data, ip + 6)[0] & 0x1FFF:
+            l4 = ip + (data[ip] & 0x0F) * 4
+            a, b = a + data[l4:l4 + 2], b + data[l4 + 2:l4 + 4]
+        return (proto, a, b) if a <= b else (proto, b, a)
+
+    packet = dissect(data, linktype, start, end)
+    if packet is None:
+        return None
+    a, b = (packet.src, packet.sport), (packet.dst, packet.dport)
+    return (packet.proto, a, b) if a <= b else (packet.proto, b, a)
+
+
+def shard_packets(data, path):
+    """Packets listed in one shard file, re-dissected from the map (capture order kept)."""
+    chunk_size = SHARD_RECORD.size * 65536
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            for offset, caplen, header, linktype, ts in SHARD_RECORD.iter_unpack(chunk):
+                start = offset + header
+                packet = dissect(data, linktype, start, start + caplen, offset, ts)
+                if packet is not None:
+                    yield packet
+
+
+def _if_tsresol(data, endian, pos, end):
+    """Timestamp unit from an IDB's if_tsresol option (default: microseconds)."""
+    while pos + 4 <= end:
+        code, length = struct.unpack_from(endian + 'HH', data, pos)
+        if code == 0: # opt_endofopt
+            break
+        if code == 9 and length >= 1:
+            resolution = data[pos + 4]
+            return 2.0 ** -(resolution & 0x7F) if resolution & 0x80 else 10.0 ** -resolution
+        pos += 4 + (length + 3) // 4 * 4
+    return 1e-6
+
+
+def dissect(data, linktype, start, end, offset=0, ts=0.0):
+    """Link -> IP -> TCP/UDP headers of data[start:end]. None for non-IP frames."""
+    pos = start
+    if linktype == LINKTYPE_ETHERNET:
+        if end - pos < 14:
+            return None
+        ethertype = _U16.unpack_from(data, pos + 12)[0]
+        pos += 14
+        while ethertype in ETH_VLAN and pos + 4 <= end:
+            ethertype = _U16.unpack_from(data, pos + 2)[0]
+            pos += 4
+    elif linktype == LINKTYPE_LINUX_SLL:
+        if end - pos < 16:
+            return None
+        ethertype = _U16.unpack_from(data, pos + 14)[0]
+        pos += 16
+    elif linktype == LINKTYPE_LINUX_SLL2:
+        if end - pos < 20:
+            return None
+        ethertype = _U16.unpack_from(data, pos)[0]
+        pos += 20
+    elif linktype in LINKTYPE_RAW or linktype in (LINKTYPE_NULL, LINKTYPE_LOOP):
+        if linktype in (LINKTYPE_NULL, LINKTYPE_LOOP):
+            pos += 4 # Address family (host byte order) - the IP version nibble says the same
+        if pos >= end:
+            return None
+        version = data[pos] >> 4
+        ethertype = ETH_IPV4 if version == 4 else ETH_IPV6 if version == 6 else None
+    else:
+        return None
+
+    fragment = False
+    if ethertype == ETH_IPV4:
+        if end - pos < 20:
+            return None
+        ihl = (data[pos] & 0x0F) * 4
+        total = _U16.unpack_from(data, pos + 2)[0]
+        fragment = bool(_U16.unpack_from(data, pos + 6)[0] & 0x1FFF)
+        proto = data[pos + 9]
+        src, dst = data[pos + 12:pos + 16], data[pos + 16:pos + 20]
+        if total >= ihl: # 0 with TCP segmentation offload: trust the capture length
+            end = min(end, pos + total) # Drops Ethernet padding
+        l4 = pos + ihl
+        version = 4
+    elif ethertype == ETH_IPV6:
+        if end - pos < 40:
+            return None
+        payload_len = _U16.unpack_from(data, pos + 4)[0]
+        proto = data[pos + 6]
+        src, dst = data[pos + 8:pos + 24], data[pos + 24:pos + 40]
+        if payload_len:
+            end = min(end, pos + 40 + payload_len)
+        l4 = pos + 40
+        while proto in IPV6_EXTENSIONS and l4 + 8 <= end:
+            if proto == 44: # Fragment header (fixed 8 bytes)
+                fragment = bool(_U16.unpack_from(data, l4 + 2)[0] & 0xFFF8)
+                proto, l4 = data[l4], l4 + 8
+            elif proto == 51: # AH counts 4-byte units
+                proto, l4 = data[l4], l4 + (data[l4 + 1] + 2) * 4
+            else:
+                proto, l4 = data[l4], l4 + (data[l4 + 1] + 1) * 8
+        version = 6
+    else:
+        return None
+
+    sport = dport = seq = flags = 0
+    if fragment:
+        pass
+    elif proto == TCP and l4 + 20 <= end:
+        sport, dport, seq = _TCP.unpack_from(data, l4)
+        flags = data[l4 + 13]
+        l4 += (data[l4 + 12] >> 4) * 4
+    elif proto == UDP and l4 + 8 <= end:
+        sport, dport = _PORTS.unpack_from(data, l4)
+        length = _U16.unpack_from(data, l4 + 4)[0]
+        if length >= 8:
+            end = min(end, l4 + length)
+        l4 += 8
+    return Packet(offset, ts, data, version, src, dst, proto, sport, dport, seq, flags, min(l4, end), end, fragment)
+
+
+# --- Fast-path application layer ---------------------------------------------------
+
+def http_request(data, start, end):
+    """(host, path) of an HTTP request starting at data[start], or None."""
+    first = data[start:start + 8].split(b' ', 1)[0]
+    if first not in HTTP_METHODS:
+        return None
+    head = bytes(data[start:min(end, start + HTTP_HEAD_LIMIT)])
+    header_end = head.find(b'\r\n\r\n')
+    lines = head[:header_end if header_end != -1 else len(head)].split(b'\r\n')
+    parts = lines[0].split(b' ')
+    if len(parts) < 2:
+        return None
+    host = b""
+    for line in lines[1:]:
+        if line[:5].lower() == b"host:":
+            host = line[5:].strip()
+            break
+    return host.decode('utf-8', errors='ignore'), parts[1].decode('utf-8', errors='ignore')
+
+
+def http_requests(data, start=0, end=None):
+    """(host, path) of every request in a reassembled client->server stream."""
+    end = len(data) if end is None else end
+    for match in HTTP_REQUEST_LINE.finditer(data, start, end):
+        if match.start() != start and data[match.start() - 1] != 0x0A: # Request lines start a line
+            continue
+        request = http_request(data, match.start(), end)
+        if request:
+            yield request
+
+
+def dns_query(data, start, end):
+    """First question name of a DNS query (trailing dot, like scapy), or None for answers."""
+    if end - start < 12 or data[start + 2] & 0x80: # QR bit set: response
+        return None
+    if not _U16.unpack_from(data, start + 4)[0]: # No questions
+        return None
+    labels = []
+    pos = start + 12
+    for _ in range(128): # Bounded: pointer loops in hostile packets
+        if pos >= end:
+            return None
+        length = data[pos]
+        if length == 0:
+            break
+        if length & 0xC0 == 0xC0: # Compression pointer
+            if pos + 1 >= end:
+                return None
+            pos = start + (_U16.unpack_from(data, pos)[0] & 0x3FFF)
+            continue
+        labels.append(bytes(data[pos + 1:pos + 1 + length]))
+        pos += 1 + length
+    else:
+        return None
+    return (b".".join(labels) + b".").decode('utf-8', errors='ignore')
@@ -0,0 +1,125 @@
+import re
+
+# 🔑 FORENSIX SENTINEL - SECRET SCANNER
+# Flags, keys, URLs, e-mails and IPs found in one sweep over raw bytes.
+#
+# Every rule has literal anchors. The buffer is lowercased once, anchors are
+# located with C-speed bytes.find (a poor man's Aho-Corasick prefilter), and the
+# full rule only runs in a small window around each anchor. A plain alternation
+# regex would re-try every rule at every byte offset, which crawls on binaries.
+
+MAX_HIT_LEN = 200   # Sanity filter (longer matches are noise)
+OVERLAP = 256       # Bytes re-scanned across block boundaries (> MAX_HIT_LEN)
+
+# name: (rule on lowercased bytes, anchors, lookback)
+# lookback is the max distance from match start to anchor, or a pattern for the text
+# right before the anchor (e-mail local parts, found by walking back from '@')
+SECRET_RULES = {
+    "FLAG": (rb'(?:ctf|flag)\{[ -~]+?\}', (b'ctf{', b'flag{'), 0),
+    "API_KEY": (rb'(?:api_key|apikey|secret|token)["\']?\s*[:=]\s*["\']?[a-z0-9_\-]{20,}',
+                (b'api_key', b'apikey', b'secret', b'token'), 0),
+    "URL": (rb'(?:https?|ftp)://[a-z0-9\-\.]+\.[a-z]{2,}(?:/[!#-;=?-~]*)?', (b'://',), 5),
+    "EMAIL": (rb'(?<![a-z0-9._%+-])[a-z0-9._%+-]{1,64}@[a-z0-9.-]{1,255}\.[a-z]{2,}', (b'@',),
+              re.compile(rb'[a-z0-9._%+-]{1,64}\Z')),
+    "IP": (rb'\b[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\b', (re.compile(rb'\.[0-9]{1,3}\.'),), 3),
+}
+
+LOWERCASE = bytes.maketrans(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', b'abcdefghijklmnopqrstuvwxyz')
+
+
+class SecretScanner:
+    """Multi-pattern matcher compiled once and shared by every analysis."""
+    def __init__(self, rules=None):
+        self.rules = [
+            (name, re.compile(rule), anchors, lookback)
+            for name, (rule, anchors, lookback) in (rules or SECRET_RULES).items()
+        ]
+
+    def scan(self, data, base=0, stop=None):
+        """Returns (category, offset, value) for each hit starting before `stop`, by offset."""
+        if stop is None:
+            stop = len(data)
+        lowered = bytes(data).translate(LOWERCASE)
+
+        hits = []
+        for name, rule, anchors, lookback in self.rules:
+            starts = set()
+            reach = lookback if isinstance(lookback, int) else 64
+            for pos in self._anchor_positions(lowered, anchors, stop + reach):
+                match = self._match_at(lowered, rule, pos, lookback)
+                if not match or match.start() > pos or match.start() >= stop:
+                    continue # Belongs to a later anchor (or to the next block)
+                if match.start() in starts or match.end() - match.start() >= MAX_HIT_LEN:
+                    continue
+                starts.add(match.start())
+                value = data[match.start():match.end()]
+                hits.append((name, base + match.start(), bytes(value).decode('ascii', errors='ignore')))
+
+        hits.sort(key=lambda hit: hit[1])
+        return hits
+
+    def _match_at(self, data, rule, pos, lookback):
+        """Runs `rule` in the window around one anchor"""
+        endpos = pos + MAX_HIT_LEN + 1
+        if isinstance(lookback, int):
+            return rule.search(data, max(0, pos - lookback), endpos)
+        window = max(0, pos - 64)
+        tail = lookback.search(data[window:pos])
+        if not tail:
+            return None
+        return rule.match(data, window + tail.start(), endpos)
+
+    def _anchor_positions(self, data, anchors, stop):
+        """Offsets (before `stop`) of every anchor occurrence"""
+        for anchor in anchors:
+            if isinstance(anchor, bytes):
+                pos = data.find(anchor)
+                while pos != -1 and pos < stop:
+                    yield pos
+                    pos = data.find(anchor, pos + 1)
+            else:
+                for match in anchor.finditer(data):
+                    if match.start() >= stop:
+                        break
+                    yield match.start()
+
+    def stream(self):
+        return ScanStream(self)
+
+
+class ScanStream:
+    """
+    Runs a SecretScanner over consecutive blocks of one file.
+    The last OVERLAP bytes of each block are scanned again with the next one,
+    so hits crossing a boundary are found once, with absolute offsets.
+    """
+    def __init__(self, scanner):
+        self.scanner = scanner
+        self.carry = b""
+        self.offset = 0   # Stream offset of carry[0]
+        self.resume = {}  # Per category: end of the last reported hit
+
+    def feed(self, chunk, final=False):
+        data = self.carry + chunk if self.carry else chunk
+        cut = len(data) if final else max(0, len(data) - OVERLAP)
+
+        hits = []
+        for name, offset, value in self.scanner.scan(data, self.offset, cut):
+            if offset < self.resume.get(name, 0):
+                continue # Tail of a hit already reported from the previous block
+            hits.append((name, offset, value))
+            self.resume[name] = offset + len(value)
+
+        self.carry = bytes(data[cut:])
+        self.offset += cut
+        return hits
+
+    def jump(self, offset):
+        """Flushes the carry and continues at `offset` (bytes in between are skipped)"""
+        hits = self.feed(b"", final=True)
+        self.offset = offset
+        return hits
+
+
+# Shared compiled instance
+SCANNER = SecretScanner()
@@ -10,7 +10,7 @@ SIGNATURES = {
     b'\x42\x4D': "image/bmp",
     b'\x49\x49\x2A\x00': "image/tiff", # Little endian
     b'\x4D\x4D\x00\x2A': "image/tiff", # Big endian
-    b'\x52\x49\x46\x46': "image/webp", # Partial (RIFF)
+    b'\x52\x49\x46\x46': "application/x-riff", # Container (subtype at offset 8, see OFFSET_SIGNATURES)
     
     # DOCUMENTS
     b'\x25\x50\x44\x46': "application/pdf",
@@ -30,8 +30,7 @@ SIGNATURES = {
     
     # AUDIO/VIDEO
     b'\x49\x44\x33': "audio/mpeg", # MP3 ID3 tag
-    b'\x00\x00\x00\x18\x66\x74\x79\x70': "video/mp4", # MP4
-    b'\x00\x00\x00\x20\x66\x74\x79\x70': "video/mp4",
+    # MP4/MOV 'ftyp' box lives at offset 4 (any box size) -> OFFSET_SIGNATURES
     b'\x1A\x45\xDF\xA3': "video/webm", # Matroska/WebM
     # NETWORK CAPTURES
     b'\xD4\xC3\xB2\xA1': "application/vnd.tcpdump.pcap",
@@ -39,31 +38,140 @@ SIGNATURES = {
     b'\x0A\x0D\x0D\x0A': "application/vnd.tcpdump.pcap", # PCAPNG
 }
 
+# Magic that is not at offset 0, or needs a mask: (offset, magic, mask, mime)
+# A mask byte of 0x00 means "any value" (e.g. the RIFF chunk size).
+RIFF_MASK = b'\xFF\xFF\xFF\xFF\x00\x00\x00\x00\xFF\xFF\xFF\xFF'
+OFFSET_SIGNATURES = [
+    # ARCHIVES / DISK IMAGES
+    (257, b'ustar', None, "application/x-tar"),
+    (0x8001, b'CD001', None, "application/x-iso9660-image"),
+    (0x8801, b'CD001', None, "application/x-iso9660-image"),
+    (0x9001, b'CD001', None, "application/x-iso9660-image"),
+
+    # RIFF SUBTYPES
+    (0, b'RIFF\x00\x00\x00\x00WAVE', RIFF_MASK, "audio/wav"),
+    (0, b'RIFF\x00\x00\x00\x00WEBP', RIFF_MASK, "image/webp"),
+    (0, b'RIFF\x00\x00\x00\x00AVI ', RIFF_MASK, "video/x-msvideo"),
+
+    # ISO BASE MEDIA (ftyp + major brand)
+    (4, b'ftyp', None, "video/mp4"),
+    (4, b'ftypqt  ', None, "video/quicktime"),
+    (4, b'ftypM4A ', None, "audio/mp4"),
+    (4, b'ftypheic', None, "image/heic"),
+]
+
+
+class _Rule:
+    __slots__ = ("offset", "magic", "mask", "mime", "weight")
+
+    def __init__(self, offset, magic, mask, mime):
+        self.offset = offset
+        self.magic = magic
+        self.mask = mask
+        self.mime = mime
+        # Specificity: number of bytes that must match exactly
+        self.weight = len(magic) if mask is None else sum(1 for b in mask if b == 0xFF)
+
+    def matches(self, head):
+        if self.mask is None:
+            return head.startswith(self.magic, self.offset)
+        window = head[self.offset:self.offset + len(self.magic)]
+        if len(window) < len(self.magic):
+            return False
+        return all((h & m) == (g & m) for h, m, g in zip(window, self.mask, self.magic))
+
+
+class SignatureIndex:
+    """
+    Compiled signature DB.
+    Rules are bucketed by (absolute offset of their first exact byte, byte value),
+    so a lookup costs one dict probe per distinct offset no matter how many
+    signatures there are. The most specific matching rule wins.
+    """
+    def __init__(self, signatures, offset_signatures=()):
+        self._tables = {}
+        self.span = 0 # Header bytes needed to evaluate every rule
+
+        rules = [_Rule(0, magic, None, mime) for magic, mime in signatures.items()]
+        rules += [_Rule(offset, magic, mask, mime) for offset, magic, mask, mime in offset_signatures]
+        for rule in rules:
+            lead = 0 if rule.mask is None else rule.mask.index(0xFF)
+            table = self._tables.setdefault(rule.offset + lead, {})
+            table.setdefault(rule.magic[lead], []).append(rule)
+            self.span = max(self.span, rule.offset + len(rule.magic))
+
+        for table in self._tables.values():
+            for bucket in table.values():
+                bucket.sort(key=lambda rule: rule.weight, reverse=True)
+        # Probe offsets in order so short headers stop early
+        self._offsets = sorted(self._tables)
+
+    def match(self, head):
+        """Returns the MIME type of the best matching rule, or None."""
+        head = bytes(head)
+        best = None
+        for offset in self._offsets:
+            if offset >= len(head):
+                break
+            for rule in self._tables[offset].get(head[offset], ()):
+                if (best is None or rule.weight > best.weight) and rule.matches(head):
+                    best = rule
+                    break
+        return best.mime if best else None
+
+    def match_many(self, heads):
+        """Classifies a batch of header buffers in one call."""
+        return [self.match(head) for head in heads]
+
+
+SIGNATURE_INDEX = SignatureIndex(SIGNATURES, OFFSET_SIGNATURES)
+SIGNATURE_SPAN = SIGNATURE_INDEX.span # Bytes of header detect_signature() wants
+
 def detect_signature(head_bytes, filepath=""):
     """
-    Detects file type from the first 32 bytes.
+    Detects file type from the header (up to SIGNATURE_SPAN bytes).
     Uses 'file' command as a powerful fallback.
     """
+    detected = native_signature(head_bytes, filepath) or "unknown"
+
+    # 4. ULTIMATE FALLBACK: System magic database ('file' rules)
+    # If we are in Kali, 'file' knows EVERYTHING. Loaded in-process, no fork per file.
+    if detected == "unknown":
+        try:
+            from .magic_db import Magic
+            mime = Magic.classify(head_bytes, filepath)
+            if mime:
+                detected = mime
+        except: pass
+
+    if detected == "unknown":
+        return "application/octet-stream"
+
+    return detected
+
+
+def native_signature(head_bytes, filepath=""):
+    """Steps 1-3 of detect_signature() (no system magic); None when the fallback is needed."""
     detected = "unknown"
     
-    # 1. Internal Database Check
-    for sig, mime in SIGNATURES.items():
-        if head_bytes.startswith(sig):
-            # Special handling for ZIP vs Docx/Jar
-            if mime == "application/zip":
-                detected = "archive/zip-container"
-            else:
-                detected = mime
-            break
+    # 1. Internal Database Check (indexed, offset-aware)
+    mime = SIGNATURE_INDEX.match(head_bytes)
+    if mime:
+        # Special handling for ZIP vs Docx/Jar
+        if mime == "application/zip":
+            detected = "archive/zip-container"
+        else:
+            detected = mime
             
     # 2. Heuristic Text Check
     if detected == "unknown":
+        text_head = head_bytes[:2048]
         try:
-            head_bytes.decode('utf-8')
-            if head_bytes.startswith(b'#!'):
+            text_head.decode('utf-8')
+            if text_head.startswith(b'#!'):
                 detected = "text/script"
             else:
-                text_preview = head_bytes.decode('utf-8', errors='ignore').lower()
+                text_preview = text_head.decode('utf-8', errors='ignore').lower()
                 if any(x in text_preview for x in ['import ', 'def ', 'class ', 'function ', '<?php', 'html']):
                     detected = "text/source-code"
                 else:
@@ -79,18 +187,12 @@ def detect_signature(head_bytes, filepath=""):
         elif ext in ['.pcap', '.pcapng', '.cap']:
             detected = "application/vnd.tcpdump.pcap" # Override if magic bytes failed
 
-    # 4. ULTIMATE FALLBACK: Linux 'file' command
-    # If we are in Kali, 'file' knows EVERYTHING.
     if detected == "unknown" or detected == "application/octet-stream":
-        try:
-            from forensix.core.tools import Tools
-            if Tools.has_tool('file'):
-                success, out, _ = Tools.run_command('file', ['-b', '--mime-type', filepath])
-                if success and out.strip():
-                    detected = out.strip()
-        except: pass
+        return None
+    return detected
 
-    if detected == "unknown":
-        return "application/octet-stream"
 
-    return detected
+def detect_signatures(heads, filepaths=None):
+    """Batch form of detect_signature() for many (header, path) pairs."""
+    filepaths = filepaths or [""] * len(heads)
+    return [detect_signature(head, path) for head, path in zip(heads, filepaths)]
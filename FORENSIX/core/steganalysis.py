@@ -0,0 +1,419 @@
+import io
+import re
+import math
+import zlib
+import struct
+
+from .entropy import NUMPY_AVAILABLE
+from .signatures import SIGNATURES
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+# Pillow is optional: its C decoder unfilters Paeth-heavy PNGs ~10x faster
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# 🔬 FORENSIX SENTINEL - LSB STEGANALYSIS
+# PNG / BMP pixels are decoded straight into NumPy arrays (no zsteg, no Ruby,
+# no process per image), then every channel is checked with whole-array math:
+#   * chi-square attack  - LSB embedding equalizes the counts of pairs of values
+#                          (2k, 2k+1); evaluated over growing prefixes of the image
+#   * RS + sample pairs  - two independent estimates of the share of LSBs that
+#                          were overwritten (~0 on a clean image)
+#   * payload screening  - the first bytes of every bit plane / channel order /
+#                          bit order layout, checked for text and file magic
+# Screening decodes a sample: the top rows (sequential embedders start there)
+# and at most MAX_WIDTH columns, so one image costs tens of ms whatever its size.
+# extract() on a full decode (max_pixels=None) recovers a whole payload.
+
+MAX_PIXELS = 1 << 19   # Pixels decoded per image when screening
+MAX_WIDTH = 1024       # Columns decoded when screening (the first row covers EXTRACT_BYTES)
+MAX_ROWS = 2048
+PIL_MAX_PIXELS = 1 << 24 # Pillow decodes whole images: bigger ones use the native row-limited decoder
+STAT_PIXELS = 1 << 18  # Values per channel fed to RS / SPA (rows are strided above that)
+MIN_STAT_PIXELS = 1 << 15 # Smaller channels are too noisy for the statistics
+SEGMENTS = 20          # Chi-square prefixes: first 5%, 10%, ... 100% of the pixels
+CHI_THRESHOLD = 0.99   # Probability of embedding that counts as "equalized"
+RATE_THRESHOLD = 0.15  # RS and SPA must both estimate at least this share of LSBs
+PLANES = (0, 1)        # Bit planes screened for payloads
+EXTRACT_BYTES = 128    # Bytes pulled from every layout when screening
+MIN_TEXT = 12          # Printable run that counts as a text payload...
+MIN_DISTINCT = 6       # ...made of this many different characters (flat areas give 'wwww...')
+
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+PNG_CHANNELS = {0: "y", 2: "rgb", 3: "p", 4: "ya", 6: "rgba"} # Color type -> channel names
+BMP_CHANNELS = {8: "p", 24: "bgr", 32: "bgra"}                 # Bits per pixel -> channel names
+
+# Short magics ('MZ', 'BM', gzip) turn up in random bits far too often
+PAYLOAD_MAGIC = {magic: mime for magic, mime in SIGNATURES.items() if len(magic) >= 4}
+TEXT = re.compile(rb'[\x20-\x7e\t\r\n]+')
+
+
+class Raster:
+    """Decoded pixels: uint8 array (rows, columns, channels), rows in file order."""
+    def __init__(self, pixels, channels, format, width, height):
+        self.pixels = pixels
+        self.channels = channels # e.g. "rgb", "bgra", "p" (palette index)
+        self.format = format
+        self.width = width       # Full image size (pixels may hold only the top-left part)
+        self.height = height
+
+    @property
+    def sampled(self):
+        return self.pixels.shape[:2] != (self.height, self.width)
+
+    def channel(self, name):
+        return self.pixels[:, :, self.channels.index(name)]
+
+
+def decode(data, max_pixels=MAX_PIXELS):
+    """
+    Raster of a PNG / BMP (bytes-like), or None (other format, unsupported layout,
+    corrupt). max_pixels=None decodes the whole image.
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+    try:
+        if bytes(data[:8]) == PNG_MAGIC:
+            return decode_png(data, max_pixels)
+        if bytes(data[:2]) == b'BM':
+            return decode_bmp(data, max_pixels)
+    except (ValueError, struct.error, zlib.error):
+        pass
+    return None
+
+
+def decode_png(data, max_pixels=MAX_PIXELS):
+    view = memoryview(data)
+    header, idat = None, []
+    pos = 8
+    while pos + 12 <= len(view):
+        length, ctype = struct.unpack_from('>I4s', view, pos)
+        if ctype == b'IHDR':
+            header = struct.unpack_from('>IIBBBBB', view, pos + 8)
+        elif ctype == b'IDAT':
+            idat.append(view[pos + 8:pos + 8 + length])
+        elif ctype == b'IEND':
+            break
+        pos += 12 + length
+    if header is None or not idat:
+        return None
+
+    width, height, depth, color, _, _, interlace = header
+    if color not in PNG_CHANNELS or depth not in (8, 16) or not width:
+        return None # Sub-byte samples carry no classic LSB layout
+    channels = PNG_CHANNELS[color]
+    columns, rows = _sample(width, height, max_pixels)
+    if PIL_AVAILABLE and depth == 8 and width * height <= PIL_MAX_PIXELS:
+        pixels = _pillow_pixels(data, len(channels))
+        if pixels is not None:
+            return Raster(np.ascontiguousarray(pixels[:rows, :columns]), channels, "png", width, height)
+    if interlace:
+        return None # Adam7 needs Pillow
+    bpp = len(channels) * depth // 8
+    stride = 1 + width * bpp # Filter byte + samples
+
+    # Inflate only the rows we keep
+    want = rows * stride
+    inflater = zlib.decompressobj()
+    raw = bytearray()
+    for chunk in idat:
+        raw += inflater.decompress(chunk, want - len(raw))
+        if len(raw) >= want:
+            break
+    rows = len(raw) // stride
+    if not rows:
+        return None
+
+    scanlines = np.frombuffer(raw, dtype=np.uint8, count=rows * stride).reshape(rows, stride)
+    # Filters only look left and up: the left `columns` decode on their own
+    pixels = _unfilter(scanlines[:, 0], scanlines[:, 1:1 + columns * bpp].reshape(rows, columns, bpp))
+    if depth == 16:
+        pixels = pixels[:, :, 1::2] # Big-endian samples: the low byte holds the LSBs
+    return Raster(np.ascontiguousarray(pixels), channels, "png", width, height)
+
+
+def decode_bmp(data, max_pixels=MAX_PIXELS):
+    offset, = struct.unpack_from('<I', data, 10)
+    dib, width, height, _, bits, compression = struct.unpack_from('<IiiHHI', data, 14)
+    if dib < 40 or bits not in BMP_CHANNELS or width <= 0 or not height:
+        return None
+    if compression not in (0, 3) or (compression == 3 and bits != 32): # Raw / BGRA bitfields only
+        return None
+    stride = (bits * width + 31) // 32 * 4
+    columns, rows = _sample(width, abs(height), max_pixels)
+    rows = min(rows, (len(data) - offset) // stride)
+    if rows <= 0:
+        return None
+    # Rows stay in file order (bottom-up for positive heights): embedders walk the bytes as stored
+    block = np.frombuffer(data, dtype=np.uint8, count=rows * stride, offset=offset).reshape(rows, stride)
+    pixels = block[:, :columns * bits // 8].reshape(rows, columns, bits // 8).copy()
+    return Raster(pixels, BMP_CHANNELS[bits], "bmp", width, abs(height))
+
+
+def _pillow_pixels(data, channels):
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            pixels = np.asarray(image) # Palette images stay indices
+    except (OSError, ValueError, SyntaxError):
+        return None # Truncated / odd files: the native decoder copes
+    if pixels.ndim == 2:
+        pixels = pixels[:, :, None]
+    return pixels if pixels.dtype == np.uint8 and pixels.shape[2] == channels else None
+
+
+def _sample(width, height, max_pixels):
+    """(columns, rows) decoded from the top-left corner"""
+    if max_pixels is None:
+        return width, height
+    columns = min(width, MAX_WIDTH)
+    return columns, min(height, max(1, max_pixels // columns), MAX_ROWS)
+
+
+def _unfilter(types, data):
+    """Reverses PNG scanline filters. data: (rows, units, bpp) filtered bytes."""
+    if (types > 4).any():
+        raise ValueError("bad PNG filter type")
+    rows, units, bpp = data.shape
+    out = np.zeros((rows + 1, units + 1, bpp), dtype=np.uint8) # Zero row above, zero column left
+
+    if not (types >= 3).any():
+        # None / Sub / Up only: every row is one vector op (uint8 arithmetic wraps mod 256)
+        for y in range(rows):
+            kind = types[y]
+            if kind == 1:
+                out[y + 1, 1:] = np.cumsum(data[y], axis=0, dtype=np.uint8)
+            elif kind == 2:
+                out[y + 1, 1:] = data[y] + out[y, 1:]
+            else:
+                out[y + 1, 1:] = data[y]
+        return out[1:, 1:]
+
+    # Average / Paeth need the left neighbour: sweep anti-diagonals (d = y + x), whose
+    # pixels only depend on the two previous diagonals. Stored sheared - row y of
+    # diagonal d at [d + 2, y + 1], zeros around - every neighbour is a plain slice.
+    # Bands of rows keep the sheared copy small on tall images.
+    band = max(1, min(rows, units))
+    for top in range(0, rows, band):
+        count = min(band, rows - top)
+        out[top + 1:top + count + 1, 1:] = _unfilter_band(
+            types[top:top + count], data[top:top + count], out[top, 1:]
+        )
+    return out[1:, 1:]
+
+
+def _unfilter_band(types, data, above):
+    rows, units, bpp = data.shape
+    y = np.arange(rows)[:, None]
+    x = np.arange(units)[None, :]
+    raw = np.zeros((rows + units + 1, rows + 1, bpp), dtype=np.int16)
+    raw[y + x + 2, y + 1] = data
+    sheared = np.zeros_like(raw)
+    above = above.astype(np.int16)
+    sheared[np.arange(units) + 1, 0] = above # Row above the band: "up" of its first row
+    kinds = types.astype(np.int16)[:, None]
+
+    for d in range(rows + units - 1):
+        lo, hi = max(0, d - units + 1), min(rows, d + 1)
+        a = sheared[d + 1, lo + 1:hi + 1] # Left
+        b = sheared[d + 1, lo:hi]         # Up
+        c = sheared[d, lo:hi]             # Up-left
+        pa, pb, pc = np.abs(b - c), np.abs(a - c), np.abs(a + b - 2 * c)
+        paeth = np.where(pb <= pc, b, c)
+        np.copyto(paeth, a, where=(pa <= pb) & (pa <= pc))
+        predictor = np.choose(kinds[lo:hi], (0, a, b, (a + b) >> 1, paeth)) # Row's filter picks one
+        predictor += raw[d + 2, lo + 1:hi + 1]
+        predictor &= 0xFF
+        sheared[d + 2, lo + 1:hi + 1] = predictor
+    return sheared[y + x + 2, y + 1].astype(np.uint8)
+
+
+# --- Statistics ---------------------------------------------------------------------
+
+def prefix_histograms(values, segments=SEGMENTS):
+    """(segments, 256) value counts of the first 1/segments, 2/segments, ... of the values"""
+    values = values.ravel()
+    size = len(values) // segments
+    histograms = np.zeros((segments, 256), dtype=np.int64)
+    for i in range(segments):
+        histograms[i] = np.bincount(values[i * size:(i + 1) * size], minlength=256)
+    return histograms.cumsum(axis=0)
+
+
+def chi_square(histograms, plane=0):
+    """
+    Westfeld-Pfitzmann chi-square attack over prefix histograms: for each prefix,
+    the probability that the pairs of values differing only in bit `plane` were
+    equalized by embedding.
+    """
+    segments = len(histograms)
+    if histograms[0].sum() < 256:
+        return [0.0] * segments
+    # [prefix, high bits, plane bit, low bits]: pairs sit on axis 2
+    pairs = histograms.reshape(segments, -1, 2, 1 << plane)
+    clear = pairs[:, :, 0].reshape(segments, -1)
+    expected = (clear + pairs[:, :, 1].reshape(segments, -1)) / 2
+    used = expected > 0
+    statistic = np.where(used, (clear - expected) ** 2 / np.where(used, expected, 1), 0).sum(axis=1)
+    freedom = used.sum(axis=1) - 1
+    return [_chi2_survival(x, k) for x, k in zip(statistic.tolist(), freedom.tolist())]
+
+
+def _chi2_survival(statistic, freedom):
+    """P(chi2(freedom) > statistic), Wilson-Hilferty normal approximation"""
+    if freedom <= 0:
+        return 0.0
+    h = 2.0 / (9 * freedom)
+    z = ((statistic / freedom) ** (1 / 3) - (1 - h)) / math.sqrt(h)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def rs_estimate(values):
+    """
+    Fridrich RS analysis of a (rows, cols) channel: estimated share of pixels
+    whose LSB carries a message (0.0 - 1.0).
+    """
+    cols = values.shape[1] // 4 * 4
+    if not cols:
+        return 0.0
+    groups = values[:, :cols].reshape(-1, 4).T.astype(np.int16) # 4 rows: x0 x1 x2 x3 of every group
+
+    def counts(g):
+        x0, x1, x2, x3 = g
+        smooth = np.abs(x1 - x0) + np.abs(x2 - x1) + np.abs(x3 - x2)
+        def change(y1, y2): # Mask [0, 1, 1, 0]: only the middle pixels are flipped
+            flipped = np.abs(y1 - x0) + np.abs(y2 - y1) + np.abs(x3 - y2)
+            return np.sign(flipped - smooth).sum() / len(x0) # Regular - singular
+        return change(x1 ^ 1, x2 ^ 1), change(((x1 + 1) ^ 1) - 1, ((x2 + 1) ^ 1) - 1) # F1 / F-1
+
+    d0, n0 = counts(groups)     # R - S for M and -M
+    d1, n1 = counts(groups ^ 1) # Same with every LSB flipped
+    a = 2 * (d1 + d0)
+    b = n0 - n1 - d1 - 3 * d0
+    c = d0 - n0
+    return _rate(a, b, c, lambda z: z / (z - 0.5))
+
+
+def spa_estimate(values):
+    """Dumitrescu sample pair analysis over horizontally adjacent pixels (0.0 - 1.0)."""
+    u = values[:, :-1].ravel().astype(np.int16)
+    v = values[:, 1:].ravel().astype(np.int16)
+    if not len(u):
+        return 0.0
+    even = (v & 1) == 0
+    x = np.count_nonzero(np.where(even, u < v, u > v))
+    y = np.count_nonzero(np.where(even, u > v, u < v))
+    z = np.count_nonzero(u == v)
+    w = np.count_nonzero(((u >> 1) == (v >> 1)) & (u != v))
+    return _rate((w + z) / 2, 2 * x - len(u), y - x, lambda root: root)
+
+
+def _rate(a, b, c, scale):
+    """Smallest root of a*z^2 + b*z + c, mapped to an embedding rate in [0, 1]"""
+    if abs(a) < 1e-12:
+        if abs(b) < 1e-12:
+            return 0.0
+        root = -c / b
+    else:
+        # Near full embedding the roots meet: sampling noise can push the discriminant
+        # just below zero, where the vertex is the estimate
+        discriminant = max(b * b - 4 * a * c, 0.0)
+        roots = ((-b + math.sqrt(discriminant)) / (2 * a), (-b - math.sqrt(discriminant)) / (2 * a))
+        root = min(roots, key=abs)
+    try:
+        rate = scale(root)
+    except ZeroDivisionError:
+        return 0.0
+    return min(max(float(rate), 0.0), 1.0)
+
+
+# --- Payloads -----------------------------------------------------------------------
+
+def layouts(channels):
+    """Channel orders screened for payloads: each channel, all of them, reversed, and color-only"""
+    names = list(channels)
+    names += [channels, channels[::-1]]
+    if "a" in channels and len(channels) > 2:
+        color = channels.replace("a", "")
+        names += [color, color[::-1]]
+    return list(dict.fromkeys(names)) # De-duplicated, order kept
+
+
+def extract(raster, plane=0, layout=None, order="msb", limit=None):
+    """
+    Bytes carried by bit `plane` of the channels in `layout` (raster order, one bit
+    per channel per pixel), packed most- or least-significant bit first.
+    """
+    layout = layout or raster.channels
+    index = [raster.channels.index(name) for name in layout]
+    pixels = raster.pixels.reshape(-1, len(raster.channels))
+    if limit is not None:
+        pixels = pixels[:-(-limit * 8 // len(index))]
+    bits = (pixels[:, index] >> plane) & 1
+    if limit is not None:
+        bits = bits.ravel()[:limit * 8]
+    return np.packbits(bits.ravel(), bitorder="big" if order == "msb" else "little").tobytes()
+
+
+def identify(payload):
+    """('text', str) / (mime, None) for a plausible payload, else None"""
+    for magic, mime in PAYLOAD_MAGIC.items():
+        if payload.startswith(magic):
+            return mime, None
+    for skip in (0, 4): # Many embedders write a 32-bit length first
+        match = TEXT.match(payload, skip)
+        if match and len(match.group()) >= MIN_TEXT and len(set(match.group())) >= MIN_DISTINCT:
+            return "text", match.group().decode('ascii')
+    return None
+
+
+class LsbAnalysis:
+    def __init__(self, raster):
+        self.raster = raster
+        self.chi = {}      # channel -> share of the pixels (from the start) whose LSB pairs look equalized
+        self.rates = {}    # channel -> (RS estimate, SPA estimate)
+        self.payloads = [] # (plane, layout, order, kind, text)
+
+    def run(self):
+        raster = self.raster
+        for name in raster.channels:
+            values = raster.channel(name)
+            if values.size < MIN_STAT_PIXELS or values.min() == values.max():
+                continue # Tiny, or constant (e.g. unused alpha): nothing to measure
+            histograms = prefix_histograms(values)
+            lsb, control = chi_square(histograms, 0), chi_square(histograms, 1)
+            # Bit 1 is the control: until its pairs are told apart the prefix is too small for
+            # the test to have power, and a smooth histogram "equalizes" bit 0 like embedding
+            power = next((i for i, p in enumerate(control) if p <= 1 - CHI_THRESHOLD), len(control))
+            covered = 0
+            while covered < len(lsb) and lsb[covered] >= CHI_THRESHOLD:
+                covered += 1
+            if covered > power:
+                self.chi[name] = covered / len(lsb)
+            sample = values[::-(-values.size // STAT_PIXELS)] # Every n-th row
+            self.rates[name] = (rs_estimate(sample), spa_estimate(sample))
+
+        for plane in PLANES:
+            for layout in layouts(raster.channels):
+                for order in ("msb", "lsb"):
+                    found = identify(extract(raster, plane, layout, order, EXTRACT_BYTES))
+                    if found:
+                        self.payloads.append((plane, layout, order) + found)
+        return self
+
+    def equalized(self, channel):
+        """
+        Share of the pixels whose LSB pairs look embedded. Only counted past the
+        prefix where bit 1 (the control) is already told apart: embedding equalizes
+        bit 0 alone, a naturally smooth histogram both.
+        """
+        return self.chi.get(channel, 0.0)
+
+    def embedded(self, channel):
+        """Estimated share of `channel` LSBs carrying data, when RS and SPA agree"""
+        rs, spa = self.rates.get(channel, (0.0, 0.0))
+        return min(rs, spa) if min(rs, spa) >= RATE_THRESHOLD else 0.0
@@ -0,0 +1,185 @@
+import heapq
+from collections import OrderedDict
+
+# 🧵 FORENSIX SENTINEL - TCP STREAM REASSEMBLY
+# Segments are put back in sequence order per direction (src, dst, sport, dport),
+# so detectors see each conversation once, as one byte stream - a password split
+# over two segments is still a password.
+#
+# Memory stays bounded whatever the capture holds:
+#   * flow table is an LRU (OrderedDict): above max_flows the idlest flow is flushed
+#   * flows idle for idle_timeout seconds (capture time) are flushed
+#   * every stream keeps at most stream_cap bytes (the rest is only counted)
+#   * all buffered bytes together stay under budget (LRU flows flushed first)
+# A flushed stream is handed to on_stream(stream) once, then dropped.
+# Segments parked behind a gap sit in a heap by sequence order, so draining
+# (or skipping a hole) only ever looks at the earliest one.
+
+MAX_FLOWS = 100000
+STREAM_CAP = 1024 * 1024           # Bytes kept per direction (headers, logins, flags live up front)
+BUFFER_BUDGET = 256 * 1024 * 1024  # Bytes buffered across all open streams
+IDLE_TIMEOUT = 300                 # Seconds of capture time
+SWEEP_EVERY = 10000                # Packets between idle sweeps
+
+FIN, SYN, RST = 0x01, 0x02, 0x04
+SEQ_MASK = 0xFFFFFFFF
+SEQ_HALF = 0x80000000
+
+
+class Stream:
+    """One direction of a TCP connection."""
+    __slots__ = ("key", "next_seq", "data", "pending", "order", "base", "pending_bytes",
+                 "first_ts", "last_seen", "offset", "flow", "packets", "truncated", "gaps")
+
+    def __init__(self, key, ts, offset, flow=None):
+        self.key = key            # (src, dst, sport, dport)
+        self.flow = flow          # Caller's flow id (e.g. the flow index row)
+        self.next_seq = None      # Next in-order sequence number
+        self.data = bytearray()   # Reassembled bytes (up to the stream cap)
+        self.pending = None       # seq -> bytes parked behind a gap (created on demand)
+        self.order = None         # Heap of ((seq - base) & SEQ_MASK, seq) over pending
+        self.base = None          # next_seq when parking started (orders seqs across a wrap)
+        self.pending_bytes = 0
+        self.first_ts = ts
+        self.last_seen = ts
+        self.offset = offset      # File offset of the stream's first frame
+        self.packets = 0
+        self.truncated = False    # Hit the stream cap
+        self.gaps = 0             # Holes skipped (lost segments)
+
+
+class TcpReassembler:
+    def __init__(self, on_stream, max_flows=MAX_FLOWS, stream_cap=STREAM_CAP,
+                 budget=BUFFER_BUDGET, idle_timeout=IDLE_TIMEOUT):
+        self.on_stream = on_stream
+        self.max_flows = max_flows
+        self.stream_cap = stream_cap
+        self.budget = budget
+        self.idle_timeout = idle_timeout
+        self.flows = OrderedDict() # LRU: least recently touched first
+        self.buffered = 0
+        self.packets = 0
+        self.streams = 0           # Streams opened
+        self.evicted = 0           # Flushed early (table full / over budget)
+        self.expired = 0           # Flushed after idle_timeout
+        self.truncated = 0         # Streams that hit the cap
+
+    def add(self, key, seq, flags, payload, ts=0.0, offset=0, flow=None):
+        """Feeds one TCP segment (payload: bytes-like, may be empty)."""
+        self.packets += 1
+        stream = self.flows.get(key)
+        if stream is None:
+            if not payload and not flags & SYN: # Bare ACKs don't open flows
+                return
+            stream = Stream(key, ts, offset, flow)
+            self.flows[key] = stream
+            self.streams += 1
+            if len(self.flows) > self.max_flows:
+                self._close(next(iter(self.flows)))
+                self.evicted += 1
+        else:
+            self.flows.move_to_end(key)
+        stream.last_seen = ts
+        stream.packets += 1
+
+        if flags & SYN:
+            seq = (seq + 1) & SEQ_MASK
+            stream.next_seq = seq
+        if payload:
+            if stream.next_seq is None: # Capture started mid-connection
+                stream.next_seq = seq
+            self._place(stream, seq, payload)
+            self._drain(stream)
+
+        if flags & (FIN | RST):
+            self._close(key)
+        while self.buffered > self.budget and self.flows:
+            self._close(next(iter(self.flows)))
+            self.evicted += 1
+        if self.packets % SWEEP_EVERY == 0:
+            self.sweep(ts)
+
+    def sweep(self, now):
+        """Flushes streams idle for longer than idle_timeout (oldest sit at the LRU head)."""
+        while self.flows:
+            key, stream = next(iter(self.flows.items()))
+            if now - stream.last_seen < self.idle_timeout:
+                break
+            self._close(key)
+            self.expired += 1
+
+    def flush_all(self):
+        while self.flows:
+            self._close(next(iter(self.flows)))
+
+    def _place(self, stream, seq, payload):
+        """Appends in-order data, trims retransmitted bytes, parks early segments."""
+        delta = (seq - stream.next_seq) & SEQ_MASK
+        if delta & SEQ_HALF: # Starts before next_seq: retransmission / overlap
+            behind = SEQ_MASK + 1 - delta
+            if behind >= len(payload):
+                return
+            payload = payload[behind:]
+            delta = 0
+        if delta == 0:
+            self._append(stream, payload)
+            return
+        if stream.truncated:
+            return # Cap reached: nothing after the gap would be kept anyway
+
+        if stream.pending is None:
+            stream.pending = {}
+            stream.order = []
+            stream.base = stream.next_seq
+        previous = stream.pending.get(seq)
+        if previous is not None:
+            stream.pending_bytes -= len(previous)
+            self.buffered -= len(previous)
+        else:
+            heapq.heappush(stream.order, ((seq - stream.base) & SEQ_MASK, seq))
+        stream.pending[seq] = bytes(payload)
+        stream.pending_bytes += len(payload)
+        self.buffered += len(payload)
+        if stream.pending_bytes > self.stream_cap:
+            self._skip_gap(stream) # The missing segment is not coming
+
+    def _append(self, stream, payload):
+        room = self.stream_cap - len(stream.data)
+        if len(payload) > room:
+            if not stream.truncated:
+                stream.truncated = True
+                self.truncated += 1
+            payload_kept = payload[:max(room, 0)]
+        else:
+            payload_kept = payload
+        stream.data += payload_kept
+        self.buffered += len(payload_kept)
+        stream.next_seq = (stream.next_seq + len(payload)) & SEQ_MASK
+
+    def _drain(self, stream):
+        """Moves parked segments that are now in order into the stream."""
+        while stream.pending:
+            seq = stream.order[0][1] # Earliest parked segment
+            if seq != stream.next_seq and not (seq - stream.next_seq) & SEQ_MASK & SEQ_HALF:
+                return # Still a hole in front of it
+            heapq.heappop(stream.order)
+            payload = stream.pending.pop(seq)
+            stream.pending_bytes -= len(payload)
+            self.buffered -= len(payload)
+            self._place(stream, seq, payload) # In order or overlapping: appended / trimmed
+        stream.pending = stream.order = None # Next gap gets a fresh base
+
+    def _skip_gap(self, stream):
+        """Jumps over a hole to the earliest parked segment."""
+        stream.next_seq = stream.order[0][1]
+        stream.gaps += 1
+        self._drain(stream)
+
+    def _close(self, key):
+        stream = self.flows.pop(key)
+        while stream.pending: # Flush whatever arrived after holes
+            self._skip_gap(stream)
+        self.buffered -= len(stream.data)
+        if stream.data:
+            self.on_stream(stream)
+        stream.data = None
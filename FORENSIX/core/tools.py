@@ -10,8 +10,8 @@ if not os.path.exists(WORDLIST_PATH):
 
 # Known tool names to check for
 REQUIRED_TOOLS = [
-    "binwalk", "foremost", "steghide", "zsteg", "strings", 
-    "exiftool", "7z", "unzip", "bulk_extractor", "volatility"
+    "binwalk", "foremost", "steghide", "strings", 
+    "exiftool", "7z", "unzip", "bulk_extractor", "vol", "volatility", "file"
 ]
 
 class ToolManager:
@@ -28,8 +28,8 @@ class ToolManager:
     def has_tool(self, tool_name):
         return self.available_tools.get(tool_name) is not None
 
-    def run_command(self, tool, args, cwd=None, timeout=60):
-        """Runs a command and returns distinct stdout/stderr"""
+    def run_command(self, tool, args, cwd=None, timeout=60, input=None):
+        """Runs a command and returns distinct stdout/stderr (optional text fed to stdin)"""
         if not self.has_tool(tool):
             return False, "Tool not found", ""
 
@@ -41,7 +41,8 @@ class ToolManager:
                 capture_output=True, 
                 text=True, 
                 cwd=cwd, 
-                timeout=timeout
+                timeout=timeout,
+                input=input
             )
             return True, result.stdout, result.stderr
         except subprocess.TimeoutExpired:
@@ -3,12 +3,13 @@ import wave
 import struct
 
 class AudioAnalyzer:
-    def __init__(self, filepath):
+    def __init__(self, filepath, buffer=None):
         self.filepath = filepath
+        self.buffer = buffer # Shared EvidenceBuffer (opened by FileAnalyzer)
         self.findings = []
 
     def analyze(self):
-        if not os.path.exists(self.filepath):
+        if self.buffer is None and not os.path.exists(self.filepath):
             return []
 
         try:
@@ -24,7 +25,8 @@ class AudioAnalyzer:
 
     def _analyze_wav(self):
         try:
-            with wave.open(self.filepath, 'r') as wav:
+            source = self.buffer.reader() if self.buffer is not None else self.filepath
+            with wave.open(source, 'r') as wav:
                 frames = wav.getnframes()
                 rate = wav.getframerate()
                 duration = frames / float(rate)
@@ -34,7 +36,7 @@ class AudioAnalyzer:
                 
                 # Check for "Deep Sound" or "SilentEye" signatures in header usually
                 # But simple check: Extra data at end?
-                file_size = os.path.getsize(self.filepath)
+                file_size = self.buffer.size if self.buffer is not None else os.path.getsize(self.filepath)
                 expected_size = 44 + (frames * channels * wav.getsampwidth())
                 
                 if file_size > expected_size + 1024:
@@ -46,11 +48,15 @@ class AudioAnalyzer:
 
     def _analyze_mp3(self):
         # Native MP3 parsing is hard without libs, but we can look for ID3 tags
-        with open(self.filepath, 'rb') as f:
-            header = f.read(10)
-            if header.startswith(b'ID3'):
-                major_version = header[3]
-                self.findings.append(f"Audio: MP3 with ID3v2.{major_version} tags")
-            
-            # Scan for common text hiding in frames? 
-            # (Handled by general string extractor in FileAnalyzer)
+        if self.buffer is not None:
+            header = self.buffer.head(10)
+        else:
+            with open(self.filepath, 'rb') as f:
+                header = f.read(10)
+
+        if header.startswith(b'ID3'):
+            major_version = header[3]
+            self.findings.append(f"Audio: MP3 with ID3v2.{major_version} tags")
+        
+        # Scan for common text hiding in frames? 
+        # (Handled by general string extractor in FileAnalyzer)
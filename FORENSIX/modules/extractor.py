@@ -1,23 +1,190 @@
 import os
+import io
 import zipfile
 import tarfile
+import zlib
 import shutil
+import hashlib
+import tempfile
 from datetime import datetime
 
+try: from forensix.core.evidence import EvidenceBuffer
+except ImportError: from core.evidence import EvidenceBuffer
+
+SPILL_SIZE = 64 * 1024 * 1024 # Streamed members above this go to a temp file instead of RAM
+READ_CHUNK = 1024 * 1024
+
+
+class ArchiveMember:
+    """
+    One archive entry read straight from the archive stream (no extraction).
+    Held in memory up to the spill size; bigger entries - or entries an external
+    tool needs as a real file (realize()) - are written under the extractor's folder.
+    """
+    def __init__(self, archive, name, mtime, spill_dir):
+        self.archive = archive # Path (or virtual path) of the containing archive
+        self.name = name
+        self.mtime = mtime
+        self.spill_dir = spill_dir
+        self.data = None       # bytes while in memory
+        self.path = None       # Real file once spilled
+        self.size = 0
+        self.sha256 = None     # Hashed while it streamed through
+        self.truncated = False # Cut at the governor's per-member limit
+
+    @property
+    def virtual_path(self):
+        return f"{self.archive}::{self.name}"
+
+    def buffer(self):
+        """EvidenceBuffer over the member (zero-copy when in memory)"""
+        if self.data is not None:
+            return EvidenceBuffer.from_bytes(self.data, self.virtual_path)
+        return EvidenceBuffer(self.path)
+
+    def open(self):
+        return io.BytesIO(self.data) if self.data is not None else open(self.path, 'rb')
+
+    def realize(self):
+        """Real file path for tools that can't read memory (written on first call)"""
+        if self.path is None:
+            handle = self._spill_file()
+            with handle:
+                handle.write(self.data)
+        return self.path
+
+    def _read(self, stream, spill_size, limit=None, governor=None):
+        """
+        Streams the entry in, hashing on the way. It stays in RAM up to the spill
+        size and what the governor's memory budget has left; past that it goes to
+        a temp file (disk budget). Bigger than both: truncated.
+        """
+        if governor is not None:
+            spill_size = min(spill_size, governor.memory_left)
+            room = max(spill_size, governor.disk_left)
+            limit = room if limit is None else min(limit, room)
+        digest = hashlib.sha256()
+        parts, handle = [], None
+        for chunk in iter(lambda: stream.read(READ_CHUNK), b""):
+            if limit is not None and self.size + len(chunk) > limit:
+                chunk = chunk[:limit - self.size]
+                self.truncated = True
+            digest.update(chunk)
+            self.size += len(chunk)
+            if handle is None and self.size > spill_size:
+                # Declared sizes can lie, so the switch is made on bytes actually read
+                handle = self._spill_file()
+                handle.writelines(parts)
+                parts = []
+            if handle is None:
+                parts.append(chunk)
+            else:
+                handle.write(chunk)
+            if self.truncated:
+                break
+        if handle is None:
+            self.data = b"".join(parts)
+        else:
+            handle.close()
+        self.sha256 = digest.hexdigest()
+
+    def _spill_file(self):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix="member_", suffix=f"_{os.path.basename(self.name)}", dir=self.spill_dir)
+        return os.fdopen(fd, 'wb')
+
+
+def _zip_mtime(info):
+    try:
+        return datetime(*info.date_time).timestamp()
+    except ValueError:
+        return 0 # Garbage DOS date
+
+
 class ArchiveExtractor:
-    def __init__(self, output_base="_extracted"):
+    def __init__(self, output_base="_extracted", spill_size=SPILL_SIZE):
         self.output_base = output_base
-        if not os.path.exists(output_base):
-            os.makedirs(output_base)
+        self.spill_size = spill_size
+        self.cracker = None # Last ZipCracker used (tried / rate stats)
+        self.encrypted = {} # Archive (virtual) path -> encrypted zip entries iter_members() couldn't stream
+        os.makedirs(output_base, exist_ok=True)
+
+    def iter_members(self, source, governor=None, verdict=None):
+        """
+        Streams the regular files of a zip/tar (path or nested ArchiveMember)
+        as ArchiveMembers, without extracting the archive to disk.
+        Yields nothing for formats Python can't read, and skips encrypted entries
+        (listed in self.encrypted[archive]) -> use extract() / try_crack().
+        With an ExtractionGovernor, members are capped/charged and a 'sample'
+        verdict stops after its max_members.
+        """
+        member = source if isinstance(source, ArchiveMember) else None
+        archive = member.virtual_path if member else source
+        taken = 0
+
+        def admit():
+            # Budget/sample check before each entry; returns the byte limit (or False to stop)
+            if verdict and verdict.max_members is not None and taken >= verdict.max_members:
+                return False
+            if governor is None:
+                return None
+            limit = governor.member_limit(verdict)
+            return limit if limit > 0 and governor.admit_file() else False
+
+        try:
+            with (member.open() if member else open(source, 'rb')) as fileobj:
+                if zipfile.is_zipfile(fileobj):
+                    with zipfile.ZipFile(fileobj) as zf:
+                        for info in zf.infolist():
+                            if info.is_dir():
+                                continue
+                            if info.flag_bits & 0x1:
+                                self.encrypted.setdefault(archive, []).append(info.filename)
+                                continue
+                            limit = admit()
+                            if limit is False:
+                                return
+                            entry = ArchiveMember(archive, info.filename, _zip_mtime(info), self.output_base)
+                            with zf.open(info) as stream:
+                                entry._read(stream, self.spill_size, limit, governor)
+                            if governor:
+                                governor.charge(entry)
+                            taken += 1
+                            yield entry
+                    return
+
+                fileobj.seek(0)
+                try:
+                    tf = tarfile.open(fileobj=fileobj, mode='r:*')
+                except tarfile.TarError:
+                    return
+                with tf:
+                    for info in tf:
+                        if not info.isfile():
+                            continue
+                        limit = admit()
+                        if limit is False:
+                            return
+                        entry = ArchiveMember(archive, info.name, info.mtime, self.output_base)
+                        entry._read(tf.extractfile(info), self.spill_size, limit, governor)
+                        if governor:
+                            governor.charge(entry)
+                        taken += 1
+                        yield entry
+        except (OSError, zipfile.BadZipFile, tarfile.TarError, zlib.error, EOFError, ValueError, NotImplementedError):
+            return # Corrupt tail: keep what was streamed so far
 
     def extract(self, filepath, password=None):
         """
         Extracts supported archives to a temp folder.
         Supports: zip, tar, 7z, rar (via 7z)
+        `password` is str or the raw bytes try_crack() found (passed through unchanged).
         """
-        timestamp = datetime.now().strftime("%H%M%S")
+        if isinstance(password, str):
+            password = password.encode()
         filename = os.path.basename(filepath)
-        extract_dir = os.path.join(self.output_base, f"{filename}_{timestamp}")
+        # Unique per call (parallel GodMode workers extract side by side)
+        extract_dir = tempfile.mkdtemp(prefix=f"{filename}_", dir=self.output_base)
         
         extracted_files = []
         is_extracted = False
@@ -30,7 +197,7 @@ class ArchiveExtractor:
             if Tools.has_tool('7z'):
                 cmd = ['x', filepath, f'-o{extract_dir}', '-y']
                 if password:
-                    cmd.append(f'-p{password}')
+                    cmd.append(os.fsdecode(b'-p' + password)) # Non-UTF-8 bytes survive (surrogateescape)
                 else:
                     cmd.append('-p') # Attempt empty password
                 
@@ -44,7 +211,7 @@ class ArchiveExtractor:
                     if not os.path.exists(extract_dir): os.makedirs(extract_dir)
                     with zipfile.ZipFile(filepath, 'r') as zf:
                         try:
-                            zf.extractall(extract_dir, pwd=password.encode() if password else None)
+                            zf.extractall(extract_dir, pwd=password or None)
                             is_extracted = True
                         except RuntimeError: 
                             pass # Password required or wrong password
@@ -67,24 +234,23 @@ class ArchiveExtractor:
 
         return extracted_files
 
-    def try_crack(self, filepath):
-        """Attempts to crack archive password using rockyou.txt"""
+    def try_crack(self, filepath, progress=None, workers=None):
+        """
+        Attempts to crack archive password using rockyou.txt
+        Candidates are tested in memory across all cores (see ZipCracker).
+        Returns the password as raw bytes (hand it to extract() as is), or None.
+        """
         from forensix.core.tools import WORDLIST_PATH, Tools
         if not WORDLIST_PATH or not os.path.exists(WORDLIST_PATH):
             return None
 
-        # Simple dictionary attack for ZIPs
+        # Dictionary attack for ZIPs (ZipCrypto + WinZip AES)
         if zipfile.is_zipfile(filepath):
             try:
-                with zipfile.ZipFile(filepath) as zf:
-                    with open(WORDLIST_PATH, 'rb') as wl:
-                        for line in wl:
-                            pwd = line.strip()
-                            try:
-                                zf.extractall(pwd=pwd, path=os.path.join(self.output_base, "cracked"))
-                                return pwd.decode()
-                            except: continue
-            except: pass
+                from forensix.modules.zip_cracker import ZipCracker
+                self.cracker = ZipCracker(WORDLIST_PATH, workers=workers)
+                return self.cracker.crack(filepath, progress=progress)
+            except Exception: pass
             
         return None
 
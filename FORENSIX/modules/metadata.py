@@ -3,8 +3,9 @@ import zipfile
 import re
 
 class MetadataExtractor:
-    def __init__(self, filepath):
+    def __init__(self, filepath, buffer=None):
         self.filepath = filepath
+        self.buffer = buffer # Shared EvidenceBuffer (opened by FileAnalyzer)
         self.findings = []
         self.meta = {}
 
@@ -23,8 +24,9 @@ class MetadataExtractor:
 
     def _analyze_office(self):
         try:
-            if zipfile.is_zipfile(self.filepath):
-                with zipfile.ZipFile(self.filepath, 'r') as zf:
+            source = self.buffer.reader() if self.buffer is not None else self.filepath
+            if zipfile.is_zipfile(source):
+                with zipfile.ZipFile(source, 'r') as zf:
                     # Look for core.xml (standard OOXML metadata)
                     if 'docProps/core.xml' in zf.namelist():
                         data = zf.read('docProps/core.xml').decode('utf-8', errors='ignore')
@@ -41,16 +43,20 @@ class MetadataExtractor:
     def _analyze_pdf(self):
         # Basic raw PDF analysis without heavy PyPDF2
         try:
-            with open(self.filepath, 'rb') as f:
-                content = f.read()
-                # Search for /Author (text string)
-                author = re.search(b'/Author\s*\((.*?)\)', content)
-                creator = re.search(b'/Creator\s*\((.*?)\)', content)
-                
-                if author: 
-                    self.findings.append(f"PDF Author: {author.group(1).decode('utf-8', errors='ignore')}")
-                if creator: 
-                    self.findings.append(f"PDF Creator: {creator.group(1).decode('utf-8', errors='ignore')}")
+            if self.buffer is not None:
+                content = self.buffer.view
+            else:
+                with open(self.filepath, 'rb') as f:
+                    content = f.read()
+
+            # Search for /Author (text string)
+            author = re.search(b'/Author\s*\((.*?)\)', content)
+            creator = re.search(b'/Creator\s*\((.*?)\)', content)
+            
+            if author: 
+                self.findings.append(f"PDF Author: {author.group(1).decode('utf-8', errors='ignore')}")
+            if creator: 
+                self.findings.append(f"PDF Creator: {creator.group(1).decode('utf-8', errors='ignore')}")
 
         except Exception:
             pass
@@ -1,102 +1,336 @@
 import os
 import re
+import json
+import mmap
+import sqlite3
+import shutil
+import base64
+import tempfile
 import logging
+import multiprocessing
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-# Try importing Scapy (Heavy Dependency)
 try:
-    from scapy.all import rdpcap, TCP, UDP, IP, DNS, Raw, packet
-    from scapy.layers.http import HTTPRequest
+    from forensix.core import pcap_reader
+    from forensix.core.tcp_reassembly import TcpReassembler, MAX_FLOWS, BUFFER_BUDGET
+    from forensix.core.flow_index import FlowIndex, index_path, prune_indexes, MAX_ACTIVE, LAYOUT_BUDGET
+except ImportError:
+    from core import pcap_reader
+    from core.tcp_reassembly import TcpReassembler, MAX_FLOWS, BUFFER_BUDGET
+    from core.flow_index import FlowIndex, index_path, prune_indexes, MAX_ACTIVE, LAYOUT_BUDGET
+
+# Try importing Scapy (Heavy Dependency - optional deep dissection only)
+try:
+    from scapy.all import PcapReader, TCP, UDP, IP, DNS, Raw
     SCAPY_AVAILABLE = True
 except ImportError:
     SCAPY_AVAILABLE = False
 
+# Streaming: packets are read & dissected one at a time, only running aggregates
+# are kept -> memory stays flat on multi-GB captures.
+# engine="native": built-in mmap parser (pcap/pcapng, Eth/IP/TCP/UDP + DNS/HTTP fast paths)
+# engine="scapy":  full scapy dissection (slow, needs scapy) for exotic captures
+# TCP payloads are reassembled into streams first: detectors run once per stream.
+MAX_TRACKED = 10000     # Distinct creds / DNS names / URLs remembered per category
+MAX_CRED_LINE = 256     # Longest credential line reported
+PROGRESS_EVERY = 1000   # Packets between progress callbacks
+# Parallel mode (big captures, native engine): a first pass shards packet offsets
+# by flow, worker processes analyze one shard each straight from the mmap and
+# the parent merges their aggregates. A flow never spans shards -> order is kept.
+PARALLEL_THRESHOLD = 256 * 1024 * 1024
+
+
+def _flag_dns(name):
+    return "flag" in name or "ctf" in name
+
+
+def _flag_url(url):
+    return "flag" in url.lower() or "secret" in url.lower()
+
+
+def _lines_with(data, marker, start, end):
+    """(line start, line end) of every line of data[start:end] holding `marker`"""
+    pos = data.find(marker, start, end)
+    while pos != -1:
+        line_start = data.rfind(b"\n", start, pos) + 1 or start
+        line_end = data.find(b"\n", pos, end)
+        line_end = end if line_end == -1 else line_end
+        yield max(line_start, start), line_end
+        pos = data.find(marker, line_end, end)
+
+
+def _analyze_shard(filepath, shard_path, shards, index_file=None):
+    """Worker: native analysis of one shard. Returns the aggregates to merge."""
+    analyzer = PcapAnalyzer(filepath, workers=1)
+    # The tables & byte budgets are shared out between the workers
+    if index_file: # Partial index, merged by the parent
+        analyzer.index = FlowIndex(index_file, filepath,
+                                   max_active=max(1, MAX_ACTIVE // shards), budget=LAYOUT_BUDGET // shards)
+    analyzer.reassembler = TcpReassembler(
+        analyzer._analyze_stream, max_flows=max(1, MAX_FLOWS // shards), budget=BUFFER_BUDGET // shards
+    )
+    with open(filepath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for pkt in pcap_reader.shard_packets(mm, shard_path):
+                analyzer._analyze_native(pkt)
+            analyzer.reassembler.flush_all()
+    if analyzer.index is not None:
+        analyzer.index.finish()
+        analyzer.index.close()
+    tcp = analyzer.reassembler
+    return (analyzer.creds_found, analyzer.dns_queries, analyzer.http_requests, analyzer.http_count,
+            (tcp.streams, tcp.evicted, tcp.expired, tcp.truncated), index_file)
+
+
 class PcapAnalyzer:
-    def __init__(self, filepath):
+    def __init__(self, filepath, engine="native", workers=None):
         self.filepath = filepath
+        self.engine = engine
+        if workers is None:
+            # Inside a pool worker (e.g. GodMode) the other cores are already busy
+            workers = 1 if multiprocessing.parent_process() else os.cpu_count() or 1
+        self.workers = workers
         self.findings = []
-        self.creds_found = []
+        self.creds_found = set()
         self.dns_queries = set()
-        self.http_requests = []
-
-    def analyze(self):
-        """Main analysis entry point"""
-        if not SCAPY_AVAILABLE:
-            return ["⚠️ Scapy not installed. Cannot analyze PCAP."]
+        self.http_requests = set()
+        self.http_count = 0   # Every HTTP request seen (the set above is capped)
+        self.reassembler = TcpReassembler(self._analyze_stream)
+        self.index = None     # FlowIndex sidecar (native engine) while analyzing; closed after (re-open: index_path)
+        self.packets = 0
+        self.bytes_read = 0
 
+    def analyze(self, progress=None):
+        """
+        Main analysis entry point.
+        `progress(bytes_read, total_bytes, packets)` is called while the capture streams.
+        """
         if not os.path.exists(self.filepath):
             return []
 
         try:
-            # Read the PCAP
-            packets = rdpcap(self.filepath)
-            
-            for pkt in packets:
-                self._analyze_packet(pkt)
+            total = os.path.getsize(self.filepath)
+            if self.engine == "scapy" and SCAPY_AVAILABLE:
+                self._stream_scapy(total, progress)
+            else:
+                if self.engine == "scapy":
+                    self.findings.append("⚠️ Scapy not installed. Using the native parser.")
+                self.index = self._open_index()
+                if self.index is not None and self.index.complete:
+                    # Re-opened capture: the summary comes from the sidecar, no rescan
+                    self.findings.extend(self.index.findings())
+                    self.findings.append(f"INFO: Flow index reused (no rescan): {self.index.path}")
+                    return self.findings
+                try:
+                    if self.workers > 1 and total >= PARALLEL_THRESHOLD:
+                        dissected = self._analyze_parallel(total, progress)
+                    else:
+                        dissected = self._stream_native(total, progress)
+                except ValueError: # Not pcap/pcapng: maybe scapy knows the format
+                    if not SCAPY_AVAILABLE:
+                        raise
+                    dissected = None
+                if not dissected and SCAPY_AVAILABLE:
+                    # Unknown format or link type: let scapy have a go
+                    self.packets = 0
+                    self._stream_scapy(total, progress)
+                    if self.index is not None: # Only native runs can index offsets
+                        self.index.close()
+                        self.index = None
+            self.reassembler.flush_all() # Streams still open at the end of the capture
+            self.bytes_read = total
+            if progress:
+                progress(total, total, self.packets)
 
             # Post-Analysis Findings
             self._summarize_findings()
+            if self.index is not None:
+                self.index.finish(findings=json.dumps(self.findings), packets=self.packets)
 
         except Exception as e:
             self.findings.append(f"PCAP Error: {str(e)}")
+        finally:
+            if self.index is not None:
+                self.index.close()
+                self.index = None
 
         return self.findings
 
-    def _analyze_packet(self, pkt):
-        # 1. Credential Harvesting (Cleartext)
-        if pkt.haslayer(Raw):
-            load = pkt[Raw].load
+    def _open_index(self):
+        try:
+            index = FlowIndex(index_path(self.filepath), self.filepath)
+            if index.complete:
+                os.utime(index.path) # Recently used: pruned last
+            else:
+                index.reset()
+                prune_indexes(keep=index.path)
+            return index
+        except (OSError, sqlite3.Error):
+            return None # Read-only cache: analyze without a sidecar
+
+    def _stream_native(self, total, progress):
+        """Built-in parser. Returns how many frames were IP (0 = nothing it understood)."""
+        with pcap_reader.CaptureReader(self.filepath) as reader:
+            for pkt in reader.packets():
+                self._analyze_native(pkt)
+                if progress and reader.dissected % PROGRESS_EVERY == 0:
+                    progress(reader.position, total, reader.frames)
+            self.packets = reader.frames
+            return reader.dissected
+
+    def _analyze_parallel(self, total, progress):
+        """First pass shards the capture by flow, then one process per shard."""
+        shard_dir = tempfile.mkdtemp(prefix="forensix_pcap_")
+        try:
+            with pcap_reader.CaptureReader(self.filepath) as reader:
+                paths = reader.shard(self.workers, shard_dir, progress)
+                self.packets = reader.frames
+                dissected = reader.dissected
+
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = [
+                    pool.submit(_analyze_shard, self.filepath, path, len(paths),
+                                path[:-4] + ".db" if self.index is not None else None)
+                    for path in paths
+                ]
+                for future in as_completed(futures):
+                    self._merge(*future.result())
+        finally:
+            shutil.rmtree(shard_dir, ignore_errors=True)
+        return dissected
+
+    def _merge(self, creds, dns_queries, http_requests, http_count, tcp_stats, index_file):
+        for cred in creds:
+            self._track(self.creds_found, cred)
+        for qname in dns_queries:
+            self._track(self.dns_queries, qname, keep=_flag_dns(qname))
+        for url in http_requests:
+            self._track(self.http_requests, url, keep=_flag_url(url))
+        self.http_count += http_count
+        tcp = self.reassembler
+        streams, evicted, expired, truncated = tcp_stats
+        tcp.streams += streams
+        tcp.evicted += evicted
+        tcp.expired += expired
+        tcp.truncated += truncated
+        if index_file:
+            self.index.merge(index_file)
+
+    def _stream_scapy(self, total, progress):
+        # Stream the PCAP (never the whole packet list in RAM)
+        with PcapReader(self.filepath) as reader:
+            for pkt in reader:
+                self._analyze_packet(pkt)
+                self.packets += 1
+                if progress and self.packets % PROGRESS_EVERY == 0:
+                    self.bytes_read = reader.f.tell()
+                    progress(self.bytes_read, total, self.packets)
+
+    def _track(self, bucket, value, keep=False):
+        # Past the cap only values that will be reported (flags) are still kept
+        if keep or len(bucket) < MAX_TRACKED:
+            bucket.add(value)
+
+    def _check_creds(self, data, start, end):
+        """Cleartext credentials in data[start:end] (bytes, bytearray or mmap: searched in place)"""
+        # Basic Grep for user/pass in raw payload (FTP, Telnet, HTTP)
+        # This is "dirty" but effective for CTFs. Only matching lines are decoded.
+        for marker in (b"USER ", b"PASS "):
+            for line_start, line_end in _lines_with(data, marker, start, end):
+                line = bytes(data[line_start:min(line_end, line_start + MAX_CRED_LINE)])
+                self._track(self.creds_found, f"Cleartext Creds: {line.decode('utf-8', errors='ignore').strip()}")
+
+        # HTTP Basic Auth
+        marker = b"Authorization: Basic "
+        for line_start, line_end in _lines_with(data, marker, start, end):
+            auth = data.find(marker, line_start, line_end) + len(marker)
+            token = bytes(data[auth:min(line_end, auth + MAX_CRED_LINE)]).strip()
             try:
-                # Basic Grep for user/pass in raw payload (FTP, Telnet, HTTP)
-                # This is "dirty" but effective for CTFs
-                decoded = load.decode('utf-8', errors='ignore')
-                
-                # FTP/Telnet patterns
-                if "USER " in decoded or "PASS " in decoded:
-                    self.creds_found.append(f"Cleartext Creds: {decoded.strip()}")
-
-                # HTTP Basic Auth
-                if "Authorization: Basic" in decoded:
-                    import base64
-                    try:
-                        auth_str = decoded.split("Authorization: Basic ")[1].split("\r\n")[0]
-                        creds = base64.b64decode(auth_str).decode('utf-8')
-                        self.creds_found.append(f"HTTP Basic Auth: {creds}")
-                    except:
-                        pass
-                        
-            except:
+                creds = base64.b64decode(token).decode('utf-8')
+                self._track(self.creds_found, f"HTTP Basic Auth: {creds}")
+            except ValueError: # Bad base64 / not UTF-8
                 pass
 
-        # 2. HTTP Analysis
-        if pkt.haslayer("HTTPRequest"):
-            # Scapy's HTTP layer is powerful
-            http = pkt["HTTPRequest"]
-            url = f"{http.Host.decode()}{http.Path.decode()}"
-            self.http_requests.append(url)
+    def _analyze_native(self, pkt):
+        data = pkt.data
+        flow = self.index.add_packet(pkt) if self.index is not None else None
+
+        # 1. TCP: into the reassembler (creds & HTTP are checked per stream)
+        if pkt.proto == pcap_reader.TCP and not pkt.fragment:
+            payload = data[pkt.start:pkt.end] if pkt.start < pkt.end else b""
+            self.reassembler.add((pkt.src, pkt.dst, pkt.sport, pkt.dport), pkt.seq, pkt.flags, payload,
+                                 pkt.ts, pkt.offset, flow)
+            return
+        if pkt.start >= pkt.end:
+            return
+
+        # 2. Credential Harvesting (Cleartext, non-TCP payloads)
+        self._check_creds(data, pkt.start, pkt.end)
+
+        # 3. DNS Analysis
+        if pkt.proto == pcap_reader.UDP and (pkt.sport in pcap_reader.DNS_PORTS or pkt.dport in pcap_reader.DNS_PORTS):
+            qname = pcap_reader.dns_query(data, pkt.start, pkt.end)
+            if qname:
+                self._track(self.dns_queries, qname, keep=_flag_dns(qname))
+                if self.index is not None:
+                    self.index.add_dns(qname, flow, pkt.ts)
+
+    def _analyze_stream(self, stream):
+        """Detectors over one reassembled TCP direction (called once per stream)"""
+        data = stream.data
+        self._check_creds(data, 0, len(data))
+
+        # HTTP Analysis (every request of a keep-alive connection)
+        for host, path in pcap_reader.http_requests(data):
+            url = f"{host}{path}"
+            self.http_count += 1
+            self._track(self.http_requests, url, keep=_flag_url(url))
+            if self.index is not None:
+                self.index.add_http(host, path, stream.flow, stream.first_ts)
+
+    def _analyze_packet(self, pkt):
+        # 1. TCP: into the reassembler (creds & HTTP are checked per stream)
+        if pkt.haslayer(TCP) and (pkt.haslayer(IP) or pkt.haslayer("IPv6")):
+            ip, tcp = pkt[IP] if pkt.haslayer(IP) else pkt["IPv6"], pkt[TCP]
+            self.reassembler.add((ip.src, ip.dst, tcp.sport, tcp.dport), tcp.seq, int(tcp.flags),
+                                 bytes(tcp.payload), float(pkt.time))
+            return
+
+        # 2. Credential Harvesting (Cleartext, non-TCP payloads)
+        if pkt.haslayer(Raw):
+            load = pkt[Raw].load
+            self._check_creds(load, 0, len(load))
 
         # 3. DNS Analysis
         if pkt.haslayer(DNS) and pkt.haslayer(UDP):
             if pkt[DNS].qr == 0: # Query
                 qname = pkt[DNS].qd.qname.decode('utf-8')
-                self.dns_queries.add(qname)
+                self._track(self.dns_queries, qname, keep=_flag_dns(qname))
 
     def _summarize_findings(self):
         # Report Credentials
         if self.creds_found:
-            for cred in set(self.creds_found): # Deduplicate
+            for cred in sorted(self.creds_found): # Deduplicated while streaming
                 self.findings.append(f"🔥 CREDENTIAL: {cred}")
 
         # Report Suspicious DNS
-        for dns in self.dns_queries:
-            if "flag" in dns or "ctf" in dns:
+        for dns in sorted(self.dns_queries):
+            if _flag_dns(dns):
                 self.findings.append(f"🚩 FLAG DNS: {dns}")
 
         # Report HTTP
-        if len(self.http_requests) > 0:
-            self.findings.append(f"INFO: {len(self.http_requests)} HTTP requests tracked.")
+        if self.http_count > 0:
+            self.findings.append(f"INFO: {self.http_count} HTTP requests tracked.")
             # Check for flag in URLs
-            for url in self.http_requests:
-                if "flag" in url.lower() or "secret" in url.lower():
+            for url in sorted(self.http_requests):
+                if _flag_url(url):
                     self.findings.append(f"🚩 FLAG URL: {url}")
 
+        self.findings.append(f"INFO: {self.packets} packets streamed ({self.bytes_read/1024/1024:.1f} MB)")
+        tcp = self.reassembler
+        if tcp.streams:
+            self.findings.append(
+                f"INFO: {tcp.streams} TCP streams reassembled "
+                f"({tcp.evicted} flushed early, {tcp.expired} idle, {tcp.truncated} over the per-stream cap)"
+            )
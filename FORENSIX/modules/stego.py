@@ -1,32 +1,54 @@
 import os
-import struct
+
+try: from forensix.core.evidence import EvidenceBuffer
+except ImportError: from core.evidence import EvidenceBuffer
+
+try: from forensix.core.steganalysis import LsbAnalysis, decode
+except ImportError: from core.steganalysis import LsbAnalysis, decode
+
+try: from forensix.core.image_structure import walk
+except ImportError: from core.image_structure import walk
+
+try: from forensix.core.signatures import SIGNATURE_INDEX, SIGNATURE_SPAN
+except ImportError: from core.signatures import SIGNATURE_INDEX, SIGNATURE_SPAN
+
+OVERLAY_NOISE = {"jpeg": 100} # Bytes after the end that are still padding, not payload
+MAX_ANOMALIES = 10            # Structure anomalies reported per image
 
 class StegoDetector:
-    def __init__(self, filepath):
+    def __init__(self, filepath, buffer=None):
         self.filepath = filepath
+        self.buffer = buffer # Shared EvidenceBuffer (opened by FileAnalyzer)
         self.findings = []
+        self.lsb = None      # LsbAnalysis of PNG / BMP pixels
+        self.structure = None # ImageStructure (logical end, chunks, anomalies)
     
     def scan(self):
         """Scans for common steganography techniques"""
-        if not os.path.exists(self.filepath):
-            return []
+        data = self.buffer
+        if data is None:
+            if not os.path.exists(self.filepath):
+                return []
+            data = EvidenceBuffer(self.filepath)
+
+        try:
+            # 1. Trailing Data Check (Overlay Steganography)
+            # Did someone append a zip to a jpg? (exact: the image is walked chunk by chunk)
+            self._check_trailing_data(data)
             
-        with open(self.filepath, 'rb') as f:
-            data = f.read()
+            # 2. Keyphrase Search (Simple tool signatures)
+            self._check_tool_signatures(data)
 
-        # 1. Trailing Data Check (Overlay Steganography)
-        # Did someone append a zip to a jpg?
-        self._check_trailing_data(data)
-        
-        # 2. Keyphrase Search (Simple tool signatures)
-        self._check_tool_signatures(data)
-
-        return self.findings
+            # 3. LSB Steganalysis (PNG/BMP pixels, native - no zsteg)
+            self._check_lsb(data)
+        finally:
+            if data is not self.buffer:
+                data.close()
 
         return self.findings
 
     def run_deep_scan(self):
-        """Runs heavy tools: Binwalk, Steghide, Zsteg"""
+        """Runs heavy tools: Binwalk, Exiftool, Steghide (LSB planes are analyzed natively in scan())"""
         from forensix.core.tools import Tools
         
         # 1. Binwalk (Overlay/Embedded Files)
@@ -52,47 +74,57 @@ class StegoDetector:
             elif "passphrase" in err:
                 self.findings.append("Steghide: Compatible file, password likely required.")
 
-        # 4. Zsteg (Ruby tool for PNG/BMP LSB)
-        if Tools.has_tool('zsteg') and self.filepath.endswith('.png'):
-            success, out, _ = Tools.run_command('zsteg', ['-a', self.filepath])
-            if success and "text" in out:
-                # Filter noise
-                lines = [l for l in out.splitlines() if "text" in l]
-                if lines:
-                    self.findings.append(f"Zsteg: Potential hidden text in LSB channels.")
-
     def _check_trailing_data(self, data):
-        """Detects data appended after the end of file marker"""
-        # JPEG End of Image (EOI)
-        if data.startswith(b'\xFF\xD8'): 
-            eoi = data.rfind(b'\xFF\xD9')
-            if eoi != -1 and eoi < len(data) - 2:
-                # Calculate size of trailing data
-                extra_bytes = len(data) - (eoi + 2)
-                if extra_bytes > 100: # Ignore tiny noise
-                    self.findings.append(f"Suspicious: {extra_bytes} bytes found after JPEG EOF (Hidden Archive?)")
-        
-        # PNG End (IEND chunk)
-        elif data.startswith(b'\x89PNG'):
-            iend = data.rfind(b'IEND')
-            if iend != -1:
-                # IEND chunk includes 4 byte CRC after "IEND"
-                # so actual end is iend + 4 + 4 = iend + 8
-                eof = iend + 8
-                if eof < len(data):
-                    extra_bytes = len(data) - eof
-                    if extra_bytes > 50:
-                        self.findings.append(f"Suspicious: {extra_bytes} bytes found after PNG EOF")
+        """Walks the image's chunks / segments to its logical end: appended data + structure anomalies"""
+        self.structure = walk(data.data, 0, data.size)
+        if self.structure is None:
+            return
+        kind = self.structure.format.upper()
+
+        overlay = self.structure.overlay
+        if overlay:
+            offset, extra_bytes = overlay
+            if extra_bytes > OVERLAY_NOISE.get(self.structure.format, 50): # Ignore tiny noise
+                appended = SIGNATURE_INDEX.match(data.view[offset:offset + SIGNATURE_SPAN])
+                what = f"{appended} file" if appended else "Hidden Archive?"
+                self.findings.append(f"Suspicious: {extra_bytes} bytes found after {kind} EOF at offset 0x{offset:x} ({what})")
+
+        for anomaly in self.structure.anomalies[:MAX_ANOMALIES]:
+            self.findings.append(f"{kind} Structure: {anomaly}")
+        hidden = len(self.structure.anomalies) - MAX_ANOMALIES
+        if hidden > 0:
+            self.findings.append(f"{kind} Structure: ... and {hidden} more anomalies")
+
+    def _check_lsb(self, data):
+        """Chi-square / RS / sample-pair analysis + payload screening of every LSB layout"""
+        raster = decode(data.view)
+        if raster is None:
+            return
+        self.lsb = LsbAnalysis(raster).run()
+
+        for plane, layout, order, kind, text in self.lsb.payloads:
+            where = f"bit{plane},{layout},{order}"
+            if kind == "text":
+                self.findings.append(f"LSB Payload ({where}): hidden text '{text[:80]}'")
+            else:
+                self.findings.append(f"LSB Payload ({where}): embedded {kind} file")
+        for channel in raster.channels:
+            share = self.lsb.equalized(channel)
+            if share:
+                self.findings.append(f"LSB Chi-Square: channel {channel} value pairs equalized over the first {share:.0%} of pixels")
+            rate = self.lsb.embedded(channel)
+            if rate:
+                self.findings.append(f"LSB Steganalysis: ~{rate:.0%} of channel {channel} LSBs carry data (RS/SPA)")
 
     def _check_tool_signatures(self, data):
         """Detects signatures of common CTF stego tools"""
         tools = {
             b'steghide': "Steghide detected",
             b'outguess': "Outguess detected",
-            b'F5': "F5 Steganography detected",
+            b'James R. Weeks and BioElectroMech': "F5 Steganography detected", # F5's JPEG comment
             b'openstego': "OpenStego detected"
         }
         for sig, name in tools.items():
-            if sig in data:
+            if data.find(sig) != -1:
                 self.findings.append(f"Tool Signature: {name}")
 
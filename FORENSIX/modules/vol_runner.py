@@ -0,0 +1,292 @@
+import os
+import re
+import json
+import time
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    from forensix.core.tools import Tools
+    from forensix.core.cache import CACHE_DIR, content_digest
+except ImportError:
+    from core.tools import Tools
+    from core.cache import CACHE_DIR, content_digest
+
+# 🧠 FORENSIX SENTINEL - VOLATILITY ORCHESTRATOR
+# Volatility 3 plugins are slow (minutes each on a big dump) but independent:
+#   1. A probe plugin tells which OS the dump comes from
+#   2. That OS's plugin set runs concurrently (a few vol processes at once)
+#   3. Every plugin uses the JSON renderer -> parsed into records (dicts)
+#   4. Results are cached per (dump sha256, plugin, vol version), so
+#      re-opening a case costs one lookup instead of re-running everything.
+# Without `vol`, Volatility 2 (`volatility`) is the fallback: imageinfo picks the
+# profile and the Windows set runs as its Vol2 commands (Linux / Mac Vol2
+# profiles are built per kernel, so those dumps can't be profiled automatically).
+# FORENSIX_VOL_PLUGINS="windows.pslist,windows.netscan" overrides the plugin set.
+
+PLUGIN_SETS = {
+    "windows": ["windows.pslist", "windows.pstree", "windows.cmdline", "windows.netscan", "windows.malfind"],
+    "linux": ["linux.pslist", "linux.bash", "linux.sockstat"],
+    "mac": ["mac.pslist", "mac.bash"],
+}
+WINDOWS_PROBE = "windows.info"
+BANNER_PROBE = "banners.Banners"  # Works on any image: Linux / Darwin kernel banners
+VOL2_PROBE = "imageinfo"          # Volatility 2: suggests the profiles (text output only)
+VOL2_COMMANDS = {                 # Vol3 plugin -> Vol2 command
+    "windows.pslist": "pslist", "windows.pstree": "pstree", "windows.cmdline": "cmdline",
+    "windows.netscan": "netscan", "windows.malfind": "malfind",
+}
+PLUGIN_TIMEOUT = 900              # Seconds per plugin (netscan/malfind on 16GB dumps are slow)
+PROBE_TIMEOUT = 120
+MAX_WORKERS = 4                   # Each vol process can hold GBs of symbol tables + page cache
+
+_VERSIONS = {} # tool -> version
+
+
+def vol_tool():
+    """'vol' (Volatility 3), 'volatility' (Volatility 2) or None when neither is installed."""
+    for tool in ('vol', 'volatility'):
+        if Tools.has_tool(tool):
+            return tool
+    return None
+
+
+def vol_version(tool='vol'):
+    """Installed Volatility version (part of every cache key), or None without that tool."""
+    if tool not in _VERSIONS and Tools.has_tool(tool):
+        success, out, err = Tools.run_command(tool, ['-h'], timeout=PROBE_TIMEOUT)
+        match = re.search(r'Volatility (?:3 )?Framework (\S+)', out + err) if success else None
+        if match:
+            _VERSIONS[tool] = match.group(1)
+        else:
+            # Unknown output: the binary itself identifies the install
+            path = Tools.available_tools[tool]
+            _VERSIONS[tool] = f"{path}@{os.stat(path).st_mtime_ns}"
+    return _VERSIONS.get(tool)
+
+
+def parse_records(rows, depth=0):
+    """
+    Flattens vol3 JSON rows (tree plugins nest them in __children) into plain dicts.
+    Vol2's {"columns": [...], "rows": [[...]]} document is zipped into the same dicts.
+    """
+    if isinstance(rows, dict) and "columns" in rows and "rows" in rows:
+        rows = [dict(zip(rows["columns"], row)) for row in rows["rows"]]
+    records = []
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        record = {key: value for key, value in row.items() if key != "__children"}
+        record["__depth"] = depth
+        records.append(record)
+        records.extend(parse_records(row.get("__children") or [], depth + 1))
+    return records
+
+
+class PluginResult:
+    def __init__(self, plugin, records=None, error=None, cached=False, elapsed=0.0):
+        self.plugin = plugin
+        self.records = records or []
+        self.error = error
+        self.cached = cached
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class VolatilityRunner:
+    def __init__(self, filepath, workers=None, timeout=PLUGIN_TIMEOUT, cache_path=None, sha256=None):
+        self.filepath = filepath
+        self.workers = max(1, min(workers or os.cpu_count() or 1, MAX_WORKERS))
+        self.timeout = timeout
+        self.cache_path = cache_path or os.path.join(CACHE_DIR, "volatility.db")
+        self.tool = vol_tool()
+        self.profile = None # Volatility 2 profile (from imageinfo)
+        self.os_name = None
+        self.results = {}  # plugin -> PluginResult
+        self._sha256 = sha256 # Known by the caller (FileAnalyzer hashed the dump already)
+        self._db = None
+
+    @property
+    def available(self):
+        return self.tool is not None
+
+    @property
+    def legacy(self):
+        """True when running on the Volatility 2 fallback"""
+        return self.tool == 'volatility'
+
+    @property
+    def framework(self):
+        """'Volatility 3 2.5.0' / 'Volatility 2 2.6' for reports"""
+        return f"Volatility {2 if self.legacy else 3} {vol_version(self.tool)}"
+
+    def analyze(self, plugins=None):
+        """
+        Runs `plugins` (default: the set for the detected OS) and returns
+        {plugin: PluginResult}. Nothing runs if neither vol nor volatility is installed.
+        """
+        if not self.available:
+            return {}
+        try:
+            plugins = plugins or _configured_plugins()
+            if not plugins or self.legacy: # Vol2 needs the profile whatever runs
+                self.os_name = self.detect_os()
+            if not plugins:
+                plugins = PLUGIN_SETS.get(self.os_name, [])
+                if self.legacy:
+                    plugins = [plugin for plugin in plugins if plugin in VOL2_COMMANDS]
+            self.run(plugins)
+        finally:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+        return self.results
+
+    def detect_os(self):
+        """'windows', 'linux', 'mac' or None (probe results are cached like any plugin)."""
+        if self.legacy:
+            info = self.run([VOL2_PROBE], timeout=PROBE_TIMEOUT)[VOL2_PROBE]
+            profiles = [str(record.get("Profile")) for record in info.records]
+            windows = [profile for profile in profiles if profile.startswith(("Win", "Vista"))]
+            if windows:
+                self.profile = windows[0]
+                return "windows"
+            return None
+
+        info = self.run([WINDOWS_PROBE], timeout=PROBE_TIMEOUT)[WINDOWS_PROBE]
+        if info.ok and info.records:
+            return "windows"
+        banners = self.run([BANNER_PROBE], timeout=PROBE_TIMEOUT)[BANNER_PROBE]
+        text = " ".join(str(record.get("Banner", "")) for record in banners.records)
+        if "Linux version" in text:
+            return "linux"
+        if "Darwin" in text:
+            return "mac"
+        return None
+
+    def run(self, plugins, timeout=None):
+        """Cached plugins are answered from disk, the others run in a bounded pool."""
+        timeout = timeout or self.timeout
+        pending = []
+        for plugin in plugins:
+            cached = self._lookup(plugin)
+            if cached is not None:
+                self.results[plugin] = cached
+            else:
+                pending.append(plugin)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+                futures = {pool.submit(self._run_plugin, plugin, timeout): plugin for plugin in pending}
+                for future in as_completed(futures):
+                    result = future.result()
+                    self.results[result.plugin] = result
+                    if result.ok:
+                        self._store(result) # Failures may be transient (timeouts): never cached
+        for plugin in plugins: # Keep the requested order (not completion order)
+            self.results[plugin] = self.results.pop(plugin)
+        return {plugin: self.results[plugin] for plugin in plugins}
+
+    def _run_plugin(self, plugin, timeout):
+        started = time.time()
+        if not self.legacy:
+            args = ['-q', '-r', 'json', '-f', self.filepath, plugin]
+        elif plugin == VOL2_PROBE:
+            args = ['-f', self.filepath, VOL2_PROBE]
+        else:
+            profile = [f'--profile={self.profile}'] if self.profile else []
+            args = ['-f', self.filepath] + profile + [VOL2_COMMANDS.get(plugin, plugin), '--output=json']
+        success, out, err = Tools.run_command(self.tool, args, timeout=timeout)
+        elapsed = time.time() - started
+        if not success:
+            return PluginResult(plugin, error=out, elapsed=elapsed)
+
+        if self.legacy and plugin == VOL2_PROBE:
+            # "Suggested Profile(s) : Win7SP1x64, Win7SP0x64, ..."
+            match = re.search(r'Suggested Profile\(s\)\s*:\s*(.+)', out)
+            profiles = [p.split('(')[0].strip() for p in match.group(1).split(',')] if match else []
+            records = [{"Profile": profile} for profile in profiles if profile and profile != "No suggestion"]
+            return PluginResult(plugin, records, elapsed=elapsed)
+
+        # Skip anything printed before the JSON document (progress, banners)
+        start = min((i for i in (out.find('['), out.find('{')) if i != -1), default=-1)
+        try:
+            data = json.loads(out[start:]) if start != -1 else None
+        except ValueError:
+            data = None
+        if data is None:
+            lines = [line for line in err.splitlines() if line.strip()]
+            return PluginResult(plugin, error=lines[-1] if lines else "No JSON output", elapsed=elapsed)
+        if isinstance(data, dict) and "rows" not in data:
+            data = [data]
+        return PluginResult(plugin, parse_records(data), elapsed=elapsed)
+
+    # --- Result cache -------------------------------------------------------------
+
+    def _key(self, plugin):
+        if self._sha256 is None:
+            # Standalone use: one read of the dump
+            try:
+                self._sha256 = content_digest(self.filepath)
+            except OSError:
+                self._sha256 = ""
+        version = vol_version(self.tool)
+        if self.legacy and version:
+            # Vol2 output also depends on the profile it ran with
+            version = f"vol2-{version}"
+            if plugin != VOL2_PROBE:
+                plugin = f"{plugin}:{self.profile}"
+        return (self._sha256, plugin, version) if self._sha256 and version else None
+
+    def _cache(self):
+        if self._db is None:
+            folder = os.path.dirname(self.cache_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._db = sqlite3.connect(self.cache_path)
+            self._db.executescript("""
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS results (
+                    sha256 TEXT, plugin TEXT, version TEXT,
+                    records TEXT NOT NULL,
+                    elapsed REAL NOT NULL,
+                    created REAL NOT NULL,
+                    PRIMARY KEY (sha256, plugin, version)
+                );
+            """)
+        return self._db
+
+    def _lookup(self, plugin):
+        key = self._key(plugin)
+        if key is None:
+            return None
+        try:
+            row = self._cache().execute(
+                "SELECT records, elapsed FROM results WHERE sha256=? AND plugin=? AND version=?", key
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        return PluginResult(plugin, json.loads(row[0]), cached=True, elapsed=row[1])
+
+    def _store(self, result):
+        key = self._key(result.plugin)
+        if key is None:
+            return
+        try:
+            self._cache().execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                key + (json.dumps(result.records), result.elapsed, time.time())
+            )
+            self._cache().commit()
+        except (sqlite3.Error, TypeError, ValueError):
+            pass
+
+
+def _configured_plugins():
+    value = os.environ.get("FORENSIX_VOL_PLUGINS", "")
+    return [plugin.strip() for plugin in value.split(",") if plugin.strip()]
@@ -0,0 +1,243 @@
+import os
+import hmac
+import mmap
+import time
+import zlib
+import struct
+import hashlib
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# 🔓 FORENSIX SENTINEL - ZIP PASSWORD CRACKER
+# Wrong passwords are rejected in memory, nothing is ever written to disk.
+#
+# ZipCrypto: 12-byte encryption header -> its last byte must match the CRC
+#            (or mod-time) check byte. One wrong password in 256 survives each
+#            member checked, survivors are CRC-verified on the smallest member.
+# WinZip AES: PBKDF2-HMAC-SHA1 -> 2-byte password verifier, then the HMAC
+#            authentication code of the smallest member.
+#
+# The wordlist is mmap'd and cut into newline-aligned blocks that a process
+# pool works through; the parent reports progress and passwords/s.
+
+BLOCK_SIZE = 1024 * 1024   # Wordlist bytes per task
+CHECK_MEMBERS = 3          # ZipCrypto headers checked before the full CRC verify
+AES_EXTRA_ID = 0x9901
+AES_KEY_LENGTHS = {1: 16, 2: 24, 3: 32}  # Strength -> key size (salt is half of it)
+AES_ITERATIONS = 1000
+AES_MAC_LENGTH = 10
+
+
+def _crc_table():
+    table = []
+    for n in range(256):
+        c = n
+        for _ in range(8):
+            c = (c >> 1) ^ 0xEDB88320 if c & 1 else c >> 1
+        table.append(c)
+    return table
+
+
+CRC_TABLE = _crc_table()
+# Keystream byte only depends on the low 16 bits of key2
+DECRYPT_TABLE = [(((k | 2) * ((k | 2) ^ 1)) >> 8) & 0xFF for k in range(65536)]
+
+
+def _zipcrypto_check(pwd, headers, crc=CRC_TABLE, dec=DECRYPT_TABLE):
+    """True if `pwd` decrypts every 12-byte header to its expected check byte."""
+    k0, k1, k2 = 0x12345678, 0x23456789, 0x34567890
+    for c in pwd:
+        k0 = (k0 >> 8) ^ crc[(k0 ^ c) & 0xFF]
+        k1 = ((k1 + (k0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+        k2 = (k2 >> 8) ^ crc[(k2 ^ (k1 >> 24)) & 0xFF]
+    keys = (k0, k1, k2)
+
+    for header, check in headers:
+        k0, k1, k2 = keys
+        for c in header:
+            c ^= dec[k2 & 0xFFFF]
+            k0 = (k0 >> 8) ^ crc[(k0 ^ c) & 0xFF]
+            k1 = ((k1 + (k0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+            k2 = (k2 >> 8) ^ crc[(k2 ^ (k1 >> 24)) & 0xFF]
+        if c != check:
+            return False
+    return True
+
+
+def _aes_strength(info):
+    """WinZip AES strength (1-3) from the 0x9901 extra field, or None."""
+    extra = info.extra
+    pos = 0
+    while pos + 4 <= len(extra):
+        field_id, size = struct.unpack_from('<HH', extra, pos)
+        if field_id == AES_EXTRA_ID and size >= 7:
+            return extra[pos + 8]
+        pos += 4 + size
+    return None
+
+
+def _dos_time(info):
+    """The 16-bit DOS time word of a member, rebuilt from its date_time."""
+    _, _, _, hour, minute, second = info.date_time
+    return (hour << 11) | (minute << 5) | (second // 2)
+
+
+def _member_data(f, info):
+    """Raw (still encrypted) bytes of one member, read straight from the archive."""
+    f.seek(info.header_offset)
+    local = f.read(30)
+    name_len, extra_len = struct.unpack_from('<HH', local, 26)
+    f.seek(info.header_offset + 30 + name_len + extra_len)
+    return f.read(info.compress_size)
+
+
+class ZipTarget:
+    """Everything a worker needs to test passwords against one encrypted ZIP."""
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.mode = None      # "zipcrypto" or "aes"
+        self.headers = []     # ZipCrypto: (12-byte header, check byte)
+        self.smallest = None  # Member used for the final verification
+        self.aes = None       # AES: (key length, salt, verifier, ciphertext, mac)
+
+        with zipfile.ZipFile(filepath) as zf:
+            encrypted = [i for i in zf.infolist() if i.flag_bits & 0x1 and not i.is_dir()]
+        if not encrypted:
+            return
+        encrypted.sort(key=lambda i: i.compress_size)
+        self.smallest = encrypted[0].filename
+
+        with open(filepath, 'rb') as f:
+            if encrypted[0].compress_type == 99:
+                strength = _aes_strength(encrypted[0])
+                if strength not in AES_KEY_LENGTHS:
+                    return
+                key_len = AES_KEY_LENGTHS[strength]
+                data = _member_data(f, encrypted[0])
+                salt_len = key_len // 2
+                self.aes = (
+                    key_len,
+                    data[:salt_len],
+                    data[salt_len:salt_len + 2],
+                    data[salt_len + 2:-AES_MAC_LENGTH],
+                    data[-AES_MAC_LENGTH:],
+                )
+                self.mode = "aes"
+            else:
+                for info in encrypted[:CHECK_MEMBERS]:
+                    if info.compress_type == 99:
+                        continue
+                    header = _member_data(f, info)[:12]
+                    # Bit 3: CRC not known up front, the check byte is the DOS mod time's high byte
+                    check = _dos_time(info) >> 8 if info.flag_bits & 0x8 else info.CRC >> 24
+                    self.headers.append((header, check))
+                self.mode = "zipcrypto" if self.headers else None
+
+    def verify(self, pwd, zf=None):
+        """Full check of a candidate that passed the cheap filter (all in memory)."""
+        if self.mode == "aes":
+            key_len, salt, verifier, ciphertext, mac = self.aes
+            keys = hashlib.pbkdf2_hmac('sha1', pwd, salt, AES_ITERATIONS, 2 * key_len + 2)
+            if keys[-2:] != verifier:
+                return False
+            auth = hmac.new(keys[key_len:2 * key_len], ciphertext, hashlib.sha1).digest()
+            return auth[:AES_MAC_LENGTH] == mac
+
+        try:
+            with zf.open(self.smallest, pwd=pwd) as member:
+                while member.read(BLOCK_SIZE): # CRC is checked at EOF
+                    pass
+            return True
+        except (RuntimeError, zipfile.BadZipFile, zlib.error, NotImplementedError, EOFError, ValueError):
+            return False
+
+
+def _crack_block(target, wordlist, start, end):
+    """Worker: tests every password in wordlist[start:end]. Returns (password or None, tried)."""
+    with open(wordlist, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            candidates = mm[start:end].split(b'\n')
+
+    tried = 0
+    with zipfile.ZipFile(target.filepath) as zf:
+        for pwd in candidates:
+            pwd = pwd.rstrip(b'\r')
+            if not pwd:
+                continue
+            tried += 1
+            if target.mode == "aes":
+                if target.verify(pwd):
+                    return pwd, tried
+            elif _zipcrypto_check(pwd, target.headers) and target.verify(pwd, zf):
+                return pwd, tried
+    return None, tried
+
+
+def _blocks(mm, block_size):
+    """Newline-aligned (start, end) ranges covering the whole wordlist."""
+    start, size = 0, len(mm)
+    while start < size:
+        end = mm.find(b'\n', min(start + block_size, size))
+        end = size if end == -1 else end + 1
+        yield start, end
+        start = end
+
+
+class ZipCracker:
+    def __init__(self, wordlist, workers=None, block_size=BLOCK_SIZE):
+        self.wordlist = wordlist
+        self.workers = workers or os.cpu_count() or 1
+        self.block_size = block_size
+        self.tried = 0
+        self.elapsed = 0.0
+
+    @property
+    def rate(self):
+        """Passwords per second of the last run."""
+        return self.tried / self.elapsed if self.elapsed else 0.0
+
+    def crack(self, filepath, progress=None):
+        """
+        Returns the password (bytes) of an encrypted ZIP, or None.
+        `progress(done_bytes, total_bytes, tried, rate)` is called as blocks finish.
+        """
+        self.tried, self.elapsed = 0, 0.0
+        target = ZipTarget(filepath)
+        if not target.mode or os.path.getsize(self.wordlist) == 0:
+            return None
+
+        started = time.time()
+        with open(self.wordlist, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                blocks = list(_blocks(mm, self.block_size))
+                total = len(mm)
+
+        found, done = None, 0
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            blocks = iter(blocks)
+            running = {}
+            while True:
+                # Keep a short backlog per worker so a hit cancels little work
+                for start, end in blocks:
+                    running[pool.submit(_crack_block, target, self.wordlist, start, end)] = end - start
+                    if len(running) >= self.workers * 2:
+                        break
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done += running.pop(future)
+                    pwd, tried = future.result()
+                    self.tried += tried
+                    found = found or pwd
+                self.elapsed = time.time() - started
+                if progress:
+                    progress(done, total, self.tried, self.rate)
+                if found:
+                    for future in running:
+                        future.cancel()
+                    break
+
+        self.elapsed = time.time() - started
+        return found
@@ -15,18 +15,7 @@ sudo apt install -y python3-pip python3-venv binwalk steghide foremost libimage-
 # Optional: bruteforce-luks if available, else skip
 sudo apt install -y bruteforce-luks || echo -e "${RED}[!] bruteforce-luks not found, skipping.${NC}"
 
-# 2. Ruby Tools (Zsteg)
-echo -e "${GREEN}[+] Installing Zsteg (Ruby)...${NC}"
-# Check if gem exists
-if command -v gem &> /dev/null; then
-    sudo gem install zsteg
-else
-    echo -e "${RED}[!] Ruby/Gem not found. Installing ruby-full...${NC}"
-    sudo apt install -y ruby-full
-    sudo gem install zsteg
-fi
-
-# 3. Volatility 3 (Manual Install)
+# 2. Volatility 3 (Manual Install)
 # Volatility 3 is often not in apt. Best to use pip or git.
 echo -e "${GREEN}[+] Installing Volatility 3...${NC}"
 if ! command -v vol &> /dev/null && ! command -v volatility3 &> /dev/null; then
@@ -39,7 +28,7 @@ else
     echo -e "${GREEN}[+] Volatility detected.${NC}"
 fi
 
-# 4. Python Dependencies
+# 3. Python Dependencies
 echo -e "${GREEN}[+] Installing Python Requirements...${NC}"
 pip3 install -r requirements.txt --break-system-packages 2>/dev/null || pip3 install -r requirements.txt
 
@@ -0,0 +1,62 @@
+import io
+import os
+import sys
+import time
+import random
+import zipfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.carver import Carver
+
+
+def _zip(members, compression=zipfile.ZIP_STORED, comment=b""):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+        archive.comment = comment
+    return buffer.getvalue()
+
+
+class CarverTest(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(8)
+
+    def noise(self, size):
+        return self.random.randbytes(size)
+
+    def test_embedded_zip_is_cut_at_its_eocd_and_comment(self):
+        inner = _zip([("a.txt", b"hello" * 100)], zipfile.ZIP_DEFLATED, comment=b"note")
+        blob = b"junk" * 1000 + inner + b"tail" * 100
+        self.assertEqual(Carver("unused").scan(blob), [(4000, 4000 + len(inner), "application/zip")])
+
+    def test_broken_zip_and_stray_eocd_are_not_carved(self):
+        inner = _zip([("a.txt", b"x" * 100)])
+        blob = self.noise(500) + inner[:-10] + self.noise(500) + b"PK\x05\x06" + bytes(18) + self.noise(100)
+        self.assertEqual([o for o in Carver("unused").scan(blob) if o[2] == "application/zip"], [])
+
+    def test_many_member_archive_is_linear(self):
+        # Every member's local header is a zip candidate; none may rescan to the host's EOCD
+        nested = _zip([("x", b"y" * 50)])
+        members = [(f"m{i}.bin", self.noise(4096)) for i in range(3000)]
+        host = _zip(members[:1500] + [("nested.zip", nested)] + members[1500:])
+
+        started = time.time()
+        objects = Carver("unused").scan(host)
+        self.assertLess(time.time() - started, 5) # Was ~15s: one forward search per header
+
+        zips = [(start, end) for start, end, mime in objects if mime == "application/zip"]
+        offset = host.find(nested)
+        self.assertEqual(zips, [(offset, offset + len(nested))])
+
+    def test_overlapping_magics_are_all_candidates(self):
+        # A JPEG SOI right after another one's first bytes (FF D8 FF D8 FF ...)
+        jpeg = b"\xFF\xD8\xFF\xE0\x00\x04ab\xFF\xD9"
+        blob = b"x" + b"\xFF\xD8" + jpeg + b"tail"
+        self.assertEqual(Carver("unused").scan(blob), [(3, 3 + len(jpeg), "image/jpeg")])
+
+
+if __name__ == "__main__":
+    unittest.main()
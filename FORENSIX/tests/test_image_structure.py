@@ -0,0 +1,120 @@
+import os
+import sys
+import zlib
+import struct
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.image_structure import walk
+
+# An appended archive whose bytes contain every format's end marker
+ARCHIVE = b"PK\x03\x04" + b"\x00" * 26 + b"IEND\xae\x42\x60\x82 \xff\xd9 ; " + b"PK\x05\x06" + b"\x00" * 18
+
+
+def png_chunk(kind, body, crc=None):
+    crc = zlib.crc32(kind + body) if crc is None else crc
+    return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', crc)
+
+
+def png(*extra):
+    ihdr = png_chunk(b'IHDR', struct.pack('>IIBBBBB', 2, 2, 8, 2, 0, 0, 0))
+    idat = png_chunk(b'IDAT', zlib.compress(b"\x00" + bytes(6) + b"\x00" + bytes(6)))
+    return b'\x89PNG\r\n\x1a\n' + ihdr + b"".join(extra) + idat
+
+
+PNG = png() + png_chunk(b'IEND', b"")
+
+
+def jpeg_segment(marker, body):
+    return bytes([0xFF, marker]) + struct.pack('>H', 2 + len(body)) + body
+
+
+THUMBNAIL = b"\xff\xd8" + jpeg_segment(0xDB, bytes(65)) + b"\xff\xd9" # EXIF thumbnail: its own EOI
+JPEG_SCAN = (b"\xff\xd8" + jpeg_segment(0xE0, b"JFIF\x00" + bytes(9)) + jpeg_segment(0xE1, b"Exif\x00\x00" + THUMBNAIL)
+             + jpeg_segment(0xDB, bytes(65)) + jpeg_segment(0xC0, bytes(15)) + jpeg_segment(0xDA, bytes(10))
+             + b"\x12\xff\x00\x34\xff\xd0\x56\xff\xff\xd1\x78") # Stuffed 0xFF, RST markers, fill byte
+JPEG = JPEG_SCAN + b"\xff\xd9"
+
+GIF_IMAGE = b"\x2c" + struct.pack('<HHHHB', 0, 0, 2, 2, 0) + b"\x02" + b"\x02\x44\x01" + b"\x00"
+GIF_BODY = (b"GIF89a" + struct.pack('<HHBBB', 2, 2, 0x80, 0, 0) + bytes(6)     # 2-entry global color table
+            + b"\x21\xf9\x04\x00\x00\x00\x00\x00" + b"\x21\xfe\x03hi!\x00" + GIF_IMAGE)
+GIF = GIF_BODY + b"\x3b"
+
+
+def bmp(size=None, pixels_at=54, compression=0, width=3, height=2, pixel_bytes=None):
+    pixel_bytes = 24 if pixel_bytes is None else pixel_bytes # 3x2 at 24 bits: 2 rows padded to 12 bytes
+    size = pixels_at + pixel_bytes if size is None else size
+    return (struct.pack('<2sIIII', b'BM', size, 0, pixels_at, 40)
+            + struct.pack('<iiHHIIiiII', width, height, 1, 24, compression, 0, 2835, 2835, 0, 0)
+            + bytes(max(pixels_at - 54, 0)) + bytes(pixel_bytes))
+
+
+class ImageStructureTest(unittest.TestCase):
+    def assertClean(self, image, format):
+        structure = walk(image + ARCHIVE)
+        self.assertEqual(structure.format, format)
+        self.assertEqual(structure.anomalies, [])
+        self.assertEqual(structure.end, len(image))
+        self.assertEqual(structure.overlay, (len(image), len(ARCHIVE)))
+        self.assertIsNone(walk(image).overlay) # Nothing appended
+
+    def assertBroken(self, image, anomaly):
+        structure = walk(image)
+        self.assertIsNone(structure.end)
+        self.assertIsNone(structure.overlay)
+        self.assertTrue(any(anomaly in a for a in structure.anomalies), structure.anomalies)
+
+    def test_appended_archive(self):
+        self.assertClean(PNG, "png")
+        self.assertClean(JPEG, "jpeg")
+        self.assertClean(GIF, "gif")
+        self.assertClean(bmp(), "bmp")
+
+    def test_image_inside_a_larger_buffer(self):
+        data = b"junk" * 10 + PNG + ARCHIVE
+        structure = walk(data, 40, len(data))
+        self.assertEqual(structure.overlay, (40 + len(PNG), len(ARCHIVE)))
+
+    def test_png_truncated_and_corrupt(self):
+        self.assertBroken(png(), "PNG ends without IEND")
+        self.assertBroken(PNG[:-20], "runs past the end of the file")
+        self.assertBroken(PNG[:8] + PNG[16:], "Broken PNG chunk header")
+
+        bad_crc = walk(png(png_chunk(b'tEXt', b"Comment\x00hi", crc=0)) + png_chunk(b'IEND', b""))
+        self.assertIsNotNone(bad_crc.end)
+        self.assertTrue(any(a.startswith("Bad CRC on PNG chunk tEXt") for a in bad_crc.anomalies))
+        unknown = walk(png(png_chunk(b'stEg', b"payload")) + png_chunk(b'IEND', b""))
+        self.assertTrue(any("Unknown PNG chunk 'stEg'" in a for a in unknown.anomalies))
+
+    def test_jpeg_truncated_and_corrupt(self):
+        self.assertBroken(JPEG_SCAN, "scan data runs to the end")
+        self.assertBroken(JPEG[:40], "truncated")
+        self.assertBroken(JPEG[:20] + b"\x00\x00" + JPEG[22:], "Data where a JPEG marker should be")
+        self.assertBroken(b"\xff\xd8\xff\xe0\x00\x01" + bytes(10), "Bad JPEG segment length")
+        self.assertBroken(b"\xff\xd8\xff\xdb\x00", "ends mid-header")
+
+    def test_gif_truncated_and_corrupt(self):
+        self.assertBroken(GIF_BODY, "GIF ends without a trailer")
+        self.assertBroken(GIF_BODY[:-3], "GIF ends without a trailer") # Sub-block chain cut short
+        self.assertBroken(GIF_BODY + b"\x99\x3b", "Unknown GIF block 0x99")
+        self.assertBroken(b"GIF89a\x02\x00", "ends mid-header")
+
+    def test_bmp_truncated_and_corrupt(self):
+        self.assertBroken(bmp()[:-1], "BMP pixel data runs past the end of the file")
+        self.assertBroken(bmp()[:10] + struct.pack('<I', 500) + bmp()[14:], "points outside the file")
+        self.assertBroken(bmp(pixels_at=30), "points outside the file") # Inside the headers
+        self.assertBroken(bmp(size=20, compression=1, pixel_bytes=8), "compressed size unknown") # RLE, bfSize < offset
+        self.assertBroken(b"BM" + bytes(10), "ends mid-header")
+
+        mismatch = walk(bmp(size=999))
+        self.assertEqual(mismatch.end, 78)
+        self.assertTrue(any("header claims 999 bytes" in a for a in mismatch.anomalies))
+
+    def test_not_an_image(self):
+        self.assertIsNone(walk(ARCHIVE))
+        self.assertIsNone(walk(b""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import os
+import sys
+import shutil
+import socket
+import struct
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import pcap_reader
+from core.pcap_reader import CaptureReader, dissect
+
+# --- Fixture builders (headers only as far as the reader looks) ---------------------
+
+MAC = b"\x00\x11\x22\x33\x44\x55" + b"\x66\x77\x88\x99\xaa\xbb"
+
+
+def tcp(sport, dport, seq, flags, payload=b"", options=b""):
+    offset = (20 + len(options)) // 4
+    return struct.pack('!HHIIBBHHH', sport, dport, seq, 0, offset << 4, flags, 65535, 0, 0) + options + payload
+
+
+def udp(sport, dport, payload=b""):
+    return struct.pack('!HHHH', sport, dport, 8 + len(payload), 0) + payload
+
+
+def ipv4(src, dst, proto, l4, fragment_offset=0):
+    header = struct.pack('!BBHHHBBH4s4s', 0x45, 0, 20 + len(l4), 1, fragment_offset, 64, proto, 0,
+                         socket.inet_aton(src), socket.inet_aton(dst))
+    return header + l4
+
+
+def ipv6(src, dst, proto, l4, hop_by_hop=False):
+    if hop_by_hop: # 8-byte extension header in front of the L4 header
+        l4 = bytes([proto, 0]) + bytes(6) + l4
+        proto = 0
+    return (struct.pack('!IHBB', 6 << 28, len(l4), proto, 64)
+            + socket.inet_pton(socket.AF_INET6, src) + socket.inet_pton(socket.AF_INET6, dst) + l4)
+
+
+def ethernet(ethertype, payload, vlan=None):
+    tag = struct.pack('!HH', 0x8100, vlan) if vlan is not None else b""
+    return MAC + tag + struct.pack('!H', ethertype) + payload
+
+
+def pcap(frames, endian='<', nano=False, linktype=1):
+    magic = 0xA1B23C4D if nano else 0xA1B2C3D4
+    out = struct.pack(endian + 'IHHiIII', magic, 2, 4, 0, 0, 65535, linktype)
+    for sec, frac, frame in frames:
+        out += struct.pack(endian + 'IIII', sec, frac, len(frame), len(frame)) + frame
+    return out
+
+
+def _block(block_type, body):
+    body += bytes(-len(body) % 4)
+    length = 12 + len(body)
+    return struct.pack('<II', block_type, length) + body + struct.pack('<I', length)
+
+
+def shb():
+    return _block(0x0A0D0D0A, struct.pack('<IHHq', 0x1A2B3C4D, 1, 0, -1))
+
+
+def idb(linktype, tsresol=None):
+    options = b""
+    if tsresol is not None:
+        options = struct.pack('<HHB3x', 9, 1, tsresol) + struct.pack('<HH', 0, 0)
+    return _block(1, struct.pack('<HHI', linktype, 0, 65535) + options)
+
+
+def epb(iface, ticks, frame):
+    return _block(6, struct.pack('<IIIII', iface, ticks >> 32, ticks & 0xFFFFFFFF, len(frame), len(frame)) + frame)
+
+
+def spb(frame):
+    return _block(3, struct.pack('<I', len(frame)) + frame)
+
+
+HTTP = b"GET /flag HTTP/1.1\r\nHost: ctf.local\r\n\r\n"
+SYN_FRAME = ethernet(0x0800, ipv4("10.0.0.1", "10.0.0.2", 6, tcp(40000, 80, 1000, 0x02)))
+HTTP_FRAME = ethernet(0x0800, ipv4("10.0.0.1", "10.0.0.2", 6, tcp(40000, 80, 1001, 0x18, HTTP)))
+DNS_QUERY = struct.pack('!HHHHHH', 0x1234, 0x0100, 1, 0, 0, 0) + b"\x04flag\x03ctf\x00" + struct.pack('!HH', 1, 1)
+
+
+class CaptureReaderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, data, name="capture"):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def packets(self, data):
+        with CaptureReader(self.write(data)) as reader:
+            packets = [(p.ts, p.src_ip, p.dst_ip, p.sport, p.dport, p.seq, p.flags, p.payload)
+                       for p in reader.packets()]
+            return reader.format, reader.frames, packets
+
+    def test_classic_pcap_both_byte_orders(self):
+        for endian in '<>':
+            fmt, frames, packets = self.packets(pcap([(100, 250000, SYN_FRAME), (101, 0, HTTP_FRAME)], endian))
+            self.assertEqual((fmt, frames), ("pcap", 2))
+            self.assertEqual(packets[0][:7], (100.25, "10.0.0.1", "10.0.0.2", 40000, 80, 1000, 0x02))
+            self.assertEqual(packets[1][-1], HTTP)
+
+    def test_nanosecond_pcap(self):
+        _, _, packets = self.packets(pcap([(7, 123456789, SYN_FRAME)], nano=True))
+        self.assertAlmostEqual(packets[0][0], 7.123456789, places=9)
+
+    def test_pcapng_interfaces_epb_and_spb(self):
+        raw_udp = ipv4("192.168.1.5", "8.8.8.8", 17, udp(5353, 53, DNS_QUERY))
+        data = (shb() + idb(1) + idb(101, tsresol=9)            # Ethernet (us) + raw IP (ns)
+                + epb(0, 1500000, SYN_FRAME)
+                + _block(5, b"statistics block: skipped")
+                + epb(1, 2000000001, raw_udp)
+                + spb(HTTP_FRAME))                               # SPB: first interface's link type
+        fmt, frames, packets = self.packets(data)
+        self.assertEqual((fmt, frames), ("pcapng", 3))
+        self.assertEqual(packets[0][:5], (1.5, "10.0.0.1", "10.0.0.2", 40000, 80))
+        self.assertAlmostEqual(packets[1][0], 2.000000001, places=9)
+        self.assertEqual(packets[1][1:5], ("192.168.1.5", "8.8.8.8", 5353, 53))
+        self.assertEqual((packets[2][0], packets[2][-1]), (0.0, HTTP))
+
+    def test_truncated_records_stop_cleanly(self):
+        whole = pcap([(1, 0, SYN_FRAME), (2, 0, HTTP_FRAME)])
+        _, frames, packets = self.packets(whole[:-5]) # Second record cut short
+        self.assertEqual((frames, len(packets)), (1, 1))
+
+        ng = shb() + idb(1) + epb(0, 1, SYN_FRAME) + epb(0, 2, HTTP_FRAME)
+        _, frames, _ = self.packets(ng[:-10]) # Block length runs past the end
+        self.assertEqual(frames, 1)
+
+        _, frames, _ = self.packets(whole[:20]) # Not even a full global header
+        self.assertEqual(frames, 0)
+
+    def test_not_a_capture(self):
+        with self.assertRaises(ValueError):
+            CaptureReader(self.write(b"PK\x03\x04 not a capture"))
+
+
+class DissectTest(unittest.TestCase):
+    def dissect(self, frame, linktype=1):
+        return dissect(frame, linktype, 0, len(frame))
+
+    def test_ipv4_tcp_with_options_and_padding(self):
+        segment = tcp(1234, 443, 0xFFFFFFF0, 0x18, b"hello", options=b"\x01" * 12)
+        frame = ethernet(0x0800, ipv4("1.2.3.4", "5.6.7.8", 6, segment)) + bytes(10) # Ethernet padding
+        packet = self.dissect(frame)
+        self.assertEqual((packet.version, packet.proto, packet.sport, packet.dport), (4, 6, 1234, 443))
+        self.assertEqual((packet.seq, packet.flags, packet.payload), (0xFFFFFFF0, 0x18, b"hello"))
+        self.assertEqual(packet.find(b"llo"), packet.start + 2)
+
+    def test_ipv6_udp_behind_extension_header(self):
+        frame = ethernet(0x86DD, ipv6("2001:db8::1", "2001:db8::2", 17, udp(5000, 53, DNS_QUERY), hop_by_hop=True))
+        packet = self.dissect(frame)
+        self.assertEqual((packet.version, packet.proto, packet.src_ip, packet.dst_ip),
+                         (6, 17, "2001:db8::1", "2001:db8::2"))
+        self.assertEqual((packet.sport, packet.dport), (5000, 53))
+        self.assertEqual(pcap_reader.dns_query(frame, packet.start, packet.end), "flag.ctf.")
+
+    def test_vlan_tagged_frame(self):
+        frame = ethernet(0x0800, ipv4("10.1.1.1", "10.1.1.2", 17, udp(1111, 2222, b"data")), vlan=42)
+        packet = self.dissect(frame)
+        self.assertEqual((packet.sport, packet.dport, packet.payload), (1111, 2222, b"data"))
+
+    def test_fragments_and_non_ip(self):
+        fragment = self.dissect(ethernet(0x0800, ipv4("1.1.1.1", "2.2.2.2", 6, b"x" * 24, fragment_offset=100)))
+        self.assertTrue(fragment.fragment)
+        self.assertEqual((fragment.sport, fragment.dport), (0, 0))
+        self.assertIsNone(self.dissect(ethernet(0x0806, bytes(28))))       # ARP
+        self.assertIsNone(self.dissect(ethernet(0x0800, bytes(10))))       # IPv4 header cut short
+        self.assertIsNone(self.dissect(b"\x00" * 8))                       # Not even an Ethernet header
+
+    def test_raw_ip_and_http_fast_path(self):
+        frame = ipv4("10.0.0.1", "10.0.0.2", 6, tcp(40000, 80, 1, 0x18, HTTP))
+        packet = self.dissect(frame, linktype=101)
+        self.assertEqual(list(pcap_reader.http_requests(frame, packet.start, packet.end)), [("ctf.local", "/flag")])
+
+        stream = HTTP + b"POST /up HTTP/1.1\r\nHost: b\r\nX: GET /no HTTP/1.1\r\n\r\n" # Keep-alive stream
+        self.assertEqual(list(pcap_reader.http_requests(stream)), [("ctf.local", "/flag"), ("b", "/up")])
+
+
+if __name__ == "__main__":
+    unittest.main()
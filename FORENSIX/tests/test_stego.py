@@ -0,0 +1,90 @@
+import os
+import sys
+import zlib
+import struct
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.entropy import NUMPY_AVAILABLE
+from core.evidence import EvidenceBuffer
+from modules.stego import StegoDetector
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+SIZE = 256 # 64K pixels per channel: above MIN_STAT_PIXELS
+SECRET = b"flag{l3ast_significant_b1ts}"
+
+
+def cover(seed=7):
+    """Smooth synthetic photo: gradients plus a little sensor noise"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:SIZE, 0:SIZE].astype(np.float64)
+    base = np.stack([96 + 60 * np.sin(x / 23) * np.cos(y / 31),
+                     128 + 0.3 * (x - y),
+                     80 + 50 * np.cos((x + y) / 40)], axis=-1)
+    return np.clip(base + rng.normal(0, 2, base.shape), 0, 255).round().astype(np.uint8)
+
+
+def embed(pixels, bits):
+    """Overwrites the LSBs of the first len(bits) channel values, in raster order"""
+    flat = pixels.copy().reshape(-1)
+    flat[:len(bits)] = (flat[:len(bits)] & 0xFE) | bits
+    return flat.reshape(pixels.shape)
+
+
+def bmp(pixels):
+    height, width, _ = pixels.shape
+    stride = (24 * width + 31) // 32 * 4
+    rows = b"".join(row.tobytes().ljust(stride, b"\0") for row in pixels)
+    return (struct.pack('<2sIHHI', b'BM', 54 + len(rows), 0, 0, 54)
+            + struct.pack('<IiiHHIIiiII', 40, width, height, 1, 24, 0, len(rows), 2835, 2835, 0, 0) + rows)
+
+
+def png(pixels):
+    height, width, _ = pixels.shape
+    def chunk(kind, body):
+        return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+    raw = b"".join(b"\x00" + row.tobytes() for row in pixels) # Filter type 0 on every row
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b""))
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "LSB steganalysis needs NumPy")
+class StegoLsbTest(unittest.TestCase):
+    def scan(self, image, name):
+        detector = StegoDetector(name, EvidenceBuffer.from_bytes(image, name))
+        return [finding for finding in detector.scan() if finding.startswith("LSB")]
+
+    def test_clean_cover_is_not_flagged(self):
+        for seed in (1, 2, 3):
+            clean = cover(seed)
+            self.assertEqual(self.scan(bmp(clean), "cover.bmp"), [])
+            self.assertEqual(self.scan(png(clean), "cover.png"), [])
+
+    def test_random_lsb_embedding_is_flagged(self):
+        clean = cover()
+        bits = np.random.default_rng(0).integers(0, 2, clean.size, dtype=np.uint8) # Encrypted-looking payload
+        findings = self.scan(bmp(embed(clean, bits)), "stego.bmp")
+        self.assertTrue(any(f.startswith("LSB Steganalysis") for f in findings), findings)
+        self.assertTrue(any(f.startswith("LSB Chi-Square") for f in findings), findings)
+
+    def test_sequential_text_payload_is_recovered(self):
+        bits = np.unpackbits(np.frombuffer(SECRET, dtype=np.uint8))
+        for image, name in ((bmp, "text.bmp"), (png, "text.png")):
+            findings = self.scan(image(embed(cover(), bits)), name)
+            self.assertTrue(any("LSB Payload" in f and SECRET.decode() in f for f in findings), findings)
+
+
+class StegoToolSignatureTest(unittest.TestCase):
+    def test_f5_needs_its_comment_not_two_bytes(self):
+        detector = StegoDetector("x.jpg", EvidenceBuffer.from_bytes(b"\xff\xd8 ... F5 ... \xff\xd9"))
+        self.assertEqual(detector.scan(), [])
+        comment = b"JPEG Encoder Copyright 1998, James R. Weeks and BioElectroMech."
+        detector = StegoDetector("x.jpg", EvidenceBuffer.from_bytes(b"\xff\xd8\xff\xfe" + comment))
+        self.assertIn("Tool Signature: F5 Steganography detected", detector.scan())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.tcp_reassembly import TcpReassembler, FIN, SYN, SEQ_MASK
+
+KEY = (b"\x0a\x00\x00\x01", b"\x0a\x00\x00\x02", 40000, 80)
+ACK = 0x10
+
+
+class TcpReassemblyTest(unittest.TestCase):
+    def setUp(self):
+        self.streams = []
+        self.gaps = []
+
+    def reassembler(self, **kwargs):
+        def on_stream(stream):
+            self.streams.append(bytes(stream.data)) # data is dropped after the callback
+            self.gaps.append(stream.gaps)
+        return TcpReassembler(on_stream, **kwargs)
+
+    def feed(self, segments, isn=None, **kwargs):
+        """segments: (seq, payload) in arrival order; returns the flushed stream."""
+        tcp = self.reassembler(**kwargs)
+        if isn is not None:
+            tcp.add(KEY, isn, SYN, b"")
+        for seq, payload in segments:
+            tcp.add(KEY, seq & SEQ_MASK, ACK, payload)
+        tcp.flush_all()
+        self.assertEqual(tcp.buffered, 0)
+        self.assertEqual(len(self.streams), 1)
+        return self.streams[0]
+
+    def test_in_order_closed_by_fin(self):
+        tcp = self.reassembler()
+        tcp.add(KEY, 100, SYN, b"")
+        tcp.add(KEY, 101, ACK, b"abc")
+        tcp.add(KEY, 104, FIN | ACK, b"def")
+        self.assertEqual(self.streams, [b"abcdef"])
+        self.assertEqual((len(tcp.flows), tcp.buffered), (0, 0))
+
+    def test_out_of_order_segments(self):
+        data = self.feed([(101, b"abc"), (107, b"ghi"), (104, b"def")], isn=100)
+        self.assertEqual((data, self.gaps[0]), (b"abcdefghi", 0))
+
+    def test_overlapping_retransmits(self):
+        data = self.feed([
+            (101, b"abcd"),
+            (103, b"cdef"),   # Overlaps the tail of what we have
+            (101, b"abcd"),   # Full duplicate
+            (109, b"ijkl"),   # Parked behind a hole...
+            (107, b"ghij"),   # ...which this fills and overlaps
+        ], isn=100)
+        self.assertEqual(data, b"abcdefghijkl")
+
+    def test_heap_drains_reversed_segments(self):
+        # Capture starts mid-connection; everything after the first segment arrives backwards
+        segments = [(5000, b"00")] + [(5000 + 2 * i, b"%02d" % i) for i in range(50, 0, -1)]
+        data = self.feed(segments)
+        self.assertEqual(data, b"".join(b"%02d" % i for i in range(51)))
+        self.assertEqual(self.gaps[0], 0)
+
+    def test_sequence_wraparound(self):
+        isn = SEQ_MASK - 5 # First data byte at 0xFFFFFFFB, wraps after five bytes
+        data = self.feed([
+            (3, b"xyz"),       # Parked past the wrap...
+            (0, b"fgh"),       # ...behind this one, though pushed first
+            (isn + 1, b"abcde"),
+            (isn + 3, b"cd"),  # Stale retransmit from before the wrap
+        ], isn=isn)
+        self.assertEqual(data, b"abcdefghxyz")
+
+    def test_hole_skipped_on_close(self):
+        data = self.feed([(101, b"abc"), (110, b"xyz"), (120, b"!")], isn=100)
+        self.assertEqual((data, self.gaps[0]), (b"abcxyz!", 2))
+
+    def test_stream_cap(self):
+        tcp = self.reassembler(stream_cap=4)
+        tcp.add(KEY, 100, SYN, b"")
+        tcp.add(KEY, 101, ACK, b"abcdef")
+        tcp.add(KEY, 107, ACK, b"ghi")
+        tcp.flush_all()
+        self.assertEqual((self.streams, tcp.truncated, tcp.buffered), ([b"abcd"], 1, 0))
+
+    def test_parked_bytes_over_cap_skip_the_hole(self):
+        tcp = self.reassembler(stream_cap=8)
+        tcp.add(KEY, 100, SYN, b"")
+        tcp.add(KEY, 101, ACK, b"ab")
+        tcp.add(KEY, 110, ACK, b"12345")
+        tcp.add(KEY, 115, ACK, b"6789")   # 9 bytes parked > cap: stop waiting for 103..109
+        stream = tcp.flows[KEY]
+        self.assertEqual((bytes(stream.data), stream.gaps, stream.pending), (b"ab123456", 1, None))
+        self.assertEqual(tcp.truncated, 1)
+        self.assertEqual(tcp.buffered, len(stream.data))
+
+    def test_bare_ack_does_not_open_a_flow(self):
+        tcp = self.reassembler()
+        tcp.add(KEY, 1, ACK, b"")
+        tcp.flush_all()
+        self.assertEqual((tcp.streams, self.streams), (0, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
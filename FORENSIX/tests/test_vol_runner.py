@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import hashlib
+import tempfile
+import unittest
+
+# Same layout the app runs with (modules/ and core/ importable)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.tools import Tools
+from modules import vol_runner
+from modules.vol_runner import VolatilityRunner
+
+# Fake vol / volatility binaries: canned output per plugin, every call logged
+FAKE_VOL3 = '''#!{python}
+import sys, json
+open({log!r}, 'a').write(' '.join(sys.argv[1:]) + '\\n')
+if '-h' in sys.argv:
+    print('Volatility 3 Framework 2.5.0')
+    sys.exit(0)
+plugin = sys.argv[-1]
+rows = {{
+    'windows.info': [{{'Variable': 'Is64Bit', 'Value': 'True'}}],
+    'windows.pslist': [{{'PID': 4, 'ImageFileName': 'System'}}, {{'PID': 616, 'ImageFileName': 'lsass.exe'}}],
+    'windows.pstree': [{{'PID': 4, 'ImageFileName': 'System', '__children': [{{'PID': 88, 'ImageFileName': 'smss.exe'}}]}}],
+}}.get(plugin, [])
+print('Progress: 100.00\\tdone')
+print(json.dumps(rows))
+'''
+
+FAKE_VOL2 = '''#!{python}
+import sys, json
+open({log!r}, 'a').write(' '.join(sys.argv[1:]) + '\\n')
+if '-h' in sys.argv:
+    print('Volatility Foundation Volatility Framework 2.6')
+    sys.exit(0)
+if 'imageinfo' in sys.argv:
+    print('          Suggested Profile(s) : Win7SP1x64, Win7SP0x64, Win2008R2SP0x64')
+    sys.exit(0)
+if '--profile=Win7SP1x64' not in sys.argv:
+    sys.exit(1)
+if 'pslist' in sys.argv:
+    print(json.dumps({{'columns': ['Offset(V)', 'Name', 'PID'], 'rows': [[1, 'System', 4], [2, 'lsass.exe', 616]]}}))
+else:
+    print(json.dumps({{'columns': ['PID'], 'rows': []}}))
+'''
+
+
+class VolRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.log = os.path.join(self.tmp, "calls.log")
+        self.dump = os.path.join(self.tmp, "mem.raw")
+        with open(self.dump, 'wb') as f:
+            f.write(b"\x00" * 4096)
+        self.saved_tools = dict(Tools.available_tools)
+        self.saved_versions = dict(vol_runner._VERSIONS)
+        vol_runner._VERSIONS.clear()
+        # Never touch the user's cache (CACHE_DIR is read at import: patch the module too)
+        self.saved_env = os.environ.get("FORENSIX_CACHE_DIR")
+        self.saved_cache_dir = vol_runner.CACHE_DIR
+        os.environ["FORENSIX_CACHE_DIR"] = vol_runner.CACHE_DIR = self.tmp
+
+    def tearDown(self):
+        vol_runner.CACHE_DIR = self.saved_cache_dir
+        if self.saved_env is None:
+            os.environ.pop("FORENSIX_CACHE_DIR", None)
+        else:
+            os.environ["FORENSIX_CACHE_DIR"] = self.saved_env
+        Tools.available_tools.clear()
+        Tools.available_tools.update(self.saved_tools)
+        vol_runner._VERSIONS.clear()
+        vol_runner._VERSIONS.update(self.saved_versions)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def install(self, tool, script):
+        path = os.path.join(self.tmp, tool)
+        with open(path, 'w') as f:
+            f.write(script.format(python=sys.executable, log=self.log))
+        os.chmod(path, 0o755)
+        Tools.available_tools['vol'] = None
+        Tools.available_tools['volatility'] = None
+        Tools.available_tools[tool] = path
+
+    def runner(self, sha256=None):
+        return VolatilityRunner(self.dump, workers=2, sha256=sha256)
+
+    def cached_keys(self):
+        db = sqlite3.connect(os.path.join(self.tmp, "volatility.db"))
+        try:
+            return set(db.execute("SELECT DISTINCT sha256 FROM results"))
+        finally:
+            db.close()
+
+    def calls(self):
+        with open(self.log) as f:
+            return [line.split() for line in f if '-h' not in line.split()]
+
+    def test_vol3_detects_parses_and_caches(self):
+        self.install('vol', FAKE_VOL3)
+        runner = self.runner()
+        results = runner.analyze()
+
+        self.assertEqual(runner.os_name, "windows")
+        self.assertEqual(runner.framework, "Volatility 3 2.5.0")
+        self.assertLessEqual(set(vol_runner.PLUGIN_SETS["windows"]), set(results)) # + the OS probe
+        names = [record["ImageFileName"] for record in results["windows.pslist"].records]
+        self.assertEqual(names, ["System", "lsass.exe"])
+        tree = results["windows.pstree"].records
+        self.assertEqual([(r["PID"], r["__depth"]) for r in tree], [(4, 0), (88, 1)])
+        self.assertTrue(all(result.ok and not result.cached for result in results.values()))
+        ran = len(self.calls())
+
+        # Same dump again: every plugin (and the probe) comes from the cache
+        results = self.runner().analyze()
+        self.assertTrue(all(result.cached for result in results.values()))
+        self.assertEqual(len(self.calls()), ran)
+
+    def test_vol2_fallback_uses_the_suggested_profile(self):
+        self.install('volatility', FAKE_VOL2)
+        runner = self.runner()
+        results = runner.analyze()
+
+        self.assertTrue(runner.legacy)
+        self.assertEqual(runner.framework, "Volatility 2 2.6")
+        self.assertEqual(runner.profile, "Win7SP1x64")
+        self.assertLessEqual(set(vol_runner.PLUGIN_SETS["windows"]), set(results)) # + the OS probe
+        self.assertTrue(all(result.ok for result in results.values()))
+        names = [record["Name"] for record in results["windows.pslist"].records]
+        self.assertEqual(names, ["System", "lsass.exe"])
+        for args in self.calls():
+            if 'imageinfo' not in args:
+                self.assertIn('--profile=Win7SP1x64', args)
+                self.assertIn('--output=json', args)
+
+    def test_cache_keyed_by_the_callers_sha256(self):
+        self.install('vol', FAKE_VOL3)
+        self.runner(sha256="ab" * 32).analyze()
+        self.assertEqual(self.cached_keys(), {("ab" * 32,)}) # The dump was not hashed again
+
+        # Standalone: the runner hashes the dump itself
+        self.runner().analyze()
+        with open(self.dump, 'rb') as f:
+            own = hashlib.sha256(f.read()).hexdigest()
+        self.assertEqual(self.cached_keys(), {("ab" * 32,), (own,)})
+
+    def test_nothing_runs_without_volatility(self):
+        Tools.available_tools['vol'] = None
+        Tools.available_tools['volatility'] = None
+        runner = self.runner()
+        self.assertFalse(runner.available)
+        self.assertEqual(runner.analyze(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import sys
+import hmac
+import zlib
+import shutil
+import random
+import struct
+import hashlib
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.zip_cracker import (ZipCracker, ZipTarget, CRC_TABLE, AES_EXTRA_ID, AES_ITERATIONS,
+                                 AES_MAC_LENGTH, _zipcrypto_check)
+
+PASSWORD = b"caf\xe9-s3cret" # Not UTF-8 on purpose
+DOS_TIME = (13 << 11) | (37 << 5) | (42 // 2)
+DOS_DATE = ((2024 - 1980) << 9) | (5 << 5) | 17
+
+
+def _update_keys(keys, c):
+    k0, k1, k2 = keys
+    k0 = (k0 >> 8) ^ CRC_TABLE[(k0 ^ c) & 0xFF]
+    k1 = ((k1 + (k0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+    k2 = (k2 >> 8) ^ CRC_TABLE[(k2 ^ (k1 >> 24)) & 0xFF]
+    return k0, k1, k2
+
+
+def _zipcrypto(pwd, data, check, rng):
+    """Traditional PKWARE encryption: 12-byte header (last byte = check byte) + data"""
+    keys = (0x12345678, 0x23456789, 0x34567890)
+    for c in pwd:
+        keys = _update_keys(keys, c)
+    out = bytearray()
+    for c in rng.randbytes(11) + bytes([check]) + data:
+        t = (keys[2] | 2) & 0xFFFF
+        out.append(c ^ (((t * (t ^ 1)) >> 8) & 0xFF))
+        keys = _update_keys(keys, c)
+    return bytes(out)
+
+
+def _write_zip(path, members):
+    """members: (name, flags, method, crc, payload, size, extra); stored with a data descriptor when bit 3 is set"""
+    body, central = b"", b""
+    for name, flags, method, crc, payload, size, extra in members:
+        offset = len(body)
+        local_crc, local_sizes = (0, (0, 0)) if flags & 0x8 else (crc, (len(payload), size))
+        body += struct.pack('<IHHHHHIIIHH', 0x04034b50, 20, flags, method, DOS_TIME, DOS_DATE,
+                            local_crc, *local_sizes, len(name), len(extra)) + name + extra + payload
+        if flags & 0x8:
+            body += struct.pack('<IIII', 0x08074b50, crc, len(payload), size)
+        central += struct.pack('<IHHHHHHIIIHHHHHII', 0x02014b50, 20, 20, flags, method, DOS_TIME, DOS_DATE,
+                               crc, len(payload), size, len(name), len(extra), 0, 0, 0, 0, offset) + name + extra
+    end = struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, len(members), len(members), len(central), len(body), 0)
+    with open(path, 'wb') as f:
+        f.write(body + central + end)
+
+
+class ZipCrackerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.rng = random.Random(11)
+        # Enough wrong candidates that some pass a single check byte (1 in 256)
+        self.wrong = [f"guess{i}".encode() for i in range(2000)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+    def wordlist(self, words):
+        path = self.path("words.txt")
+        with open(path, 'wb') as f:
+            f.write(b"\n".join(words) + b"\r\n")
+        return path
+
+    def crack(self, archive, words):
+        return ZipCracker(self.wordlist(words), workers=1).crack(archive)
+
+    def zipcrypto_archive(self, flags):
+        data = b"flag{zipcrypto}"
+        crc = zlib.crc32(data)
+        check = DOS_TIME >> 8 if flags & 0x8 else crc >> 24
+        path = self.path(f"zc_{flags}.zip")
+        _write_zip(path, [(b"flag.txt", flags, 0, crc, _zipcrypto(PASSWORD, data, check, self.rng), len(data), b"")])
+        return path
+
+    def aes_archive(self):
+        key_len, salt = 32, self.rng.randbytes(16) # Strength 3: AES-256
+        keys = hashlib.pbkdf2_hmac('sha1', PASSWORD, salt, AES_ITERATIONS, 2 * key_len + 2)
+        ciphertext = self.rng.randbytes(40) # Only authenticated here, never decrypted
+        mac = hmac.new(keys[key_len:2 * key_len], ciphertext, hashlib.sha1).digest()[:AES_MAC_LENGTH]
+        payload = salt + keys[-2:] + ciphertext + mac
+        extra = struct.pack('<HHH2sBH', AES_EXTRA_ID, 7, 2, b"AE", 3, 0)
+        path = self.path("aes.zip")
+        _write_zip(path, [(b"flag.txt", 0x1, 99, 0, payload, 40, extra)])
+        return path
+
+    def test_zipcrypto_crc_check_byte(self):
+        archive = self.zipcrypto_archive(0x1)
+        target = ZipTarget(archive)
+        self.assertEqual(target.mode, "zipcrypto")
+        self.assertTrue(_zipcrypto_check(PASSWORD, target.headers))
+        self.assertEqual(self.crack(archive, self.wrong[:1000] + [PASSWORD] + self.wrong[1000:]), PASSWORD)
+        self.assertIsNone(self.crack(archive, self.wrong))
+
+    def test_zipcrypto_bit3_uses_the_dos_time(self):
+        archive = self.zipcrypto_archive(0x1 | 0x8)
+        target = ZipTarget(archive)
+        self.assertEqual(target.headers[0][1], DOS_TIME >> 8)
+        self.assertTrue(_zipcrypto_check(PASSWORD, target.headers))
+        self.assertEqual(self.crack(archive, self.wrong + [PASSWORD]), PASSWORD)
+        self.assertIsNone(self.crack(archive, self.wrong))
+
+    def test_aes_verifier_and_mac(self):
+        archive = self.aes_archive()
+        target = ZipTarget(archive)
+        self.assertEqual(target.mode, "aes")
+        self.assertTrue(target.verify(PASSWORD))
+        self.assertFalse(target.verify(b"wrong"))
+        words = self.wrong[:200]
+        self.assertEqual(self.crack(archive, words + [PASSWORD]), PASSWORD)
+        self.assertIsNone(self.crack(archive, words))
+
+
+if __name__ == "__main__":
+    unittest.main()